@@ -1 +1,6 @@
-from .run_test import main
+def __getattr__(name):
+    # Lazy so `import qa_agents.<module>` does not pull in every agent and the LLM stack.
+    if name == "main":
+        from .run_test import main
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,8 @@
 from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Protocol
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
+from .utils.tracing import span
 
 @dataclass
 class Message:
@@ -8,6 +10,87 @@ class Message:
     content: str
     data: Dict[str, Any] = field(default_factory=dict)
 
+class History(list):
+    """A List[Message] that indexes the latest message per role and per (role, data key).
+
+    Appends update the index in O(len(m.data)); in-place edits other than appends
+    rebuild it. ``latest(role, key)`` returns the newest message of ``role`` whose
+    ``data[key]`` is truthy (or the newest message of ``role`` when ``key`` is None).
+    """
+
+    def __init__(self, messages: Iterable[Message] = ()):
+        super().__init__(messages)
+        self._reindex()
+
+    def _index(self, m: Message, pos: int) -> None:
+        self._latest[(m.role, None)] = (pos, m)
+        for k, v in m.data.items():
+            if v: self._latest[(m.role, k)] = (pos, m)
+
+    def _reindex(self) -> None:
+        self._latest: Dict[Tuple[str, Optional[str]], Tuple[int, Message]] = {}
+        for pos, m in enumerate(self): self._index(m, pos)
+
+    def latest(self, role: str, key: Optional[str] = None, upto: Optional[int] = None) -> Optional[Message]:
+        """``upto`` limits the lookup to the first ``upto`` messages (scanning back when the newest match is later)."""
+        hit = self._latest.get((role, key))
+        if hit is None or upto is None or hit[0] < upto:
+            return hit and hit[1]
+        return _scan(HistoryView(self, upto), role, key)
+
+    def __reduce__(self):
+        return (History, (list(self),))
+
+    def append(self, m: Message) -> None:
+        super().append(m); self._index(m, len(self) - 1)
+
+    def extend(self, messages: Iterable[Message]) -> None:
+        for m in messages: self.append(m)
+
+    def __iadd__(self, messages: Iterable[Message]) -> "History":
+        self.extend(messages); return self
+
+    def _mutating(name: str):
+        def method(self, *args, **kwargs):
+            out = getattr(super(History, self), name)(*args, **kwargs)
+            self._reindex()
+            return out
+        method.__name__ = name
+        return method
+
+    insert = _mutating("insert"); pop = _mutating("pop"); remove = _mutating("remove")
+    clear = _mutating("clear"); sort = _mutating("sort"); reverse = _mutating("reverse")
+    __setitem__ = _mutating("__setitem__"); __delitem__ = _mutating("__delitem__")
+    del _mutating
+
+class HistoryView(Sequence):
+    """Read-only view of the first ``upto`` messages of a History that may still grow."""
+
+    def __init__(self, history: History, upto: int) -> None:
+        self._history, self._upto = history, upto
+
+    def __len__(self) -> int:
+        return self._upto
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._history[slice(*i.indices(self._upto))]
+        if not -self._upto <= i < self._upto:
+            raise IndexError("history view index out of range")
+        return self._history[i % self._upto]
+
+    def latest(self, role: str, key: Optional[str] = None) -> Optional[Message]:
+        return self._history.latest(role, key, self._upto)
+
+def _scan(history: Sequence, role: str, key: Optional[str]) -> Optional[Message]:
+    return next((m for m in reversed(history) if m.role == role and (key is None or m.data.get(key))), None)
+
+def latest(history: Sequence, role: str, key: Optional[str] = None) -> Optional[Message]:
+    """O(1) lookup on a History (or a view of one); linear scan fallback for plain lists."""
+    if isinstance(history, (History, HistoryView)):
+        return history.latest(role, key)
+    return _scan(history, role, key)
+
 class BaseAgent(Protocol):
     name: str
     def step(self, history: List[Message]) -> Message: ...
@@ -23,14 +106,60 @@ class ShimAgent:
     def step(self, history: List[Message]) -> Message: raise NotImplementedError
 
 class Router:
-    def __init__(self, agents: Dict[str, BaseAgent]): self.agents = agents
+    """Round-robin planner → executor → verifier → supervisor until the supervisor says ``final``.
+
+    ``pipelined=True`` splits agents that define ``decide(history) -> Message`` and
+    ``background(history, msg)``: ``decide`` stays on the turn loop, so history order and the
+    stop turn are identical to the sequential mode, while ``background`` (report writing,
+    read-only checks) runs on worker threads overlapping the next ``execute_action``. Each
+    role's background work sees a ``HistoryView`` of the history before its message, runs after that
+    role's previous background work and after the roles in ``AFTER``; all of it is joined
+    (and the first error raised) before ``run`` returns. Of the Agent-S agents only the
+    supervisor splits (its report writing); the verifier's check decides the next verdict,
+    so it stays on the turn loop.
+    """
+    ORDER = ["planner", "executor", "verifier", "supervisor"]
+    AFTER = {"supervisor": ("executor", "verifier")}
+
+    def __init__(self, agents: Dict[str, BaseAgent], pipelined: bool = False, workers: int = 2):
+        self.agents = agents
+        self.pipelined = pipelined
+        self.workers = workers
+
     def run(self, start_with: str, history: List[Message], max_turns: int = 50) -> List[Message]:
-        order = ["planner", "executor", "verifier", "supervisor"]
+        # A plain list is indexed in a History; the caller's list still gets every message appended.
+        caller = history
+        if not isinstance(history, History): history = History(history)
+        order = self.ORDER
         i = order.index(start_with)
-        for _ in range(max_turns):
-            role = order[i % len(order)]
-            msg = self.agents[role].step(history)
-            history.append(msg)
-            if role == "supervisor" and msg.data.get("final", False): break
-            i += 1
-        return history
+        pool = ThreadPoolExecutor(self.workers, thread_name_prefix="router") if self.pipelined else None
+        pending: Dict[str, Future] = {}  # each role's latest background work (what later work waits on)
+        submitted: List[Future] = []
+        try:
+            for _ in range(max_turns):
+                role = order[i % len(order)]
+                agent = self.agents[role]
+                split = pool is not None and hasattr(agent, "decide") and hasattr(agent, "background")
+                with span(f"router.{role}", turn=len(history)):
+                    msg = agent.decide(history) if split else agent.step(history)
+                if split:
+                    deps = [pending[r] for r in (role,) + self.AFTER.get(role, ()) if r in pending]
+                    pending[role] = pool.submit(self._background, agent, role, deps, history, len(history), msg)
+                    submitted.append(pending[role])
+                history.append(msg)
+                if caller is not history: caller.append(msg)
+                if role == "supervisor" and msg.data.get("final", False): break
+                i += 1
+        finally:
+            if pool is not None:
+                wait(submitted)
+                pool.shutdown()
+        for f in submitted:
+            f.result()  # surface background errors, not only the last one per role
+        return caller
+
+    @staticmethod
+    def _background(agent, role: str, deps: List[Future], history: History, upto: int, msg: Message) -> None:
+        wait(deps)
+        with span(f"router.{role}.background", turn=upto):
+            agent.background(HistoryView(history, upto), msg)
@@ -1,20 +1,34 @@
 # src/qa_agents/agents/agent_s_agents.py
 from __future__ import annotations
 from typing import Any, Dict, List, Optional
-import json, os, io, subprocess, tempfile
-from PIL import Image
-from qa_agents.agent_s_compat import Message, ShimAgent, AGENTS_AVAILABLE
+import io, os
+from qa_agents.agent_s_compat import Message, ShimAgent, latest
+from qa_agents.agents.agent_s_session import AgentSSessionPool, default_pool
 from qa_agents.planning.rule_planner import rule_plan_for_goal
 from qa_agents.planning.llm_planner import llm_plan_for_goal
 from qa_agents.envs.mock_env import MockEnv
-from qa_agents.envs.android_world_env import AndroidWorldEnv
+from qa_agents.envs.capture import Frame, ScreenCapture
+from qa_agents.utils.report import StreamingReport
+from qa_agents.utils.tracing import span
 
 def get_env(env_name: str, task: Optional[str], enable_render: bool):
+    """Device envs are checked out of the process-wide EnvPool; hand them back with ``release_env``."""
     if env_name == "mock":    return MockEnv()
-    if env_name == "android": return AndroidWorldEnv(task_name=task or "settings_wifi", enable_render=enable_render)
+    if env_name == "android":
+        from qa_agents.envs.env_pool import default_env_pool
+        return default_env_pool().checkout(task or "settings_wifi", enable_render)
     raise ValueError(f"Unknown env: {env_name}")
 
+def release_env(env, healthy: bool = True) -> None:
+    if not isinstance(env, MockEnv):
+        from qa_agents.envs.env_pool import default_env_pool
+        default_env_pool().release(env, healthy)
+
 def execute_action(env, step: Dict[str, Any]) -> Dict[str, Any]:
+    with span("execute_action", intent=step.get("intent")):
+        return _execute_action(env, step)
+
+def _execute_action(env, step: Dict[str, Any]) -> Dict[str, Any]:
     intent = step.get("intent"); target = step.get("target"); params = step.get("params", {})
     if intent == "open_settings": return env.step({"op": "open_app", "app": "Settings"})
     if intent == "tap":           return env.step({"op": "tap", "target": target})
@@ -31,52 +45,54 @@ class PlannerAgent(ShimAgent):
     by asking Agent‑S for a suggested immediate action from the current screen.
     Otherwise we fall back to our rule/LLM planner only.
     """
-    def __init__(self, use_llm: bool, model: str, goal: str, cache_path: Optional[str], env_name: str):
+    def __init__(self, use_llm: bool, model: str, goal: str, cache_path: Optional[str], env_name: str,
+                 sessions: Optional[AgentSSessionPool] = None):
         super().__init__("planner")
         self.use_llm = use_llm; self.model = model; self.goal = goal; self.cache_path = cache_path
         self.env_name = env_name
+        self.sessions = sessions or default_pool()
+        self.capture: Optional[ScreenCapture] = None
+        self._last_suggestion = None
 
-    def _screenshot_android(self) -> Optional[bytes]:
-        try:
-            # Grab emulator screen via adb if available
-            out = subprocess.check_output(["adb", "exec-out", "screencap", "-p"], timeout=5)
-            return bytes(out)
-        except Exception:
-            return None
+    def warm(self) -> None:
+        """Start building the Agent‑S session in the background (call before booting the env)."""
+        if self.env_name == "android": self.sessions.warm()
 
-    def _first_action_from_agent_s(self, screenshot_png: bytes) -> Optional[str]:
-        if not AGENTS_AVAILABLE:
+    def _screenshot_android(self) -> Optional[Frame]:
+        # Persistent raw-frame channel; no per-shot adb fork or PNG decode.
+        if self.capture is None: self.capture = ScreenCapture()
+        with span("capture"):
+            return self.capture.capture()
+
+    def _first_action_from_agent_s(self, frame: Frame) -> Optional[str]:
+        if not self.sessions.available():
             return None
+        if self._last_suggestion is not None and self._last_suggestion[0] == frame.digest:
+            return self._last_suggestion[1]  # screen unchanged since the last suggestion
         try:
-            # Lazy import to avoid hard dependency at import time
-            from gui_agents.s2.agent import AgentS2  # class name per README
-            import pyautogui  # Agent‑S example uses pyautogui action space
-
-            # Minimal engine params (your keys should already be in env)
-            engine_params = {"llm": os.environ.get("OPENAI_MODEL","gpt-4o-mini")}
-            agent = AgentS2(
-                engine_params=engine_params,
-                grounding_agent=None,
-                platform="windows",            # we only need action suggestion, not exec
-                action_space="pyautogui",
-                observation_type="screenshot",
-                search_engine=None
-            )
-            obs = {"screenshot": screenshot_png}
-            info, actions = agent.predict(instruction=self.goal, observation=obs)
+            # Agent‑S takes PNG bytes; encode once here instead of on every capture.
+            from PIL import Image
+            buf = io.BytesIO(); Image.fromarray(frame.rgb).save(buf, format="PNG")
+            # Sessions are reused across steps/goals; a raising predict() discards its session.
+            with span("agent_s.predict"), self.sessions.acquire() as agent:
+                obs = {"screenshot": buf.getvalue()}
+                info, actions = agent.predict(instruction=self.goal, observation=obs)
             # actions is usually a list of pyautogui commands as strings
-            return actions[0] if actions else None
+            action = actions[0] if actions else None
+            self._last_suggestion = (frame.digest, action)
+            return action
         except Exception:
             return None
 
     def step(self, history: List[Message]) -> Message:
         # Reuse prior plan if present
-        for m in reversed(history):
-            if m.role == "planner" and m.data.get("plan"):
-                return Message("planner", "Reusing prior plan.", {"plan": m.data["plan"]})
+        prior = latest(history, "planner", "plan")
+        if prior:
+            return Message("planner", "Reusing prior plan.", {"plan": prior.data["plan"]})
 
-        plan = llm_plan_for_goal(self.goal, model=self.model, cache_path=self.cache_path) if self.use_llm \
-               else rule_plan_for_goal(self.goal)
+        with span("planner.plan", llm=self.use_llm):
+            plan = llm_plan_for_goal(self.goal, model=self.model, cache_path=self.cache_path) if self.use_llm \
+                   else rule_plan_for_goal(self.goal)
 
         # Optional: Ask Agent‑S for the *first* action suggestion from current screen
         first_action = None
@@ -93,8 +109,10 @@ class PlannerAgent(ShimAgent):
 class ExecutorAgent(ShimAgent):
     def __init__(self, env_name: str, task: Optional[str], enable_render: bool = False):
         super().__init__("executor"); self._env = get_env(env_name, task, enable_render); self._cursor = 0
+    def close(self, healthy: bool = True) -> None:
+        if self._env is not None: release_env(self._env, healthy); self._env = None
     def step(self, history: List[Message]) -> Message:
-        plan = next((m.data["plan"] for m in reversed(history) if m.role=="planner" and m.data.get("plan")), None)
+        prior = latest(history, "planner", "plan"); plan = prior.data["plan"] if prior else None
         if not plan: return Message("executor","No plan found yet.",{"executed":None})
         if self._cursor >= len(plan): return Message("executor","Plan finished.",{"executed":None,"done":True})
         step = plan[self._cursor]; result = execute_action(self._env, step); self._cursor += 1
@@ -103,7 +121,7 @@ class ExecutorAgent(ShimAgent):
 class VerifierAgent(ShimAgent):
     def __init__(self, goal: str): super().__init__("verifier"); self.goal = goal
     def step(self, history: List[Message]) -> Message:
-        last_exec = next((m for m in reversed(history) if m.role=="executor"), None)
+        last_exec = latest(history, "executor")
         passed, need_replan, reason = False, False, "Pending"
         if last_exec and isinstance(last_exec.data.get("result"), dict):
             r = last_exec.data["result"]
@@ -112,20 +130,20 @@ class VerifierAgent(ShimAgent):
         return Message("verifier", f"Verifier: passed={passed}, replan={need_replan}. {reason}", {"passed": passed, "need_replan": need_replan, "reason": reason})
 
 class SupervisorAgent(ShimAgent):
-    def __init__(self, logs_dir: str): super().__init__("supervisor"); self.logs_dir = logs_dir
-    def step(self, history: List[Message]) -> Message:
-        verifier = next((m for m in reversed(history) if m.role=="verifier"), None)
-        executor_done = next((m for m in reversed(history) if m.role=="executor" and m.data.get("done")), None)
+    def __init__(self, logs_dir: str):
+        super().__init__("supervisor"); self.logs_dir = logs_dir
+        self._report = StreamingReport(os.path.join(logs_dir, "agent_s_report.md"))
+    def decide(self, history: List[Message]) -> Message:
+        verifier = latest(history, "verifier")
+        executor_done = latest(history, "executor", "done")
         verdict, final = ("pass", True) if (verifier and verifier.data.get("passed")) else (("fail", True) if executor_done else ("in_progress", False))
-        # Write a tiny report
+        return Message("supervisor", f"Supervisor verdict: {verdict}", {"final": final, "verdict": verdict})
+    def background(self, history: List[Message], msg: Message) -> None:
+        # Append only the turns since the last call; the verdict footer is written once.
         try:
-            import pathlib, datetime, json
-            p = pathlib.Path(self.logs_dir); p.mkdir(parents=True, exist_ok=True)
-            with open(p/"agent_s_report.md","w",encoding="utf-8") as f:
-                f.write(f"# Agent‑S Run Report\n\nVerdict: **{verdict}**\n\n")
-                for m in history:
-                    f.write(f"**{m.role}**: {m.content}\n")
-                    if m.data: f.write(f"\n```json\n{json.dumps(m.data, indent=2)}\n```\n\n")
-                f.write(f"_Generated: {datetime.datetime.now().isoformat()}_\n")
+            self._report.append(history)
+            if msg.data["final"]: self._report.finish(msg.data["verdict"])
         except Exception: pass
-        return Message("supervisor", f"Supervisor verdict: {verdict}", {"final": final, "verdict": verdict})
+    def step(self, history: List[Message]) -> Message:
+        msg = self.decide(history); self.background(history, msg)
+        return msg
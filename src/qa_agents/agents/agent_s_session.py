@@ -0,0 +1,130 @@
+from __future__ import annotations
+import os, threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+def create_agent_s() -> Any:
+    """Build an AgentS2 for action suggestion only (imports are deferred to first use)."""
+    from gui_agents.s2.agent import AgentS2  # class name per README
+    import pyautogui  # noqa: F401  Agent‑S example uses pyautogui action space
+
+    # Minimal engine params (your keys should already be in env)
+    engine_params = {"llm": os.environ.get("OPENAI_MODEL","gpt-4o-mini")}
+    return AgentS2(
+        engine_params=engine_params,
+        grounding_agent=None,
+        platform="windows",            # we only need action suggestion, not exec
+        action_space="pyautogui",
+        observation_type="screenshot",
+        search_engine=None
+    )
+
+def _is_healthy(agent: Any) -> bool:
+    return callable(getattr(agent, "predict", None))
+
+class AgentSSessionPool:
+    """A small bounded pool of warm Agent‑S sessions shared across steps and goals.
+
+    Sessions are created lazily (or ahead of time by ``warm()``), health-checked on
+    checkout, and dropped if the caller's block raises, so a broken session is rebuilt
+    on the next acquire. At most ``max_size`` sessions exist; extra callers wait.
+    """
+
+    def __init__(self, factory: Optional[Callable[[], Any]] = None, max_size: int = 1,
+                 health_check: Callable[[Any], bool] = _is_healthy) -> None:
+        self.factory = factory or create_agent_s
+        self.max_size = max(1, max_size)
+        self.health_check = health_check
+        self._idle: List[Any] = []
+        self._total = 0
+        self._cond = threading.Condition()
+        self._available: Optional[bool] = None if factory is None else True
+        self.created = 0
+        self.discarded = 0
+
+    def available(self) -> bool:
+        """True if Agent‑S can be imported (checked once)."""
+        if self._available is None:
+            try:
+                import gui_agents  # noqa: F401
+                self._available = True
+            except Exception:
+                self._available = False
+        return self._available
+
+    def _create(self) -> Any:
+        agent = self.factory()
+        with self._cond:
+            self.created += 1
+        return agent
+
+    def _checkout(self, timeout: Optional[float]) -> Any:
+        with self._cond:
+            while True:
+                while self._idle:
+                    agent = self._idle.pop()
+                    if self.health_check(agent):
+                        return agent
+                    self._total -= 1; self.discarded += 1
+                if self._total < self.max_size:
+                    self._total += 1
+                    break
+                if not self._cond.wait(timeout):
+                    raise TimeoutError("No Agent‑S session became available")
+        try:
+            return self._create()
+        except Exception:
+            with self._cond:
+                self._total -= 1; self._cond.notify()
+            raise
+
+    def _release(self, agent: Any, healthy: bool) -> None:
+        with self._cond:
+            if healthy:
+                self._idle.append(agent)
+            else:
+                self._total -= 1; self.discarded += 1
+            self._cond.notify()
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        agent = self._checkout(timeout)
+        try:
+            yield agent
+        except Exception:
+            self._release(agent, healthy=False)
+            raise
+        self._release(agent, healthy=True)
+
+    def warm(self, background: bool = True) -> Optional[threading.Thread]:
+        """Create one idle session ahead of use, e.g. while the env boots."""
+        def _warm():
+            with self._cond:
+                if self._idle or self._total >= self.max_size:
+                    return
+                self._total += 1
+            try:
+                agent = self._create()
+            except Exception:
+                with self._cond:
+                    self._total -= 1; self._cond.notify()
+                return
+            self._release(agent, healthy=True)
+        if not self.available():
+            return None
+        if not background:
+            _warm(); return None
+        t = threading.Thread(target=_warm, name="agent-s-warm", daemon=True)
+        t.start()
+        return t
+
+_DEFAULT: Optional[AgentSSessionPool] = None
+_DEFAULT_LOCK = threading.Lock()
+
+def default_pool() -> AgentSSessionPool:
+    """Process-wide pool, so sessions survive across PlannerAgent instances (goals)."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = AgentSSessionPool()
+        return _DEFAULT
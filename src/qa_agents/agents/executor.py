@@ -1,34 +1,50 @@
 from __future__ import annotations
 from .base import Agent
-from ..utils.schemas import Action, ActionResult, Observation
+from ..envs.env_pool import take_reset_obs
+from ..planning.compiler import WIFI, CompiledStep, index_for
+from ..utils.schemas import ActionResult, AnyObservation, FastActionResult
+from ..utils.tracing import span
+from ..utils.waits import wait_until
 
 class Executor(Agent):
-    def __init__(self, env) -> None:
+    def __init__(self, env, condition_waits: bool = True) -> None:
         self.env = env
-        self.obs: Observation = self.env.reset()
+        self.targets = index_for(env)
+        # Wait steps with a condition poll env.observe() instead of sleeping (when the env can observe).
+        self._observe = getattr(env, "observe", None) if condition_waits else None
+        self.waits = {"condition": 0, "met": 0, "budget_s": 0.0, "waited_s": 0.0, "saved_s": 0.0}
+        # A pooled env comes back already reset on release; only reset envs that are not fresh.
+        obs = take_reset_obs(env)
+        self.obs: AnyObservation = obs if obs is not None else self.env.reset()
 
     def execute(self, intent: str, target: str|None, params: dict) -> ActionResult:
-        if intent == "toggle" and isinstance(params, dict) and "state" in params:
-            desired = str(params["state"]).strip().lower()
-            desired_bool = True if desired in ("on", "true", "1") else False
-            current = bool(self.obs.info.get("wifi_on"))
-            if target and target.lower() in ["wi‑fi", "wifi"]:
-                if current == desired_bool:
-                    return ActionResult(ok=True, observation=self.obs, message=f"Wi‑Fi already {desired}")
+        """Public one-off step: the validated pydantic result (the step loop uses ``run``)."""
+        return self.run(CompiledStep(intent, target, params, self.targets)).to_model()
 
-        mapping = {
-            "open_app":      lambda: Action(name="open_settings"),
-            "open_settings": lambda: Action(name="open_settings"),
-            "tap":           lambda: Action(name="tap",   target=target),
-            "type":          lambda: Action(name="type",  target=target, params=params),
-            "toggle":        lambda: Action(name="toggle", target=target),
-            "wait":          lambda: Action(name="wait",  params=params),
-        }
-        make = mapping.get(intent)
-        if not make:
-            return ActionResult(ok=False, observation=self.obs, message=f"Unknown intent {intent}")
+    def run(self, op: CompiledStep) -> FastActionResult:
+        """Execute a step compiled against ``self.targets`` (see ``planning.compiler``)."""
+        if op.intent == "toggle" and op.state is not None and op.target == WIFI \
+                and bool(self.obs.info.get("wifi_on")) == op.state:
+            return FastActionResult(ok=True, observation=self.obs, message=f"Wi‑Fi already {str(op.params['state']).strip().lower()}")
+        if op.action is None:
+            return FastActionResult(ok=False, observation=self.obs, message=f"Unknown intent {op.intent}")
+        if op.until is not None and self._observe is not None:
+            return self._wait(op)
 
-        action = make()
-        ok, obs, msg = self.env.step(action)
+        with span("env.step", action=op.action.name):
+            ok, obs, msg = self.env.step(op.action)
         self.obs = obs
-        return ActionResult(ok=ok, observation=obs, message=msg)
+        return FastActionResult(ok=ok, observation=obs, message=msg)
+
+    def _wait(self, op: CompiledStep) -> FastActionResult:
+        """Poll until ``op.until`` holds; the step's fixed ``seconds`` is the deadline. Never fails the step."""
+        budget = float(op.params.get("seconds", 1))
+        with span("wait.until", **op.until.describe()):
+            r = wait_until(self._observe, op.until, budget)
+        self.obs = r.obs
+        w = self.waits
+        w["condition"] += 1; w["met"] += r.ok
+        w["budget_s"] += budget; w["waited_s"] += r.waited_s; w["saved_s"] += max(0.0, budget - r.waited_s)
+        if r.ok:
+            return FastActionResult(ok=True, observation=r.obs, message=f"Waited {r.waited_s:.3f}s until {op.until.describe()}")
+        return FastActionResult(ok=True, observation=r.obs, message=f"Waited {budget:g}s; {op.until.describe()} not met")
@@ -1,19 +1,26 @@
 from __future__ import annotations
-from typing import List, Optional
-import os
+from typing import List, Optional, Tuple
+import json, os
 
 from .base import Agent
-from ..utils.schemas import Plan, PlanStep
-from ..utils.cache import JsonCache
-from ..llm.openai_client import LLMClient
+from ..utils.schemas import Observation, Plan, PlanStep
+from ..planning.rule_planner import rule_suffix_for_goal
+from ..utils.cache import SemanticPlanCache, open_cache
+from ..utils.tracing import span
 
 class Planner(Agent):
     """Planner with LLM-first strategy and rule-based fallback."""
 
-    def __init__(self, use_llm: bool = False, model: Optional[str] = None) -> None:
+    def __init__(self, use_llm: bool = False, model: Optional[str] = None,
+                 similarity: Optional[float] = 0.8) -> None:
         self.use_llm = use_llm
-        self.llm = LLMClient(model=model) if use_llm else None
-        self.cache = JsonCache(os.path.join(".", "logs", "plan_cache.json"))
+        self.llm = None
+        if use_llm:
+            from ..llm.openai_client import LLMClient
+            self.llm = LLMClient(model=model)
+        self.cache = open_cache(os.path.join(".", "logs", "plan_cache.json"))
+        # Paraphrased goals ("Turn WiFi off then back on") reuse the plan of an indexed goal.
+        self.plans = SemanticPlanCache(self.cache, "plan", threshold=similarity)
 
     def _normalize_goal(self, goal: str) -> str:
         g = goal.lower()
@@ -53,26 +60,64 @@ class Planner(Agent):
         return plan
 
     def plan(self, goal: str) -> Plan:
-        # Try cache first
+        with span("planner.plan", llm=self.use_llm):
+            return self._plan(goal)
+
+    def _plan(self, goal: str) -> Plan:
+        plan = self.lookup(goal)
+        return plan if plan is not None else self.generate(goal)
+
+    def lookup(self, goal: str) -> Optional[Plan]:
+        """Cached plan for ``goal`` (exact or similar), or None without planning."""
         key = self.cache.key_from("plan", goal)
-        cached = self.cache.get(key)
-        if cached:
-            steps = [PlanStep(**s) for s in cached.get("steps", [])]
-            plan = Plan(goal=goal, steps=steps)
+        cached = self.plans.get(goal, key)
+        if not cached:
+            return None
+        steps = [PlanStep(**s) for s in cached.get("steps", [])]
+        hit = self.plans.last or {}
+        if hit.get("outcome") == "hit":
+            self.log(f"Loaded plan for similar goal {hit['matched']!r} (similarity {hit['similarity']:.2f}) with", len(steps), "steps")
+        else:
             self.log("Loaded plan from cache with", len(steps), "steps")
-            return plan
+        return Plan(goal=goal, steps=steps)
 
+    def generate(self, goal: str) -> Plan:
+        """Plan ``goal`` without consulting the cache (LLM, then rules) and cache the result."""
+        key = self.cache.key_from("plan", goal)
         # Try LLM
         if self.use_llm and self.llm:
             steps = self.llm.plan(goal)
             if steps:
                 steps_models = [PlanStep(**s) for s in steps]
                 plan = Plan(goal=goal, steps=steps_models)
-                self.cache.set(key, {"goal": goal, "steps": [s.model_dump() for s in steps_models]})
+                self.plans.set(goal, key, {"goal": goal, "steps": [s.model_dump() for s in steps_models]})
                 self.log("Created LLM plan with", len(steps_models), "steps")
                 return plan
 
         # Fallback
         plan = self._rule_plan(goal)
-        self.cache.set(key, {"goal": goal, "steps": [s.model_dump() for s in plan.steps]})
+        self.plans.set(goal, key, {"goal": goal, "steps": [s.model_dump() for s in plan.steps]})
         return plan
+
+    def replan_suffix(self, goal: str, obs: Observation, step_index: int) -> Tuple[Plan, str]:
+        """Plan only the steps still needed from ``obs`` (executed steps are kept).
+
+        Cached by (goal, screen, step index); returns the plan and its source:
+        ``"cache"``, ``"llm"`` or ``"rules"``.
+        """
+        key = self.cache.key_from("suffix", goal, obs.screen, str(step_index))
+        cached = self.cache.get(key)
+        if cached:
+            return Plan(goal=goal, steps=[PlanStep(**s) for s in cached.get("steps", [])]), "cache"
+        steps, source = None, "rules"
+        if self.use_llm and self.llm:
+            context = (f"Current screen: {obs.screen}. UI: {json.dumps(obs.ui_tree, ensure_ascii=False)}. "
+                       f"State: {json.dumps(obs.info, ensure_ascii=False)}. Steps already executed: {step_index}.")
+            steps = self.llm.plan(goal, context=context)
+            source = "llm" if steps else "rules"
+        if not steps:
+            steps = rule_suffix_for_goal(goal, obs.screen)
+        plan = Plan(goal=goal, steps=[PlanStep(**s) for s in steps])
+        self.cache.set(key, {"goal": goal, "screen": obs.screen, "steps": [s.model_dump() for s in plan.steps]})
+        self.log(f"Replanned suffix from screen {obs.screen!r} ({source}) with", len(plan.steps), "steps")
+        return plan, source
@@ -1,17 +1,30 @@
 from __future__ import annotations
+import os
 from .base import Agent
-from typing import List, Dict, Any
-from ..llm.openai_client import LLMClient
+from typing import Iterable, Dict, Any
+from ..utils.tracing import span
 
 class Supervisor(Agent):
     def __init__(self, model: str|None = None) -> None:
-        self.llm = LLMClient(model=model)
+        self.model = model
+        self._llm = None
 
-    def summarize(self, goal: str, log_records: List[Dict[str, Any]]) -> str:
+    @property
+    def llm(self):
+        # Built on first summarize, so mock runs never import the LLM stack up front.
+        if self._llm is None:
+            from ..llm.openai_client import LLMClient
+            from ..utils.cache import open_cache
+            # Same sqlite file as the plan cache; reruns of an identical log skip the LLM call.
+            self._llm = LLMClient(model=self.model, summary_cache=open_cache(os.path.join(".", "logs", "plan_cache.json")))
+        return self._llm
+
+    def summarize(self, goal: str, log_records: Iterable[Dict[str, Any]]) -> str:
         # Try LLM; if not available, fallback to a deterministic summary
         prompt = (
             "You are the QA supervisor. Summarize the run in 5 bullet points: "
             "goal, plan length, bugs detected, recovery actions, final status."
         )
-        text = self.llm.summarize(prompt, log_records, fallback=True)
+        with span("supervisor.summarize"):
+            text = self.llm.summarize(prompt, log_records, fallback=True)
         return text
@@ -1,21 +1,23 @@
 from __future__ import annotations
 from .base import Agent
-from ..utils.schemas import Verification, Observation
+from ..planning.compiler import WIFI, CompiledStep, norm
+from ..utils.schemas import AnyObservation, FastVerification, Verification
 
 class Verifier(Agent):
     def __init__(self, goal: str) -> None:
         self.goal = goal.lower()
+        self._wifi = "wifi" in norm(goal)  # "Wi‑Fi", "WiFi", "wifi"
 
-    def verify_step(self, intent: str, target: str|None, params: dict, obs: Observation) -> Verification:
-        g = self.goal
-        if "wifi" in g:
-            if intent == "toggle" and target and target.lower() in ["wi‑fi", "wifi"]:
-                return Verification(passed=True, reason="Toggled Wi‑Fi")
-            if intent == "verify" and target and target.lower() in ["wi‑fi", "wifi"]:
-                expected = None
-                if isinstance(params, dict) and "expected_state" in params:
-                    expected = str(params["expected_state"]).strip().lower() in ("on", "true", "1")
-                desired = True if expected is None else expected
+    def verify_step(self, intent: str, target: str|None, params: dict, obs: AnyObservation) -> Verification:
+        """Public one-off check: the validated pydantic verdict (the step loop uses ``verify``)."""
+        return self.verify(CompiledStep(intent, target, params), obs).to_model()
+
+    def verify(self, op: CompiledStep, obs: AnyObservation) -> FastVerification:
+        if self._wifi and op.target == WIFI:
+            if op.intent == "toggle":
+                return FastVerification(passed=True, reason="Toggled Wi‑Fi")
+            if op.intent == "verify":
+                desired = True if op.expected is None else op.expected
                 ok = bool(obs.info.get("wifi_on")) == desired
-                return Verification(passed=ok, reason=f"Wi‑Fi desired={desired} actual={obs.info.get('wifi_on')}", need_replan=not ok)
-        return Verification(passed=True, reason="No specific rule")
+                return FastVerification(passed=ok, reason=f"Wi‑Fi desired={desired} actual={obs.info.get('wifi_on')}", need_replan=not ok)
+        return FastVerification(passed=True, reason="No specific rule")
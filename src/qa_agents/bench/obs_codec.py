@@ -0,0 +1,67 @@
+"""Compare action-log size and write time: full observations vs keyframe+delta encoding.
+
+    python -m qa_agents.bench.obs_codec --steps 200 --nodes 400
+"""
+from __future__ import annotations
+import argparse, json, os, random, tempfile, time
+from typing import Any, Dict, List
+
+from ..utils.obs_codec import ObservationEncoder, decode_records
+
+def synthetic_observations(steps: int, nodes: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """An android_world-sized UI tree where each step flips a couple of nodes."""
+    rng = random.Random(seed)
+    tree = {
+        f"node_{i}": {"text": f"Item {i}", "class": "android.widget.TextView",
+                      "bounds": [0, i * 48, 1080, i * 48 + 48], "clickable": i % 3 == 0, "checked": False}
+        for i in range(nodes)
+    }
+    screen, out = "settings", []
+    for s in range(steps):
+        for _ in range(2):
+            i = rng.randrange(nodes)
+            tree = {**tree, f"node_{i}": {**tree[f"node_{i}"], "checked": not tree[f"node_{i}"]["checked"]}}
+        if s % 25 == 24:
+            screen = rng.choice(["settings", "network", "display"])
+        out.append({"screen": screen, "ui_tree": tree, "info": {"step": s, "wifi_on": s % 2 == 0}})
+    return out
+
+def _write(path: str, observations: List[Dict[str, Any]], keyframe_every: int) -> float:
+    enc = ObservationEncoder(keyframe_every=keyframe_every)
+    t0 = time.perf_counter()
+    with open(path, "w", encoding="utf-8") as f:
+        for i, obs in enumerate(observations):
+            payload = {"step_id": i + 1, "intent": "tap", "ok": True}
+            if keyframe_every == 1:
+                payload["observation"] = obs  # current format
+            else:
+                payload["obs"] = enc.encode(obs)
+            f.write(json.dumps({"event": "action", "payload": payload}, ensure_ascii=False) + "\n")
+    return time.perf_counter() - t0
+
+def run(steps: int = 200, nodes: int = 400, keyframe_every: int = 10) -> Dict[str, Any]:
+    observations = synthetic_observations(steps, nodes)
+    results: Dict[str, Any] = {"steps": steps, "nodes": nodes, "keyframe_every": keyframe_every}
+    with tempfile.TemporaryDirectory() as d:
+        for name, k in (("full", 1), ("delta", keyframe_every)):
+            path = os.path.join(d, f"{name}.jsonl")
+            seconds = _write(path, observations, k)
+            results[name] = {"bytes": os.path.getsize(path), "write_s": round(seconds, 4)}
+            if name == "delta":
+                with open(path, encoding="utf-8") as f:
+                    decoded = [r["payload"]["observation"] for r in decode_records(json.loads(l) for l in f)]
+                results["roundtrip_ok"] = decoded == observations
+    results["size_ratio"] = round(results["delta"]["bytes"] / results["full"]["bytes"], 4)
+    results["write_speedup"] = round(results["full"]["write_s"] / max(results["delta"]["write_s"], 1e-9), 2)
+    return results
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--steps", type=int, default=200)
+    ap.add_argument("--nodes", type=int, default=400)
+    ap.add_argument("--keyframe_every", type=int, default=10)
+    args = ap.parse_args()
+    print(json.dumps(run(args.steps, args.nodes, args.keyframe_every), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Recover from a mid-run fault: incremental suffix replanning vs restarting the goal from scratch.
+
+    python -m qa_agents.bench.replan --step_latency 0.05 --llm_latency 0.5
+
+The env is the mock with a per-step latency whose ``fail_at``-th action fails once. The
+planner's LLM is simulated by a fixed delay per planning call.
+"""
+from __future__ import annotations
+import argparse, contextlib, io, json, os, tempfile, time
+from typing import Any, Dict
+
+from ..agents.planner import Planner
+from ..agents.supervisor import Supervisor
+from ..envs.mock_android import MockAndroidEnv
+from ..run_test import run_goal
+
+GOAL = "Toggle Wi‑Fi off and on"
+
+class FaultyEnv(MockAndroidEnv):
+    """MockAndroidEnv whose ``fail_at``-th action (1-based) fails without effect, once."""
+
+    def __init__(self, step_latency: float, fail_at: int) -> None:
+        super().__init__()
+        self.step_latency, self.fail_at, self.steps = step_latency, fail_at, 0
+
+    def step(self, action):
+        time.sleep(self.step_latency)
+        self.steps += 1
+        if self.steps == self.fail_at:
+            return False, self._observe(), "Injected fault"
+        return super().step(action)
+
+class _SlowLLM:
+    """Stands in for LLMClient: each call costs ``latency`` and returns no plan (rules are used)."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency, self.calls = latency, 0
+
+    def plan(self, goal: str, context=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        return None
+
+class _Planner(Planner):
+    """LLM planner (simulated); ``fresh`` bypasses the plan cache, as a from-scratch replan would."""
+
+    def __init__(self, llm: _SlowLLM, fresh: bool = False) -> None:
+        super().__init__(similarity=None)
+        self.use_llm, self.llm, self.fresh = True, llm, fresh
+
+    def plan(self, goal: str):
+        return self.generate(goal) if self.fresh else super().plan(goal)
+
+def _incremental(step_latency: float, llm_latency: float, fail_at: int, logs_dir: str) -> Dict[str, Any]:
+    llm, env = _SlowLLM(llm_latency), FaultyEnv(step_latency, fail_at)
+    t0 = time.perf_counter()
+    res = run_goal(GOAL, env, _Planner(llm), Supervisor(), logs_dir, replan=True)
+    return {"status": res["status"], "seconds": round(time.perf_counter() - t0, 4), "llm_calls": llm.calls,
+            "env_steps": env.steps, "env_resets": 1, "replanning": res["replanning"]}
+
+def _restart(step_latency: float, llm_latency: float, fail_at: int, logs_dir: str, max_attempts: int = 3) -> Dict[str, Any]:
+    llm, env = _SlowLLM(llm_latency), FaultyEnv(step_latency, fail_at)
+    t0 = time.perf_counter()
+    for attempt in range(1, max_attempts + 1):
+        res = run_goal(GOAL, env, _Planner(llm, fresh=attempt > 1), Supervisor(), os.path.join(logs_dir, str(attempt)))
+        if res["status"] == "passed":
+            break
+    return {"status": res["status"], "seconds": round(time.perf_counter() - t0, 4), "llm_calls": llm.calls,
+            "env_steps": env.steps, "env_resets": attempt}
+
+def run(step_latency: float = 0.05, llm_latency: float = 0.5, fail_at: int = 5) -> Dict[str, Any]:
+    """Cold (empty plan cache) and warm (cache filled by the cold run) comparisons."""
+    out: Dict[str, Any] = {"step_latency": step_latency, "llm_latency": llm_latency, "fail_at": fail_at}
+    res: Dict[str, Dict[str, Any]] = {"cold": {}, "warm": {}}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as d, contextlib.redirect_stdout(io.StringIO()):
+        try:
+            for name, strategy in (("incremental", _incremental), ("restart", _restart)):
+                os.makedirs(os.path.join(d, name))
+                os.chdir(os.path.join(d, name))  # each strategy gets its own ./logs plan cache
+                for phase in res:
+                    res[phase][name] = strategy(step_latency, llm_latency, fail_at, os.path.join(phase, "logs"))
+        finally:
+            os.chdir(cwd)
+    for phase, r in res.items():
+        inc, rst = r["incremental"], r["restart"]
+        out[phase] = {**r, "saved_s": round(rst["seconds"] - inc["seconds"], 4),
+                      "llm_calls_saved": rst["llm_calls"] - inc["llm_calls"],
+                      "env_steps_saved": rst["env_steps"] - inc["env_steps"]}
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--step_latency", type=float, default=0.05)
+    ap.add_argument("--llm_latency", type=float, default=0.5)
+    ap.add_argument("--fail_at", type=int, default=5, help="1-based action that fails once")
+    args = ap.parse_args()
+    print(json.dumps(run(args.step_latency, args.llm_latency, args.fail_at), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Cold-start budget for a mock run: import time of the run path plus heavy modules loaded.
+
+    python -m qa_agents.bench.startup --budget_ms 400
+    python -m qa_agents.bench.startup --repeat 5 --top 15 --json benchmarks/startup.json
+
+Each sample is a fresh interpreter (``-X importtime``). Exits 1 when the median import time
+exceeds the budget or a mock run imports any optional heavy dependency.
+"""
+from __future__ import annotations
+import argparse, json, os, statistics, subprocess, sys, tempfile
+from typing import Any, Dict, List, Optional
+
+HEAVY = ("openai", "numpy", "PIL", "imageio", "android_world", "gui_agents", "httpx", "asyncio")
+DEFAULT_BUDGET_MS = 400.0
+
+_CHILD = r"""
+import contextlib, io, json, sys, time
+t0 = time.perf_counter()
+from qa_agents.run_test import make_env, run_goal
+from qa_agents.agents.planner import Planner
+from qa_agents.agents.supervisor import Supervisor
+t1 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    run_goal("Toggle Wi-Fi off and on", make_env("mock", "settings_wifi", False), Planner(), Supervisor(), "run")
+t2 = time.perf_counter()
+heavy = sorted(m for m in HEAVY if m in sys.modules)
+print(json.dumps({"import_ms": (t1 - t0) * 1e3, "run_ms": (t2 - t1) * 1e3, "heavy": heavy}))
+"""
+
+def _src_root() -> str:
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cum_us, name = (p.strip() for p in line[len("import time:"):].split("|", 2))
+        if self_us.isdigit():
+            rows.append({"module": name, "self_ms": int(self_us) / 1e3, "cumulative_ms": int(cum_us) / 1e3})
+    return rows
+
+def sample() -> Dict[str, Any]:
+    """One cold interpreter: import the run path, run one mock goal in a scratch cwd."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [_src_root(), os.environ.get("PYTHONPATH")])))
+    env.pop("OPENAI_API_KEY", None)
+    with tempfile.TemporaryDirectory() as d:
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"HEAVY = {HEAVY!r}\n" + _CHILD],
+                              cwd=d, env=env, capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "startup sample failed")
+    out = json.loads(proc.stdout.strip().splitlines()[-1])
+    out["imports"] = _parse_importtime(proc.stderr)
+    return out
+
+def run(repeat: int = 5, budget_ms: float = DEFAULT_BUDGET_MS, top: int = 10) -> Dict[str, Any]:
+    samples = [sample() for _ in range(repeat)]
+    import_ms = statistics.median(s["import_ms"] for s in samples)
+    heavy = sorted({m for s in samples for m in s["heavy"]})
+    slowest = sorted(samples[-1]["imports"], key=lambda r: r["self_ms"], reverse=True)[:top]
+    return {
+        "import_ms": round(import_ms, 2), "run_ms": round(statistics.median(s["run_ms"] for s in samples), 2),
+        "budget_ms": budget_ms, "heavy_loaded": heavy, "slowest_imports": slowest,
+        "ok": import_ms <= budget_ms and not heavy,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Cold-start import budget for a mock run")
+    ap.add_argument("--budget_ms", type=float, default=DEFAULT_BUDGET_MS)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10, help="Show the N imports with the largest self time")
+    ap.add_argument("--json", default=None, help="Also write the result to this path")
+    args = ap.parse_args(argv)
+    res = run(args.repeat, args.budget_ms, args.top)
+    print(f"import: {res['import_ms']:.1f} ms (budget {res['budget_ms']:.0f} ms)  mock run: {res['run_ms']:.1f} ms")
+    for r in res["slowest_imports"]:
+        print(f"  {r['self_ms']:>8.2f} ms self  {r['cumulative_ms']:>8.2f} ms cum  {r['module']}")
+    if res["heavy_loaded"]:
+        print("heavy modules loaded by a mock run: " + ", ".join(res["heavy_loaded"]))
+    if args.json:
+        d = os.path.dirname(args.json)
+        if d: os.makedirs(d, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    print("OK" if res["ok"] else "OVER BUDGET")
+    return 0 if res["ok"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Micro and end-to-end benchmarks for the planner/executor/env/logging hot paths.
+
+    python -m qa_agents.bench.suite run --out benchmarks/current.json
+    python -m qa_agents.bench.suite compare benchmarks/baseline.json benchmarks/current.json --threshold 0.25
+"""
+from __future__ import annotations
+import argparse, contextlib, datetime, io, itertools, json, os, platform, statistics, sys, tempfile, time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+GOAL = "Toggle Wi‑Fi off and on"
+
+@contextlib.contextmanager
+def _sandbox() -> Iterator[str]:
+    """Run inside a scratch cwd (the planner caches under ./logs) with agent chatter silenced."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as d:
+        os.chdir(d)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield d
+        finally:
+            os.chdir(cwd)
+
+# Each factory returns (op, unit); op runs one unit of work.
+
+def _planner_cache_hit():
+    from ..agents.planner import Planner
+    planner = Planner()
+    planner.plan(GOAL)
+    return lambda: planner.plan(GOAL), "plan"
+
+def _planner_cache_miss():
+    from ..agents.planner import Planner
+    planner, n = Planner(), itertools.count()
+    return lambda: planner.plan(f"{GOAL} #{next(n)}"), "plan"
+
+def _executor_execute():
+    from ..agents.executor import Executor
+    from ..envs.mock_android import MockAndroidEnv
+    ex = Executor(MockAndroidEnv())
+    return lambda: ex.execute("wait", None, {"seconds": 1}), "step"
+
+def _executor_run_compiled():
+    from ..agents.executor import Executor
+    from ..envs.mock_android import MockAndroidEnv
+    from ..planning.compiler import CompiledStep
+    ex = Executor(MockAndroidEnv())
+    op = CompiledStep("wait", None, {"seconds": 1}, ex.targets)
+    return lambda: ex.run(op), "step"
+
+def _mock_env_step():
+    from ..envs.mock_android import MockAndroidEnv
+    from ..utils.schemas import Action
+    env, action = MockAndroidEnv(), Action(name="open_settings")
+    env.reset()
+    return lambda: env.step(action), "step"
+
+def _verifier_verify_step():
+    from ..agents.verifier import Verifier
+    from ..envs.mock_android import MockAndroidEnv
+    verifier, obs = Verifier(goal="toggle wifi"), MockAndroidEnv().reset()
+    return lambda: verifier.verify_step("verify", "Wi‑Fi", {"expected_state": "on"}, obs), "step"
+
+def _verifier_verify_compiled():
+    from ..agents.verifier import Verifier
+    from ..envs.mock_android import MockAndroidEnv
+    from ..planning.compiler import CompiledStep
+    verifier, obs = Verifier(goal="toggle wifi"), MockAndroidEnv().reset()
+    op = CompiledStep("verify", "Wi‑Fi", {"expected_state": "on"})
+    return lambda: verifier.verify(op, obs), "step"
+
+def _logrecord_model_dump():
+    from ..envs.mock_android import MockAndroidEnv
+    from ..utils.schemas import LogRecord
+    obs = MockAndroidEnv().reset()
+    payload = {"step_id": 1, "intent": "tap", "target": "Settings", "ok": True, "message": "", "observation": obs.model_dump()}
+    return lambda: LogRecord(event="action", payload=payload).model_dump(), "record"
+
+def _step_overhead(fast: bool):
+    """Schema work of one run_test step without the env: action, observation, result, verification, two log records."""
+    from ..utils import schemas as S
+    from ..utils.events import EventSink
+    sink = EventSink(os.devnull, flush_every=1 << 30)
+    ui, info = {"toggles": {"Wi‑Fi": True}}, {"wifi_on": True}
+    if fast:
+        def op():
+            action = S.FastAction("toggle", "Wi‑Fi")
+            res = S.FastActionResult(True, S.FastObservation("network", ui, info), "Wi‑Fi set to True")
+            ver = S.FastVerification(True, "Toggled Wi‑Fi")
+            sink.emit("action", {"step_id": 1, "intent": "toggle", "target": action.target, "ok": res.ok,
+                                 "message": res.message, "obs": {"kf": res.observation.model_dump()}})
+            sink.emit("verify", {"step_id": 1, "passed": ver.passed, "reason": ver.reason, "need_replan": ver.need_replan})
+    else:
+        def op():  # the pydantic models, validated and dumped, as every step did before
+            action = S.Action(name="toggle", target="Wi‑Fi")
+            res = S.ActionResult(ok=True, observation=S.Observation(screen="network", ui_tree=ui, info=info),
+                                 message="Wi‑Fi set to True")
+            ver = S.Verification(passed=True, reason="Toggled Wi‑Fi")
+            sink.emit("action", S.LogRecord(event="action", payload={
+                "step_id": 1, "intent": "toggle", "target": action.target, "ok": res.ok, "message": res.message,
+                "obs": {"kf": res.observation.model_dump()}}).model_dump()["payload"])
+            sink.emit("verify", S.LogRecord(event="verify", payload={
+                "step_id": 1, "passed": ver.passed, "reason": ver.reason, "need_replan": ver.need_replan}).model_dump()["payload"])
+    return op, "step"
+
+def _report_build():
+    from ..run_test import build_report
+    records = [{"event": "plan", "payload": {"goal": GOAL}}]
+    for i in range(1, 21):
+        records.append({"event": "action", "payload": {"step_id": i, "intent": "tap", "target": "X", "ok": True}})
+        records.append({"event": "verify", "payload": {"step_id": i, "passed": True, "reason": "ok"}})
+    return lambda: build_report("- summary", records, "passed"), "report"
+
+def _report_stream():
+    from ..agent_s_compat import Message
+    from ..utils.report import StreamingReport
+    report = StreamingReport(os.path.join(os.getcwd(), "agent_s_report.md"))
+    history: List[Any] = []
+
+    def op():
+        history.append(Message("executor", "Executed step", {"executed": {"id": len(history)}, "result": {"ok": True}}))
+        report.append(history)
+    return op, "turn"
+
+def _run_test_goal():
+    from ..agents.planner import Planner
+    from ..agents.supervisor import Supervisor
+    from ..envs.mock_android import MockAndroidEnv
+    from ..run_test import run_goal
+    planner, supervisor, env, n = Planner(), Supervisor(), MockAndroidEnv(), itertools.count()
+    return lambda: run_goal(GOAL, env, planner, supervisor, os.path.join("runs", str(next(n)))), "goal"
+
+def _router_run_goal():
+    from ..pipeline.agent_s_orchestrator import run_agents
+    n = itertools.count()
+    return lambda: run_agents(GOAL, "mock", None, os.path.join("agent_s", str(next(n))), False, "gpt-4o-mini", None), "goal"
+
+BENCHMARKS: Dict[str, Callable[[], Tuple[Callable[[], Any], str]]] = {
+    "planner_plan_cache_hit": _planner_cache_hit,
+    "planner_plan_cache_miss": _planner_cache_miss,
+    "executor_execute": _executor_execute,
+    "executor_run_compiled": _executor_run_compiled,
+    "mock_env_step": _mock_env_step,
+    "verifier_verify_step": _verifier_verify_step,
+    "verifier_verify_compiled": _verifier_verify_compiled,
+    "logrecord_model_dump": _logrecord_model_dump,
+    "step_overhead_models": lambda: _step_overhead(False),
+    "step_overhead_records": lambda: _step_overhead(True),
+    "report_build": _report_build,
+    "report_stream_append": _report_stream,
+    "e2e_run_test": _run_test_goal,
+    "e2e_router_run": _router_run_goal,
+}
+
+def _measure(op: Callable[[], Any], min_time: float, repeat: int) -> List[float]:
+    """Calibrate a loop count that runs for ~min_time, then return ns/op for each repeat."""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number): op()
+        dt = time.perf_counter() - t0
+        if dt >= min_time or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * min_time / max(dt, 1e-9)))
+    samples = [dt * 1e9 / number]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number): op()
+        samples.append((time.perf_counter() - t0) * 1e9 / number)
+    return samples
+
+def run(only: Optional[List[str]] = None, quick: bool = False) -> Dict[str, Any]:
+    min_time, repeat = (0.02, 3) if quick else (0.2, 5)
+    results: Dict[str, Any] = {}
+    for name, factory in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        with _sandbox():
+            op, unit = factory()
+            samples = _measure(op, min_time, repeat)
+        median = statistics.median(samples)
+        results[name] = {"unit": unit, "ns_per_op": round(median, 1), "min_ns": round(min(samples), 1),
+                         "ops_per_sec": round(1e9 / median, 2) if median else None}
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "created": datetime.datetime.now().isoformat(timespec="seconds"), "quick": quick},
+        "results": results,
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.25) -> List[Dict[str, Any]]:
+    """Rows for benchmarks present in both runs; ``regressed`` when current is slower by more than ``threshold``."""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base:
+            continue
+        ratio = cur["ns_per_op"] / base["ns_per_op"] if base["ns_per_op"] else 1.0
+        rows.append({"name": name, "baseline_ns": base["ns_per_op"], "current_ns": cur["ns_per_op"],
+                     "ratio": round(ratio, 3), "regressed": ratio > 1 + threshold})
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="Run benchmarks and write JSON results")
+    r.add_argument("--out", default=None, help=f"Output JSON (e.g. {DEFAULT_BASELINE} to refresh the baseline)")
+    r.add_argument("--only", nargs="*", default=None, choices=sorted(BENCHMARKS))
+    r.add_argument("--quick", action="store_true", help="Shorter timings (smoke test)")
+    c = sub.add_parser("compare", help="Flag regressions of current vs baseline")
+    c.add_argument("baseline", nargs="?", default=DEFAULT_BASELINE)
+    c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown fraction (0.25 = 25%%)")
+    args = ap.parse_args()
+
+    if args.cmd == "run":
+        data = run(args.only, args.quick)
+        for name, res in data["results"].items():
+            print(f"{name:28s} {res['ns_per_op']:>14,.0f} ns/{res['unit']:<7s} {res['ops_per_sec']:>12,.1f} {res['unit']}/s")
+        if args.out:
+            d = os.path.dirname(args.out)
+            if d: os.makedirs(d, exist_ok=True)
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        return
+
+    with open(args.baseline, encoding="utf-8") as f: baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f: current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regressed"] else "ok"
+        print(f"{row['name']:28s} {row['baseline_ns']:>14,.0f} -> {row['current_ns']:>14,.0f} ns  x{row['ratio']:<6} {flag}")
+    if any(row["regressed"] for row in rows):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Summary prompt size: the full JSON log (previous prompt) vs the token-budgeted compaction.
+
+    python -m qa_agents.bench.summary_prompt --steps 10 50 200 1000 --nodes 400
+    python -m qa_agents.bench.summary_prompt --events logs/qa_run.jsonl
+"""
+from __future__ import annotations
+import argparse, json, random, time
+from typing import Any, Dict, List, Optional
+
+from ..llm.compaction import DEFAULT_SUMMARY_TOKENS, compact_text, estimate_tokens
+from ..utils.events import read_events
+from ..utils.obs_codec import decode_records
+from .obs_codec import synthetic_observations
+
+def synthetic_log(steps: int, nodes: int, fail_every: int = 40, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    records: List[Dict[str, Any]] = [{"event": "plan", "payload": {"goal": "Toggle Wi‑Fi off and on", "steps": [
+        {"id": i + 1, "description": "tap", "intent": "tap", "target": f"Item {i}", "params": {}} for i in range(steps)]}}]
+    for i, obs in enumerate(synthetic_observations(steps, nodes, seed)):
+        ok = (i + 1) % fail_every != 0
+        records.append({"event": "action", "payload": {"step_id": i + 1, "intent": "tap", "target": f"Item {rng.randrange(nodes)}",
+                                                       "ok": ok, "message": "Tapped" if ok else "Target not found", "observation": obs}})
+        records.append({"event": "verify", "payload": {"step_id": i + 1, "passed": ok, "reason": "No specific rule" if ok else "Mismatch"}})
+    records.append({"event": "finish", "payload": {"status": "failed" if steps >= fail_every else "passed"}})
+    return records
+
+def measure(records: List[Dict[str, Any]], max_tokens: int = DEFAULT_SUMMARY_TOKENS) -> Dict[str, Any]:
+    before = json.dumps(list(decode_records(records)), indent=2)  # what summarize() used to send
+    t0 = time.perf_counter()
+    after = compact_text(records, max_tokens)
+    seconds = time.perf_counter() - t0
+    b, a = len(before.encode("utf-8")), len(after.encode("utf-8"))
+    return {"records": len(records), "before_bytes": b, "after_bytes": a, "ratio": round(a / b, 5),
+            "before_tokens_est": estimate_tokens(before), "after_tokens_est": estimate_tokens(after),
+            "compact_ms": round(seconds * 1e3, 3)}
+
+def run(steps: List[int], nodes: int = 400, max_tokens: int = DEFAULT_SUMMARY_TOKENS,
+        events: Optional[str] = None) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"max_tokens": max_tokens}
+    if events:
+        results[events] = measure(list(read_events(events)), max_tokens)
+        return results
+    for n in steps:
+        results[f"steps={n}"] = measure(synthetic_log(n, nodes), max_tokens)
+    return results
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--steps", type=int, nargs="+", default=[10, 50, 200, 1000])
+    ap.add_argument("--nodes", type=int, default=400)
+    ap.add_argument("--max_tokens", type=int, default=DEFAULT_SUMMARY_TOKENS)
+    ap.add_argument("--events", default=None, help="Measure a recorded qa_run.jsonl instead of synthetic logs")
+    args = ap.parse_args()
+    print(json.dumps(run(args.steps, args.nodes, args.max_tokens, args.events), indent=2))
+
+if __name__ == "__main__":
+    main()
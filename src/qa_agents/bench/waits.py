@@ -0,0 +1,65 @@
+"""Suite wall time with fixed sleeps vs condition-based waits on a mock device that settles slowly.
+
+    python -m qa_agents.bench.waits --goals 5 --settle 0.15 --wait 1.0
+
+Each goal navigates to the Wi‑Fi toggle with a ``wait`` after every action. The mock's UI is
+empty (and taps fail) for ``settle`` seconds after each action; a fixed wait sleeps ``wait``.
+"""
+from __future__ import annotations
+import argparse, contextlib, io, json, os, tempfile, time
+from typing import Any, Dict
+
+from ..agents.planner import Planner
+from ..agents.supervisor import Supervisor
+from ..envs.mock_android import MockAndroidEnv
+from ..run_suite import wait_totals
+from ..run_test import run_goal
+from ..utils.schemas import Plan, PlanStep
+
+GOAL = "Toggle Wi‑Fi off and on"
+
+class _WaitingPlanner(Planner):
+    def __init__(self, wait_s: float) -> None:
+        super().__init__(similarity=None)
+        self.wait_s = wait_s
+
+    def plan(self, goal: str) -> Plan:
+        steps = [("open_settings", None, {}), ("wait", None, {"seconds": self.wait_s}),
+                 ("tap", "Network & Internet", {}), ("wait", None, {"seconds": self.wait_s}),
+                 ("toggle", "Wi‑Fi", {}), ("wait", None, {"seconds": self.wait_s}),
+                 ("toggle", "Wi‑Fi", {}), ("wait", None, {"seconds": self.wait_s}),
+                 ("verify", "Wi‑Fi", {"expected_state": "on"})]
+        return Plan(goal=goal, steps=[PlanStep(id=i + 1, description=f"{s[0]} {s[1] or ''}".strip(), intent=s[0],
+                                               target=s[1], params=s[2]) for i, s in enumerate(steps)])
+
+def _suite(goals: int, settle: float, wait_s: float, condition_waits: bool, logs_dir: str) -> Dict[str, Any]:
+    planner, supervisor, env = _WaitingPlanner(wait_s), Supervisor(), MockAndroidEnv(settle_s=settle)
+    t0 = time.perf_counter()
+    results = [run_goal(GOAL, env, planner, supervisor, os.path.join(logs_dir, str(i)), condition_waits=condition_waits)
+               for i in range(goals)]
+    return {"seconds": round(time.perf_counter() - t0, 4), "passed": sum(r["status"] == "passed" for r in results),
+            "waits": wait_totals(results)}
+
+def run(goals: int = 5, settle: float = 0.15, wait_s: float = 1.0) -> Dict[str, Any]:
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as d, contextlib.redirect_stdout(io.StringIO()):
+        os.chdir(d)  # the planner caches under ./logs
+        try:
+            fixed = _suite(goals, settle, wait_s, False, os.path.join(d, "fixed"))
+            condition = _suite(goals, settle, wait_s, True, os.path.join(d, "condition"))
+        finally:
+            os.chdir(cwd)
+    return {"goals": goals, "settle_s": settle, "wait_s": wait_s, "fixed": fixed, "condition": condition,
+            "saved_s": round(fixed["seconds"] - condition["seconds"], 4),
+            "speedup": round(fixed["seconds"] / condition["seconds"], 2) if condition["seconds"] else None}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--goals", type=int, default=5)
+    ap.add_argument("--settle", type=float, default=0.15, help="Seconds the mock UI takes to settle after an action")
+    ap.add_argument("--wait", type=float, default=1.0, help="Fixed delay of each wait step (the condition deadline)")
+    args = ap.parse_args()
+    print(json.dumps(run(args.goals, args.settle, args.wait), indent=2))
+
+if __name__ == "__main__":
+    main()
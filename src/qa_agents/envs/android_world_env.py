@@ -1,14 +1,17 @@
 from __future__ import annotations
-from typing import Any, Dict, Tuple
-import numpy as np
+from typing import TYPE_CHECKING, Any, Dict, Tuple
 
 from ..utils.schemas import Observation, Action
 
+if TYPE_CHECKING:
+    import numpy as np
+
 class AndroidWorldEnv:
     """
     Drop-in wrapper exposing the SAME interface as MockAndroidEnv:
       - reset() -> Observation
       - step(Action) -> (ok: bool, Observation, message: str)
+      - observe() -> Observation          # current screen, no action (condition waits)
       - render() -> np.ndarray (H, W, 3)  # optional
     Internally, it proxies to the real AndroidEnv/android_world.
     """
@@ -38,9 +41,43 @@ class AndroidWorldEnv:
         info = raw.get("info", {})
         return Observation(screen=screen, ui_tree=ui_tree, info=info)
 
+    def _state_to_struct(self, state: Any) -> Observation:
+        """An android_world ``State`` (``ui_elements``) as an Observation: labels and checkable states."""
+        labels, toggles = [], {}
+        for el in getattr(state, "ui_elements", None) or []:
+            label = getattr(el, "text", None) or getattr(el, "content_description", None)
+            if not label:
+                continue
+            if getattr(el, "is_checkable", False):
+                toggles[label] = bool(getattr(el, "is_checked", False))
+            else:
+                labels.append(label)
+        prev = self._last_obs
+        return Observation(screen=prev.screen if prev is not None else self.task_name,
+                           ui_tree={"list": labels, "toggles": toggles}, info=dict(prev.info) if prev is not None else {})
+
+    def observe(self) -> Observation:
+        """The current screen without acting (what a condition wait polls).
+
+        Uses the backend's ``observe()``, else its read-only ``get_state()``, else a zero-second
+        ``wait`` step, which every backend of this wrapper accepts and which leaves the UI as is.
+        """
+        get = getattr(self._env, "observe", None)
+        if get is not None:
+            obs = self._obs_to_struct(get())
+        elif hasattr(self._env, "get_state"):
+            obs = self._state_to_struct(self._env.get_state())
+        else:
+            _, raw, _ = self._env.step({"op": "wait", "seconds": 0})
+            obs = self._obs_to_struct(raw)
+        self._last_obs = obs
+        return obs
+
     def reset(self) -> Observation:
         raw = self._env.reset()
-        return self._obs_to_struct(raw)
+        # A pooled env is reset between goals: never carry the previous goal's screen/info over.
+        self._last_obs = self._obs_to_struct(raw)
+        return self._last_obs
 
     def step(self, action: Action) -> Tuple[bool, Observation, str]:
         """
@@ -81,6 +118,10 @@ class AndroidWorldEnv:
         except Exception as e:
             raise RuntimeError(f"render() failed: {e}")
 
+    def close(self) -> None:
+        close = getattr(self._env, "close", None)
+        if close: close()
+
     _last_obs: Observation | None = None
     def _last_obs_or_reset(self) -> Observation:
         if self._last_obs is not None:
@@ -0,0 +1,99 @@
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .mock_android import MockAndroidEnv
+from ..planning.compiler import WIFI
+from ..utils.schemas import Action, FastObservation
+
+SCREENS = ("home", "settings", "network")
+HOME, SETTINGS, NETWORK = 0, 1, 2
+
+OPS = ("open_settings", "tap", "toggle", "type", "wait")
+OP_OPEN, OP_TAP, OP_TOGGLE, OP_TYPE, OP_WAIT, OP_UNKNOWN = 0, 1, 2, 3, 4, 5
+
+# Target classes of the canonical names MockAndroidEnv acts on (aliases resolve via its index).
+T_OTHER, T_SETTINGS, T_NETWORK, T_WIFI = 0, 1, 2, 3
+_TARGETS = {"Settings": T_SETTINGS, "Network & Internet": T_NETWORK, WIFI: T_WIFI}
+
+(M_OPENED, M_TAPPED_SETTINGS, M_OPENED_NETWORK, M_TAP_FAILED, M_WIFI_SET,
+ M_TOGGLE_FAILED, M_TYPE, M_WAITED, M_UNKNOWN) = range(9)
+
+def encode_actions(actions: Sequence[Action]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode one Action per env into (op, target) int8 arrays."""
+    op_index = {name: i for i, name in enumerate(OPS)}
+    resolve = MockAndroidEnv.targets.resolve
+    ops = np.fromiter((op_index.get(a.name, OP_UNKNOWN) for a in actions), dtype=np.int8, count=len(actions))
+    targets = np.fromiter((_TARGETS.get(resolve(a.target), T_OTHER) for a in actions),
+                          dtype=np.int8, count=len(actions))
+    return ops, targets
+
+class BatchedMockAndroidEnv:
+    """N MockAndroidEnv states held as NumPy arrays and stepped with one vectorized call.
+
+    ``step(ops, targets)`` takes encoded actions (see ``encode_actions``) and returns
+    per-env ok flags. Observations and messages are built on demand and match
+    MockAndroidEnv exactly; ``step_actions`` does encode/step/decode in one go.
+    """
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.screen = np.zeros(n, dtype=np.int8)
+        self.wifi_on = np.ones(n, dtype=bool)
+        self._msg = np.full(n, M_UNKNOWN, dtype=np.int8)
+        self._tap_screen = np.zeros(n, dtype=np.int8)
+
+    def reset(self) -> None:
+        self.screen[:] = HOME
+        self.wifi_on[:] = True
+
+    def step(self, ops: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        screen = self.screen
+        is_tap, is_toggle = ops == OP_TAP, ops == OP_TOGGLE
+        tap_settings = is_tap & (screen == HOME) & (targets == T_SETTINGS)
+        tap_network = is_tap & (screen == SETTINGS) & (targets == T_NETWORK)
+        toggle_ok = is_toggle & (screen == NETWORK) & (targets == T_WIFI)
+        tap_failed = is_tap & ~(tap_settings | tap_network)
+
+        self._msg = np.select(
+            [ops == OP_OPEN, tap_settings, tap_network, tap_failed, toggle_ok, is_toggle, ops == OP_TYPE, ops == OP_WAIT],
+            [M_OPENED, M_TAPPED_SETTINGS, M_OPENED_NETWORK, M_TAP_FAILED, M_WIFI_SET, M_TOGGLE_FAILED, M_TYPE, M_WAITED],
+            default=M_UNKNOWN,
+        ).astype(np.int8)
+        self._tap_screen = screen.copy()
+
+        screen[(ops == OP_OPEN) | tap_settings] = SETTINGS
+        screen[tap_network] = NETWORK
+        self.wifi_on ^= toggle_ok
+        return ~(tap_failed | (is_toggle & ~toggle_ok) | (ops == OP_UNKNOWN))
+
+    def observe(self, i: int) -> FastObservation:
+        screen = SCREENS[self.screen[i]]
+        wifi = bool(self.wifi_on[i])
+        ui = {}
+        if screen == "home":
+            ui = {"buttons":["Settings"]}
+        elif screen == "settings":
+            ui = {"list":["Network & Internet","Display","Battery"]}
+        elif screen == "network":
+            ui = {"toggles":{"Wi‑Fi": wifi}}
+        return FastObservation(screen, ui, {"wifi_on": wifi})
+
+    def message(self, i: int, action: Optional[Action] = None) -> str:
+        """Message of env ``i``'s last step; ``action`` supplies names/targets quoted in failure text."""
+        code = self._msg[i]
+        if code == M_OPENED: return "Opened Settings"
+        if code == M_TAPPED_SETTINGS: return "Tapped Settings"
+        if code == M_OPENED_NETWORK: return "Opened Network & Internet"
+        if code == M_TAP_FAILED:
+            return f"Tap failed on screen={SCREENS[self._tap_screen[i]]} target={action.target if action else None}"
+        if code == M_WIFI_SET: return f"Wi‑Fi set to {bool(self.wifi_on[i])}"
+        if code == M_TOGGLE_FAILED: return "Toggle failed"
+        if code == M_TYPE: return "Type has no effect in mock"
+        if code == M_WAITED: return "Waited"
+        return f"Unknown action {action.name if action else None}"
+
+    def step_actions(self, actions: Sequence[Action]) -> Tuple[np.ndarray, List[FastObservation], List[str]]:
+        ok = self.step(*encode_actions(actions))
+        return ok, [self.observe(i) for i in range(self.n)], [self.message(i, a) for i, a in enumerate(actions)]
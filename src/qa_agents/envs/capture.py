@@ -0,0 +1,156 @@
+from __future__ import annotations
+import hashlib, os, queue, select, struct, subprocess, threading, time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+@dataclass
+class Frame:
+    rgb: np.ndarray          # (H, W, 3) uint8 view over the raw RGBA buffer
+    digest: str
+    duplicate: bool = False  # same pixels as the previous capture; no decode was done
+    latency_ms: float = 0.0
+
+@dataclass
+class CaptureStats:
+    captures: int = 0
+    duplicates: int = 0
+    failures: int = 0
+    latencies_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def summary(self) -> Dict[str, float]:
+        lat: List[float] = sorted(self.latencies_ms)
+        pick = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] if lat else 0.0
+        return {"captures": self.captures, "duplicates": self.duplicates, "failures": self.failures,
+                "mean_ms": round(sum(lat) / len(lat), 3) if lat else 0.0,
+                "p50_ms": round(pick(0.5), 3), "p95_ms": round(pick(0.95), 3)}
+
+class _PipeReader(threading.Thread):
+    """Pumps a pipe into a queue so reads can time out where select() does not take pipes (Windows)."""
+
+    def __init__(self, fd: int) -> None:
+        super().__init__(name="screencap-reader", daemon=True)
+        self.fd = fd
+        self.chunks: "queue.Queue[bytes]" = queue.Queue()
+        self._pending = b""
+
+    def run(self) -> None:
+        try:
+            while True:
+                chunk = os.read(self.fd, 1 << 20)
+                self.chunks.put(chunk)
+                if not chunk:
+                    return
+        except OSError:
+            self.chunks.put(b"")
+
+    def read_exact(self, n: int, deadline: float) -> bytes:
+        buf = bytearray(self._pending)
+        while len(buf) < n:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise queue.Empty
+                chunk = self.chunks.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError("screencap timed out") from None
+            if not chunk:
+                raise EOFError("adb channel closed")
+            buf += chunk
+        self._pending = bytes(buf[n:])
+        return bytes(buf[:n])
+
+class ScreenCapture:
+    """Raw screencap over one long-lived ``adb exec-out sh`` channel.
+
+    Each capture writes ``screencap`` to the shell and reads the raw framebuffer
+    (little-endian header: width, height, format[, colorspace] followed by RGBA8888
+    pixels), so there is no per-shot process fork and no PNG encode/decode. Frames
+    whose bytes hash the same as the previous one are returned as duplicates of it.
+    ``header_size`` is 16 on Android 9+ and 12 on older images. Each capture must finish
+    within ``timeout`` seconds: reads wait in select() on POSIX and on a reader thread's
+    queue elsewhere.
+    """
+
+    BYTES_PER_PIXEL = {1: 4, 2: 4}  # RGBA_8888, RGBX_8888
+    SELECT_PIPES = os.name == "posix"
+
+    def __init__(self, adb: str = "adb", serial: Optional[str] = None, timeout: float = 5.0, header_size: int = 16):
+        self.cmd = [adb] + (["-s", serial] if serial else []) + ["exec-out", "sh"]
+        self.timeout = timeout
+        self.header_size = header_size
+        self.stats = CaptureStats()
+        self._proc: Optional[subprocess.Popen] = None
+        self._reader: Optional[_PipeReader] = None
+        self._last: Optional[Frame] = None
+        self._lock = threading.Lock()
+
+    def _channel(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                          stderr=subprocess.DEVNULL, bufsize=0)
+            if not self.SELECT_PIPES:
+                self._reader = _PipeReader(self._proc.stdout.fileno())
+                self._reader.start()
+        return self._proc
+
+    def _read_exact(self, proc: subprocess.Popen, n: int, deadline: float) -> bytes:
+        if self._reader is not None:
+            return self._reader.read_exact(n, deadline)
+        fd = proc.stdout.fileno()
+        chunks, got = [], 0
+        while got < n:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError("screencap timed out")
+            chunk = os.read(fd, min(n - got, 1 << 20))
+            if not chunk:
+                raise EOFError("adb channel closed")
+            chunks.append(chunk); got += len(chunk)
+        return b"".join(chunks)
+
+    def _grab(self) -> Frame:
+        proc = self._channel()
+        deadline = time.monotonic() + self.timeout
+        proc.stdin.write(b"screencap\n"); proc.stdin.flush()
+        header = self._read_exact(proc, self.header_size, deadline)
+        width, height, fmt = struct.unpack_from("<III", header)
+        bpp = self.BYTES_PER_PIXEL.get(fmt)
+        if bpp is None:
+            raise ValueError(f"Unsupported screencap pixel format {fmt}")
+        raw = self._read_exact(proc, width * height * bpp, deadline)
+        digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        if self._last is not None and self._last.digest == digest:
+            return Frame(self._last.rgb, digest, duplicate=True)
+        import numpy as np
+        rgb = np.frombuffer(raw, dtype=np.uint8).reshape(height, width, bpp)[..., :3]
+        return Frame(rgb, digest)
+
+    def capture(self) -> Optional[Frame]:
+        """Return the current screen, or None if the device could not be read."""
+        with self._lock:
+            t0 = time.perf_counter()
+            try:
+                frame = self._grab()
+            except Exception:
+                self.stats.failures += 1
+                self.close()  # respawn the channel on the next call
+                return None
+            frame.latency_ms = (time.perf_counter() - t0) * 1000.0
+            self.stats.captures += 1
+            self.stats.duplicates += frame.duplicate
+            self.stats.latencies_ms.append(frame.latency_ms)
+            self._last = frame
+            return frame
+
+    def close(self) -> None:
+        if self._proc is not None:
+            try:
+                self._proc.kill(); self._proc.wait(timeout=1)
+            except Exception:
+                pass
+            self._proc = None
+            self._reader = None  # it sees EOF from the killed channel and exits
@@ -0,0 +1,166 @@
+from __future__ import annotations
+import threading, weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+Key = Tuple[str, bool]  # (task, enable_render)
+
+def boot_android_world(task: str, enable_render: bool) -> Any:
+    from .android_world_env import AndroidWorldEnv
+    return AndroidWorldEnv(task_name=task, enable_render=enable_render)
+
+def _reset(env: Any) -> Any:
+    return env.reset()
+
+# Observation of the reset done when an env was released: the next Executor starts from it
+# instead of resetting the device a second time (see ``take_reset_obs``).
+_READY: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+
+def take_reset_obs(env: Any) -> Optional[Any]:
+    """The observation of the pool's reset of ``env``, once; None when the env is not freshly reset."""
+    try:
+        return _READY.pop(env, None)
+    except TypeError:  # not weak-referenceable: never pooled
+        return None
+
+def _close(env: Any) -> None:
+    try:
+        close = getattr(env, "close", None)
+        if close: close()
+    except Exception:
+        pass
+
+class EnvPool:
+    """Warm envs keyed by (task, enable_render), leased out one goal at a time.
+
+    Booting a device env is the slow part of a run, so envs outlive goals: on release an env
+    is reset (``health_check``, by default a plain ``reset()``) and parked idle for the next
+    lease of the same key. When the check returns the reset observation, the next lease hands
+    it over (``take_reset_obs``) and the Executor skips its own reset. An env whose lease raised, or whose reset fails, is closed and
+    dropped; the next lease boots a replacement. At most ``max_per_key`` envs exist per key;
+    extra callers wait.
+    """
+
+    def __init__(self, factory: Callable[[str, bool], Any] = boot_android_world, max_per_key: int = 1,
+                 health_check: Callable[[Any], Any] = _reset) -> None:
+        self.factory = factory
+        self.max_per_key = max(1, max_per_key)
+        self.health_check = health_check
+        self._idle: Dict[Key, List[Any]] = {}
+        self._total: Dict[Key, int] = {}
+        self._keys: Dict[int, Key] = {}
+        self._cond = threading.Condition()
+        self.booted = 0
+        self.reused = 0
+        self.recycled = 0
+
+    def _boot(self, key: Key) -> Any:
+        try:
+            env = self.factory(*key)
+        except Exception:
+            with self._cond:
+                self._total[key] -= 1; self._cond.notify_all()
+            raise
+        with self._cond:
+            self.booted += 1
+            self._keys[id(env)] = key
+        return env
+
+    def checkout(self, task: str, enable_render: bool = False, timeout: Optional[float] = None) -> Any:
+        """Take an idle env for ``task`` or boot one; pair with ``release`` (or use ``lease``)."""
+        key = (task, enable_render)
+        with self._cond:
+            while True:
+                idle = self._idle.get(key)
+                if idle:
+                    self.reused += 1
+                    return idle.pop()
+                if self._total.get(key, 0) < self.max_per_key:
+                    self._total[key] = self._total.get(key, 0) + 1
+                    break
+                if not self._cond.wait(timeout):
+                    raise TimeoutError(f"No env for task {task!r} became available")
+        return self._boot(key)
+
+    def release(self, env: Any, healthy: bool = True) -> None:
+        """Return a leased env; it is reset and parked, or recycled when unhealthy or the reset fails."""
+        key = self._keys[id(env)]
+        checked: Any = False
+        if healthy:
+            try:
+                checked = self.health_check(env)
+            except Exception:
+                checked = False
+            healthy = bool(checked)
+        if healthy and checked is not True:
+            _READY[env] = checked
+        else:
+            _READY.pop(env, None)
+        if not healthy:
+            _close(env)
+        with self._cond:
+            if healthy:
+                self._idle.setdefault(key, []).append(env)
+            else:
+                del self._keys[id(env)]
+                self._total[key] -= 1; self.recycled += 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def lease(self, task: str, enable_render: bool = False, timeout: Optional[float] = None) -> Iterator[Any]:
+        env = self.checkout(task, enable_render, timeout)
+        try:
+            yield env
+        except Exception:
+            self.release(env, healthy=False)
+            raise
+        self.release(env)
+
+    def warm(self, task: str, enable_render: bool = False, background: bool = True) -> Optional[threading.Thread]:
+        """Boot one idle env for the key ahead of its first lease (no-op when one exists)."""
+        key = (task, enable_render)
+
+        def _warm():
+            with self._cond:
+                if self._idle.get(key) or self._total.get(key, 0) >= self.max_per_key:
+                    return
+                self._total[key] = self._total.get(key, 0) + 1
+            try:
+                env = self._boot(key)
+            except Exception:
+                return
+            with self._cond:
+                self._idle.setdefault(key, []).append(env); self._cond.notify_all()
+        if not background:
+            _warm(); return None
+        t = threading.Thread(target=_warm, name="env-warm", daemon=True)
+        t.start()
+        return t
+
+    def close(self) -> None:
+        """Close and drop every idle env."""
+        with self._cond:
+            envs = [env for idle in self._idle.values() for env in idle]
+            for key, idle in self._idle.items():
+                self._total[key] -= len(idle)
+            self._idle.clear()
+            for env in envs:
+                self._keys.pop(id(env), None)
+        for env in envs:
+            _close(env)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"booted": self.booted, "reused": self.reused, "recycled": self.recycled,
+                    "idle": sum(len(v) for v in self._idle.values())}
+
+_DEFAULT: Optional[EnvPool] = None
+_DEFAULT_LOCK = threading.Lock()
+
+def default_env_pool() -> EnvPool:
+    """Process-wide pool, so device envs survive across goals and runner calls."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = EnvPool()
+        return _DEFAULT
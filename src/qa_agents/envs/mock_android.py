@@ -1,51 +1,90 @@
 from __future__ import annotations
+import time
 from typing import Dict, Any
 from .types import EnvLike
-from ..utils.schemas import Observation, Action
+from ..planning.compiler import COMMON_TARGETS, WIFI, TargetIndex
+from ..utils.schemas import Action, FastObservation
 
 class MockAndroidEnv(EnvLike):
     """A tiny mock of Android UI for a Wi‑Fi toggle task.
     Screens: home -> settings -> network
     State: wifi_on: bool
+    Snapshots share the state dict until the next write (copy-on-write).
+
+    ``settle_s`` > 0 simulates a device: after each action the UI renders empty for that long,
+    taps/toggles in that window fail, and ``wait`` sleeps its full ``seconds``.
     """
-    def __init__(self) -> None:
+    # The whole UI vocabulary; targets are matched through it (see planning.compiler).
+    targets = TargetIndex({**COMMON_TARGETS, "Display": (), "Battery": ()})
+
+    def __init__(self, settle_s: float = 0.0) -> None:
         self.state = {"screen":"home", "wifi_on": True}
+        self._shared = False
+        self.settle_s = settle_s
+        self._settled_at = 0.0
 
-    def reset(self) -> Observation:
+    def reset(self) -> FastObservation:
         self.state = {"screen":"home", "wifi_on": True}
+        self._shared = False
+        return self._observe()
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._shared = True
+        return self.state
+
+    def restore(self, snap: Dict[str, Any]) -> FastObservation:
+        self.state = snap
+        self._shared = True
+        return self._observe()
+
+    def _writable(self) -> Dict[str, Any]:
+        if self._shared:
+            self.state = dict(self.state)
+            self._shared = False
+        return self.state
+
+    def _settling(self) -> bool:
+        return self.settle_s > 0 and time.monotonic() < self._settled_at
+
+    def observe(self) -> FastObservation:
+        """The current screen without acting (what a condition wait polls)."""
         return self._observe()
 
-    def _observe(self) -> Observation:
+    def _observe(self) -> FastObservation:
         screen = self.state["screen"]
         ui = {}
-        if screen == "home":
+        if self._settling():
+            pass  # still rendering
+        elif screen == "home":
             ui = {"buttons":["Settings"]}
         elif screen == "settings":
             ui = {"list":["Network & Internet","Display","Battery"]}
         elif screen == "network":
             ui = {"toggles":{"Wi‑Fi": self.state["wifi_on"]}}
-        return Observation(screen=screen, ui_tree=ui, info={"wifi_on": self.state["wifi_on"]})
+        return FastObservation(screen, ui, {"wifi_on": self.state["wifi_on"]})
 
     def step(self, action: Action):
         ok = True
         msg = ""
+        if action.name in ("tap", "toggle") and self._settling():
+            return False, self._observe(), f"{action.name.capitalize()} failed: UI not settled on screen={self.state['screen']}"
         if action.name == "open_settings":
-            self.state["screen"] = "settings"
+            self._writable()["screen"] = "settings"
             msg = "Opened Settings"
         elif action.name == "tap":
-            target = (action.target or "").lower()
-            if self.state["screen"] == "home" and target == "settings":
-                self.state["screen"] = "settings"
+            target = self.targets.resolve(action.target)
+            if self.state["screen"] == "home" and target == "Settings":
+                self._writable()["screen"] = "settings"
                 msg = "Tapped Settings"
-            elif self.state["screen"] == "settings" and target in ["network & internet","network","internet"]:
-                self.state["screen"] = "network"
+            elif self.state["screen"] == "settings" and target == "Network & Internet":
+                self._writable()["screen"] = "network"
                 msg = "Opened Network & Internet"
             else:
                 ok = False
                 msg = f"Tap failed on screen={self.state['screen']} target={action.target}"
         elif action.name == "toggle":
-            if self.state["screen"] == "network" and (action.target or "").lower() in ["wifi","wi‑fi"]:
-                self.state["wifi_on"] = not self.state["wifi_on"]
+            if self.state["screen"] == "network" and self.targets.resolve(action.target) == WIFI:
+                self._writable()["wifi_on"] = not self.state["wifi_on"]
                 msg = f"Wi‑Fi set to {self.state['wifi_on']}"
             else:
                 ok = False
@@ -53,9 +92,13 @@ class MockAndroidEnv(EnvLike):
         elif action.name == "type":
             msg = "Type has no effect in mock"
         elif action.name == "wait":
+            if self.settle_s > 0:
+                time.sleep(float(action.params.get("seconds", 1)))
             msg = "Waited"
         else:
             ok = False
             msg = f"Unknown action {action.name}"
 
+        if ok and self.settle_s > 0 and action.name != "wait":
+            self._settled_at = time.monotonic() + self.settle_s
         return ok, self._observe(), msg
@@ -0,0 +1,47 @@
+from __future__ import annotations
+from typing import Any, Dict
+from .mock_android import MockAndroidEnv
+from ..utils.schemas import Action
+
+class MockEnv:
+    """Dict-op facade over MockAndroidEnv for the Agent-S pipeline.
+
+    ``step({"op": ...})`` returns ``{"ok": bool, "message": str, "observation": {...}}``
+    plus an ``"error"`` key when the op failed, which is what ``execute_action`` and
+    ``VerifierAgent`` consume.
+    """
+    def __init__(self) -> None:
+        self._env = MockAndroidEnv()
+        self.obs = self._env.reset()
+
+    def reset(self) -> Dict[str, Any]:
+        self.obs = self._env.reset()
+        return {"ok": True, "message": "Reset", "observation": self.obs.model_dump()}
+
+    def _result(self, ok: bool, msg: str) -> Dict[str, Any]:
+        out = {"ok": ok, "message": msg, "observation": self.obs.model_dump()}
+        if not ok: out["error"] = msg
+        return out
+
+    def step(self, op: Dict[str, Any]) -> Dict[str, Any]:
+        kind = op.get("op")
+        if kind == "open_app":
+            action = Action(name="open_settings")
+        elif kind == "tap":
+            action = Action(name="tap", target=op.get("target"))
+        elif kind == "toggle":
+            if "state" in op:
+                desired = str(op["state"]).strip().lower() in ("on", "true", "1")
+                if bool(self.obs.info.get("wifi_on")) == desired:
+                    return self._result(True, f"Wi‑Fi already {op['state']}")
+            action = Action(name="toggle", target=op.get("target"))
+        elif kind == "verify":
+            expected = str(op.get("expected_state", "on")).strip().lower() in ("on", "true", "1")
+            actual = bool(self.obs.info.get("wifi_on"))
+            return self._result(actual == expected, f"Wi‑Fi expected={expected} actual={actual}")
+        elif kind == "scroll":
+            return self._result(True, f"Scrolled {op.get('direction', 'down')}")
+        else:
+            return self._result(False, f"Unknown op {kind}")
+        ok, self.obs, msg = self._env.step(action)
+        return self._result(ok, msg)
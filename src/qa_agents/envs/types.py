@@ -1,9 +1,23 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from ..utils.schemas import Observation, Action
+from typing import Any
+from ..utils.schemas import Action, AnyObservation
 
 class EnvLike(ABC):
+    """reset/restore return an observation and step returns ``(ok, observation, message)``.
+
+    Observations may be pydantic ``Observation``s or the slotted ``FastObservation``s the
+    mock envs return; both have the same attributes and ``model_dump()`` output.
+    """
     @abstractmethod
-    def reset(self) -> Observation: ...
+    def reset(self) -> AnyObservation: ...
     @abstractmethod
     def step(self, action: Action): ...
+
+    def snapshot(self) -> Any:
+        """Return an opaque handle to the current state (cheap; copy-on-write where possible)."""
+        raise NotImplementedError(f"{type(self).__name__} does not support snapshots")
+
+    def restore(self, snap: Any) -> AnyObservation:
+        """Return to a state captured by ``snapshot()``; the handle stays valid for reuse."""
+        raise NotImplementedError(f"{type(self).__name__} does not support snapshots")
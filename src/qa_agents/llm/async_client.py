@@ -0,0 +1,180 @@
+from __future__ import annotations
+import asyncio, json, os, random, re, weakref
+from typing import Any, Dict, Iterable, List, Optional
+
+from .compaction import DEFAULT_SUMMARY_TOKENS, compact_text
+
+PLAN_INTENTS = ["open_app","open_settings","tap","type","toggle","wait","verify"]
+
+class LLMError(RuntimeError):
+    """Raised by AsyncLLMClient when a call fails after retries or misses its deadline."""
+
+def _strip_code_fences(text: str) -> str:
+    return re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip(), flags=re.IGNORECASE | re.MULTILINE)
+
+def plan_messages(goal: str, context: Optional[str] = None) -> List[Dict[str, Any]]:
+    system = (
+        "You are a senior mobile QA planner. "
+        "Output ONLY strict JSON with a top-level key 'steps' (no prose). "
+        "Each step must have: id (int), description (str), "
+        "intent one of ['open_app','open_settings','tap','type','toggle','wait','verify'], "
+        "target (str or null), params (object)."
+    )
+    user = (
+        f"Goal: {goal}\n"
+        + (f"{context}\nPlan ONLY the remaining steps, starting from the current screen.\n" if context else "") +
+        "Constraints:\n"
+        "- Prefer minimal steps.\n"
+        "- Use 'open_settings' to open Settings app.\n"
+        "- Use 'tap' for list items like 'Network & Internet'.\n"
+        "- Use 'toggle' for switches like 'Wi‑Fi'.\n"
+        "- End with a 'verify' step when applicable.\n"
+        "Return JSON ONLY:\n"
+        "{\n"
+        "  \"steps\": [\n"
+        "    {\"id\":1, \"description\":\"...\", \"intent\":\"open_settings\", \"target\":null, \"params\":{}},\n"
+        "    {\"id\":2, \"description\":\"...\", \"intent\":\"tap\", \"target\":\"Network & Internet\", \"params\":{}},\n"
+        "    ...\n"
+        "  ]\n"
+        "}\n"
+    )
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+def parse_plan(content: str) -> Optional[List[Dict[str, Any]]]:
+    """Parse and coerce the model's JSON plan; returns None when nothing usable came back.
+
+    Steps are validated as ``PlanStep``s; a malformed reply raises (ValueError, pydantic's
+    ValidationError, TypeError, KeyError or AttributeError), which ``plan`` turns into LLMError.
+    """
+    from ..utils.schemas import PlanStep
+    data = json.loads(_strip_code_fences(content or ""))
+    cleaned = []
+    next_id = 1
+    for s in data.get("steps", []):
+        intent = str(s.get("intent", "")).strip()
+        if intent not in PLAN_INTENTS:
+            continue
+        cleaned.append(PlanStep.model_validate({
+            "id": int(s.get("id", next_id)),
+            "description": str(s.get("description", intent)).strip(),
+            "intent": intent,
+            "target": s.get("target", None),
+            "params": s.get("params", {}) or {},
+        }).model_dump())
+        next_id = cleaned[-1]["id"] + 1
+    return cleaned or None
+
+def summary_messages(instruction: str, compacted: str) -> List[Dict[str, Any]]:
+    content = [
+        {"type":"text","text": instruction},
+        {"type":"text","text": "Here is the compacted JSON log of the run (steps rows follow step_columns):"},
+        {"type":"text","text": compacted},
+    ]
+    return [
+        {"role":"system","content":"You are a concise QA supervisor."},
+        {"role":"user","content": content},
+    ]
+
+# One AsyncOpenAI (and so one pooled HTTP transport) per event loop and credentials/endpoint.
+# Keyed on the loop object itself (not id(), which a later loop can reuse); entries go with the loop.
+_SHARED: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, Any]]" = weakref.WeakKeyDictionary()
+
+class AsyncLLMClient:
+    """asyncio OpenAI client with a concurrency limit, jittered retries and per-call deadlines.
+
+    Retries 429/5xx and connection errors with full-jitter exponential backoff (honouring
+    Retry-After), up to ``max_retries``; ``deadline`` bounds a whole call including retries.
+    Set OPENAI_BASE_URL (or ``base_url``) to point at a compatible server such as
+    ``qa_agents.llm.fake_server``.
+    """
+
+    def __init__(self, model: Optional[str] = None, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_concurrency: int = 8, max_retries: int = 4, deadline: float = 60.0,
+                 backoff: float = 0.5, max_backoff: float = 8.0) -> None:
+        self.api_key = (api_key if api_key is not None else os.getenv("OPENAI_API_KEY", "")).strip()
+        self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sems: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self.calls = 0
+        self.retries = 0
+
+    def _client(self):
+        clients = _SHARED.setdefault(asyncio.get_running_loop(), {})
+        key = (self.api_key, self.base_url)
+        client = clients.get(key)
+        if client is None:
+            from openai import AsyncOpenAI
+            client = clients[key] = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        return client
+
+    def _sem(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._sems.get(loop)
+        if sem is None:
+            sem = self._sems[loop] = asyncio.Semaphore(self.max_concurrency)
+        return sem
+
+    def _retry_delay(self, attempt: int, err: Exception) -> Optional[float]:
+        """Seconds to wait before retrying ``err``, or None if it is not retryable."""
+        import openai
+        if isinstance(err, openai.APIStatusError):
+            if err.status_code != 429 and err.status_code < 500:
+                return None
+            retry_after = err.response.headers.get("retry-after") if err.response is not None else None
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.max_backoff)
+                except ValueError:
+                    pass
+        elif not isinstance(err, (openai.APIConnectionError, openai.APITimeoutError)):
+            return None
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    async def chat(self, messages: List[Dict[str, Any]], deadline: Optional[float] = None, **kwargs) -> str:
+        loop = asyncio.get_running_loop()
+        end = loop.time() + (deadline if deadline is not None else self.deadline)
+        kwargs.setdefault("temperature", 0.2)
+        attempt = 0
+        while True:
+            remaining = end - loop.time()
+            if remaining <= 0:
+                raise LLMError("LLM call exceeded its deadline")
+            try:
+                async with self._sem():
+                    self.calls += 1
+                    resp = await asyncio.wait_for(
+                        self._client().chat.completions.create(model=self.model, messages=messages, **kwargs),
+                        timeout=remaining,
+                    )
+                return resp.choices[0].message.content or ""
+            except asyncio.TimeoutError as e:
+                raise LLMError("LLM call exceeded its deadline") from e
+            except Exception as e:
+                delay = self._retry_delay(attempt, e) if attempt < self.max_retries else None
+                if delay is None:
+                    raise LLMError(f"LLM call failed: {e}") from e
+                if loop.time() + delay >= end:
+                    raise LLMError(f"LLM call exceeded its deadline after {attempt + 1} attempts: {e}") from e
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
+
+    async def plan(self, goal: str, deadline: Optional[float] = None,
+                   context: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        content = await self.chat(plan_messages(goal, context), deadline=deadline)
+        try:
+            return parse_plan(content)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:  # incl. pydantic ValidationError
+            raise LLMError(f"Unparseable plan: {type(e).__name__}: {e}") from e
+
+    async def summarize(self, instruction: str, log: Iterable[Dict[str, Any]], deadline: Optional[float] = None,
+                        max_tokens: int = DEFAULT_SUMMARY_TOKENS) -> str:
+        return await self.summarize_compact(instruction, compact_text(log, max_tokens), deadline=deadline)
+
+    async def summarize_compact(self, instruction: str, compacted: str, deadline: Optional[float] = None) -> str:
+        return await self.chat(summary_messages(instruction, compacted), deadline=deadline)
@@ -0,0 +1,101 @@
+"""Reduce a run's event log to a bounded summary prompt.
+
+The supervisor only needs the step table, the failures and what changed on screen, not
+every observation. ``compact_log`` keeps those and elides the middle of the bulkiest section
+(failures last) until the rendered JSON fits ``max_tokens`` (~4 chars per token).
+"""
+from __future__ import annotations
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..utils.obs_codec import decode_records
+
+DEFAULT_SUMMARY_TOKENS = 1500
+STEP_COLUMNS = ["id", "intent", "target", "ok", "verified"]
+_MAX_STR = 200
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+def render(compact: Dict[str, Any]) -> str:
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
+
+def _clip(value: Any, limit: int = _MAX_STR) -> Any:
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit] + "…"
+    return value
+
+def _scalar_state(obs: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Screen plus the flat scalar ``info`` fields; the UI tree is left out."""
+    if not obs:
+        return {}
+    state = {"screen": obs.get("screen")}
+    for k, v in (obs.get("info") or {}).items():
+        if v is None or isinstance(v, (bool, int, float, str)):
+            state[k] = v
+    return state
+
+def _elide(rows: List[Any], keep: int) -> List[Any]:
+    """Keep the first and last rows, with a marker for what was dropped."""
+    if len(rows) <= keep:
+        return rows
+    head = keep // 2
+    return rows[:head] + [f"... {len(rows) - keep} elided ..."] + rows[len(rows) - (keep - head):]
+
+def compact_log(records: Iterable[Dict[str, Any]], max_tokens: int = DEFAULT_SUMMARY_TOKENS) -> Dict[str, Any]:
+    """Counts, a step table, failures and state transitions of a run log, within ``max_tokens``."""
+    goal, status, plan_len, replans, bugs = None, None, None, 0, 0
+    steps: Dict[int, List[Any]] = {}
+    failures: List[Dict[str, Any]] = []
+    transitions: List[List[Any]] = []
+    prev: Dict[str, Any] = {}
+    counts = {"actions": 0, "failed_actions": 0, "verifications": 0, "failed_verifications": 0}
+    for r in decode_records(records):
+        event, p = r.get("event"), r.get("payload") or {}
+        if event == "plan":
+            if goal is None: goal = p.get("goal")
+            plan_len = len(p.get("steps") or [])
+        elif event == "replan":
+            replans += 1
+        elif event == "action":
+            sid = p.get("step_id")
+            counts["actions"] += 1
+            steps[sid] = [sid, p.get("intent"), _clip(p.get("target")), p.get("ok"), None]
+            if not p.get("ok"):
+                counts["failed_actions"] += 1
+                failures.append({"step_id": sid, "kind": "action", "message": _clip(p.get("message"))})
+            if p.get("bug"):
+                bugs += 1
+                failures.append({"step_id": sid, "kind": "bug", "message": _clip(p.get("bug"))})
+            state = _scalar_state(p.get("observation"))
+            for k, v in state.items():
+                if k in prev and prev[k] != v:
+                    transitions.append([sid, k, _clip(prev[k], 60), _clip(v, 60)])
+            prev.update(state)
+        elif event == "verify":
+            sid = p.get("step_id")
+            counts["verifications"] += 1
+            if sid in steps: steps[sid][4] = p.get("passed")
+            if not p.get("passed"):
+                counts["failed_verifications"] += 1
+                failures.append({"step_id": sid, "kind": "verify", "message": _clip(p.get("reason"))})
+        elif event == "finish" and status is None:
+            status = p.get("status")
+    compact: Dict[str, Any] = {
+        "goal": _clip(goal), "status": status, "plan_steps": plan_len, "replans": replans, "bugs": bugs, **counts,
+        "step_columns": STEP_COLUMNS, "steps": list(steps.values()), "failures": failures, "transitions": transitions,
+    }
+    # Halve the bulkier of steps/transitions down to a few rows each before touching failures.
+    full = {k: list(compact[k]) for k in ("steps", "transitions", "failures")}
+    keep = {k: len(v) for k, v in full.items()}
+    while estimate_tokens(render(compact)) > max_tokens:
+        shrinkable = [k for k in ("steps", "transitions") if keep[k] > 8] or [k for k in full if keep[k] > 2]
+        if not shrinkable:
+            break
+        section = max(shrinkable, key=lambda k: len(render(compact[k])))
+        keep[section] //= 2
+        compact[section] = _elide(full[section], keep[section])
+    return compact
+
+def compact_text(records: Iterable[Dict[str, Any]], max_tokens: int = DEFAULT_SUMMARY_TOKENS) -> str:
+    return render(compact_log(records, max_tokens))
@@ -0,0 +1,118 @@
+"""Local OpenAI-compatible chat completions server for offline latency/retry testing.
+
+    python -m qa_agents.llm.fake_server --port 8089 --latency 0.2 --fail_first 2 --fail_status 429
+    OPENAI_API_KEY=test OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python -m qa_agents.run_test --llm_planner
+"""
+from __future__ import annotations
+import argparse, json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from ..planning.rule_planner import rule_plan_for_goal
+
+class FakeOpenAIServer:
+    """Serves POST /v1/chat/completions. The first ``fail_first`` requests get ``fail_status``;
+    every request sleeps ``latency`` seconds. Plan prompts get the rule plan for the goal, or
+    ``plan_reply`` verbatim when given (e.g. a malformed plan)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 fail_first: int = 0, fail_status: int = 429, retry_after: Optional[float] = None,
+                 plan_reply: Optional[str] = None):
+        self.latency = latency
+        self.plan_reply = plan_reply
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _reply(self, body: Dict[str, Any]) -> str:
+        messages = body.get("messages", [])
+        system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+        if "planner" in str(system):
+            if self.plan_reply is not None:
+                return self.plan_reply
+            user = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+            goal = str(user).split("\n", 1)[0].removeprefix("Goal: ")
+            return json.dumps({"steps": rule_plan_for_goal(goal)})
+        return "- Summary from fake server"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):  # keep test output quiet
+                pass
+
+            def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with server._lock:
+                    n = len(server.requests)
+                    server.requests.append({"path": self.path, "t": time.monotonic(), "body": body})
+                if server.latency:
+                    time.sleep(server.latency)
+                if not self.path.endswith("/chat/completions"):
+                    return self._send(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+                if n < server.fail_first:
+                    headers = {"Retry-After": str(server.retry_after)} if server.retry_after is not None else None
+                    return self._send(server.fail_status, {"error": {"message": "injected failure", "type": "server_error"}}, headers)
+                self._send(200, {
+                    "id": f"chatcmpl-fake-{n}", "object": "chat.completion", "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": server._reply(body)}}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+
+        return Handler
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8089)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--fail_first", type=int, default=0)
+    ap.add_argument("--fail_status", type=int, default=429)
+    args = ap.parse_args()
+    server = FakeOpenAIServer(args.host, args.port, args.latency, args.fail_first, args.fail_status)
+    print(f"Fake OpenAI server on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,121 +1,119 @@
-import os, json, re
-from typing import Any, List, Dict, Optional
-from dotenv import load_dotenv
+from __future__ import annotations
+import os, threading
+from typing import TYPE_CHECKING, Any, Iterable, List, Dict, Optional
 
-load_dotenv()
+from ..utils.tracing import span
+from .compaction import DEFAULT_SUMMARY_TOKENS, compact_text
 
-def _strip_code_fences(text: str) -> str:
-    return re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip(), flags=re.IGNORECASE | re.MULTILINE)
+if TYPE_CHECKING:
+    import asyncio
+    from .async_client import AsyncLLMClient, LLMError
+    from ..utils.cache import PlanCache
+
+_ENV_LOADED = False
+
+def _load_env() -> None:
+    """Read .env once, on first client construction rather than at import."""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _ENV_LOADED = True
+
+class _LoopThread:
+    """A daemon thread running one event loop, so sync callers share a pooled async client."""
+    _lock = threading.Lock()
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def run(cls, coro):
+        import asyncio
+        with cls._lock:
+            if cls._loop is None:
+                cls._loop = asyncio.new_event_loop()
+                threading.Thread(target=cls._loop.run_forever, name="llm-loop", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, cls._loop).result()
+
+def _as_llm_error(e: Exception) -> LLMError:
+    from .async_client import LLMError
+    if isinstance(e, LLMError):
+        return e
+    err = LLMError(f"{type(e).__name__}: {e}")
+    err.__cause__ = e
+    return err
 
 class LLMClient:
     """
-    Thin wrapper around OpenAI. If no API key is present, methods return None
-    or fall back to deterministic behavior when requested.
+    Thin sync wrapper around AsyncLLMClient. If no API key is present, methods return None
+    or fall back to deterministic behavior when requested. Any failure (not only LLMError, e.g. a
+    missing ``openai`` package) is kept in ``last_error`` as an LLMError and never raised.
+    The async client (asyncio, openai) is only imported when a key is configured.
+    Summaries are requested on a compacted log and cached in ``summary_cache`` by its digest.
     """
-    def __init__(self, model: Optional[str] = None) -> None:
+    def __init__(self, model: Optional[str] = None, summary_cache: Optional[PlanCache] = None,
+                 summary_tokens: int = DEFAULT_SUMMARY_TOKENS, **async_kwargs: Any) -> None:
+        _load_env()
         self.api_key = os.getenv("OPENAI_API_KEY", "").strip()
         self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        self.client = None
+        self.client: Optional[AsyncLLMClient] = None
+        self.last_error: Optional[LLMError] = None
+        self.summary_cache = summary_cache
+        self.summary_tokens = summary_tokens
+        self.summary_stats = {"calls": 0, "cache_hits": 0, "prompt_bytes": 0}
         if self.api_key:
-            try:
-                from openai import OpenAI
-                self.client = OpenAI(api_key=self.api_key)
-            except Exception:
-                self.client = None
+            from .async_client import AsyncLLMClient
+            self.client = AsyncLLMClient(model=self.model, api_key=self.api_key, **async_kwargs)
 
-    def plan(self, goal: str) -> Optional[List[Dict[str, Any]]]:
+    def plan(self, goal: str, context: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
         """
         Ask the model to produce a JSON list of plan steps for the given goal.
+        With ``context`` (current screen, steps done) only the remaining steps are requested.
         Returns a Python list of step dicts, or None if not available.
         """
         if not self.client:
             return None
-        system = (
-            "You are a senior mobile QA planner. "
-            "Output ONLY strict JSON with a top-level key 'steps' (no prose). "
-            "Each step must have: id (int), description (str), "
-            "intent one of ['open_app','open_settings','tap','type','toggle','wait','verify'], "
-            "target (str or null), params (object)."
-        )
-        user = (
-            f"Goal: {goal}\n"
-            "Constraints:\n"
-            "- Prefer minimal steps.\n"
-            "- Use 'open_settings' to open Settings app.\n"
-            "- Use 'tap' for list items like 'Network & Internet'.\n"
-            "- Use 'toggle' for switches like 'Wi‑Fi'.\n"
-            "- End with a 'verify' step when applicable.\n"
-            "Return JSON ONLY:\n"
-            "{\n"
-            "  \"steps\": [\n"
-            "    {\"id\":1, \"description\":\"...\", \"intent\":\"open_settings\", \"target\":null, \"params\":{}},\n"
-            "    {\"id\":2, \"description\":\"...\", \"intent\":\"tap\", \"target\":\"Network & Internet\", \"params\":{}},\n"
-            "    ...\n"
-            "  ]\n"
-            "}\n"
-        )
         try:
-            resp = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user},
-                ],
-                temperature=0.2,
-            )
-            content = resp.choices[0].message.content or ""
-            content = _strip_code_fences(content)
-            data = json.loads(content)
-            steps = data.get("steps", [])
-            # Basic validation/coercion
-            cleaned = []
-            next_id = 1
-            for s in steps:
-                intent = str(s.get("intent", "")).strip()
-                if intent not in ["open_app","open_settings","tap","type","toggle","wait","verify"]:
-                    continue
-                cleaned.append({
-                    "id": int(s.get("id", next_id)),
-                    "description": str(s.get("description", intent)).strip(),
-                    "intent": intent,
-                    "target": s.get("target", None),
-                    "params": s.get("params", {}) or {},
-                })
-                next_id = cleaned[-1]["id"] + 1
-            return cleaned or None
-        except Exception:
+            with span("llm.plan", model=self.model):
+                return _LoopThread.run(self.client.plan(goal, context=context))
+        except Exception as e:
+            self.last_error = _as_llm_error(e)
             return None
 
-    def summarize(self, instruction: str, log: List[Dict[str, Any]], fallback: bool = True) -> str:
+    def summarize(self, instruction: str, log: Iterable[Dict[str, Any]], fallback: bool = True) -> str:
         if self.client:
+            from ..utils.cache import PlanCache
+            log = list(log)
+            compacted = compact_text(log, self.summary_tokens)
+            key = PlanCache.key_from("summary", self.model, instruction, compacted)
+            cached = self.summary_cache.get(key) if self.summary_cache is not None else None
+            if cached is not None:
+                self.summary_stats["cache_hits"] += 1
+                return cached["text"]
             try:
-                content = [
-                    {"type":"text","text": instruction},
-                    {"type":"text","text": "Here is the JSON log of the run:"},
-                    {"type":"text","text": json.dumps(log, indent=2)},
-                ]
-                resp = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role":"system","content":"You are a concise QA supervisor."},
-                        {"role":"user","content": content},
-                    ],
-                    temperature=0.2,
-                )
-                return resp.choices[0].message.content
-            except Exception:
-                pass
+                with span("llm.summarize", model=self.model, prompt_bytes=len(compacted.encode("utf-8"))):
+                    text = _LoopThread.run(self.client.summarize_compact(instruction, compacted))
+                self.summary_stats["calls"] += 1
+                self.summary_stats["prompt_bytes"] += len(compacted.encode("utf-8"))
+                if self.summary_cache is not None:
+                    self.summary_cache.set(key, {"text": text})
+                return text
+            except Exception as e:
+                self.last_error = _as_llm_error(e)
         if fallback:
-            steps = [r for r in log if r.get("event")=="action"]
-            verifs = [r for r in log if r.get("event")=="verify"]
-            bugs = [r for r in log if r.get("payload",{}).get("bug")]
-            done = [r for r in log if r.get("event")=="finish"]
-            status = done[0]["payload"]["status"] if done else "unknown"
+            # Single pass so a streamed log is never held in memory.
+            goal, steps, verifs, bugs, status = None, 0, 0, 0, None
+            for r in log:
+                event, payload = r.get("event"), r.get("payload", {})
+                if goal is None: goal = payload.get("goal", "N/A")
+                if event == "action": steps += 1
+                elif event == "verify": verifs += 1
+                elif event == "finish" and status is None: status = payload["status"]
+                if payload.get("bug"): bugs += 1
             return (
-                f"- Goal: {log[0].get('payload',{}).get('goal','N/A') if log else 'N/A'}\n"
-                f"- Plan length: {len(steps)} actions\n"
-                f"- Bugs detected: {len(bugs)}\n"
-                f"- Verifications run: {len(verifs)}\n"
-                f"- Final status: {status}"
+                f"- Goal: {goal if goal is not None else 'N/A'}\n"
+                f"- Plan length: {steps} actions\n"
+                f"- Bugs detected: {bugs}\n"
+                f"- Verifications run: {verifs}\n"
+                f"- Final status: {status or 'unknown'}"
             )
         return "Summary unavailable."
@@ -0,0 +1,27 @@
+from __future__ import annotations
+from typing import List, Optional
+from qa_agents.agent_s_compat import History, Message, Router
+from qa_agents.agents.agent_s_agents import PlannerAgent, ExecutorAgent, VerifierAgent, SupervisorAgent
+
+def build_agents(goal: str, env_name: str, task: Optional[str], logs_dir: str, use_llm: bool,
+                 model: str, plan_cache: Optional[str], save_frames: bool = False):
+    planner = PlannerAgent(use_llm=use_llm, model=model, goal=goal, cache_path=plan_cache, env_name=env_name)
+    planner.warm()  # Agent‑S session setup overlaps with env boot below
+    return {
+        "planner": planner,
+        "executor": ExecutorAgent(env_name, task, enable_render=save_frames),
+        "verifier": VerifierAgent(goal),
+        "supervisor": SupervisorAgent(logs_dir),
+    }
+
+def run_agents(goal: str, env_name: str, task: Optional[str], logs_dir: str, use_llm: bool, model: str,
+               plan_cache: Optional[str], save_frames: bool = False, max_turns: int = 50,
+               pipelined: bool = False) -> List[Message]:
+    agents = build_agents(goal, env_name, task, logs_dir, use_llm, model, plan_cache, save_frames)
+    healthy = False
+    try:
+        history = Router(agents, pipelined=pipelined).run("planner", History(), max_turns=max_turns)
+        healthy = True
+        return history
+    finally:
+        agents["executor"].close(healthy)  # the env goes back to the pool (recycled if the run raised)
@@ -0,0 +1,100 @@
+"""Overlap planning with env boot and start executing before the LLM plan arrives.
+
+On a plan-cache miss the planner runs on a worker thread while the env boots. Meanwhile the
+``rule_plan_for_goal`` prefix is executed speculatively (navigation-like intents only, at
+most ``max_speculative`` steps). When the real plan lands, the longest matching prefix is
+kept; on divergence the env is restored to the snapshot taken after that prefix, or reset
+and replayed from scratch when the env cannot snapshot.
+"""
+from __future__ import annotations
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..agents.executor import Executor
+from ..agents.planner import Planner
+from ..agents.supervisor import Supervisor
+from ..planning.compiler import compile_steps
+from ..planning.plan_trie import step_key
+from ..planning.rule_planner import rule_plan_for_goal
+from ..run_test import run_plan
+from ..utils.schemas import FastActionResult, PlanStep
+from ..utils.tracing import span
+
+# Intents that are cheap to undo; toggles/typing are left for the confirmed plan.
+SPECULATIVE_INTENTS = ("open_app", "open_settings", "tap", "wait")
+
+def _snapshot(env, executor: Executor) -> Optional[Tuple[Any, Any]]:
+    try:
+        return env.snapshot(), executor.obs
+    except (AttributeError, NotImplementedError):
+        return None
+
+def run_goal_speculative(goal: str, env_factory: Callable[[], Any], planner: Planner, supervisor: Supervisor,
+                         logs_dir: str, max_speculative: int = 3, replan: bool = False, max_replans: int = 2,
+                         strict_targets: bool = False, condition_waits: bool = True,
+                         **record_kwargs: Any) -> Dict[str, Any]:
+    """Like ``run_goal`` but builds the env itself (``env_factory``) while planning.
+
+    Once the plan is reconciled, the rest runs through ``run_plan`` as in ``run_goal``
+    (compiled steps, unresolved-target reporting, condition waits, ``replan``). The finish
+    record and the returned dict carry ``time_to_first_action_ms`` (from the call, env boot
+    included) and a ``speculation`` summary.
+    """
+    t0 = time.perf_counter()
+    extra: Dict[str, Any] = {"time_to_first_action_ms": None}
+    spec = {"speculated": 0, "kept": 0, "rolled_back": False, "replayed": False, "cache_hit": False}
+
+    plan = planner.lookup(goal)
+    spec["cache_hit"] = plan is not None
+    # Leaving the block waits for the planner, so a failed boot never leaves it running.
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="planner") as pool:
+        future = pool.submit(planner.generate, goal) if plan is None else None
+        with span("env.boot"):
+            env = env_factory()
+            r0 = time.perf_counter()
+            executor = Executor(env, condition_waits=condition_waits)
+            reset_s = time.perf_counter() - r0
+
+        # Speculate only when the real plan is slow (LLM); a rule plan is already final.
+        executed: List[Tuple[PlanStep, FastActionResult, Optional[Tuple[Any, Any]]]] = []
+        base = None
+        if future is not None and planner.use_llm:
+            base = _snapshot(env, executor)
+            ops, _ = compile_steps([PlanStep(**s) for s in rule_plan_for_goal(goal)[:max_speculative]], executor.targets)
+            for op in ops:
+                if future.done() or op.intent not in SPECULATIVE_INTENTS:
+                    break
+                with span("speculate.step", intent=op.intent):
+                    res = executor.run(op)
+                if extra["time_to_first_action_ms"] is None:
+                    extra["time_to_first_action_ms"] = round((time.perf_counter() - t0) * 1e3, 3)
+                executed.append((op.step, res, _snapshot(env, executor)))
+                if not res.ok:
+                    break
+        if plan is None:
+            with span("planner.wait"):
+                plan = future.result()
+
+    # Reconcile: keep the longest prefix the real plan agrees with.
+    kept = 0
+    for (step, res, _), real in zip(executed, plan.steps):
+        if step_key(step) != step_key(real) or not res.ok:
+            break
+        kept += 1
+    spec["speculated"] = len(executed)
+    if kept < len(executed):
+        spec["rolled_back"] = True
+        snap = executed[kept - 1][2] if kept else base
+        if snap is not None:
+            env.restore(snap[0]); executor.obs = snap[1]
+        else:
+            executor = Executor(env, condition_waits=condition_waits)  # no snapshots: reset and replay the real plan
+            spec["replayed"] = True
+            kept = 0
+    spec["kept"] = kept
+    extra["speculation"] = spec
+
+    return run_plan(goal, plan, executor, planner, supervisor, logs_dir, extra, t0,
+                    done=[res for _, res, _ in executed[:kept]], reset_s=reset_s, replan=replan,
+                    max_replans=max_replans, strict_targets=strict_targets, **record_kwargs)
@@ -0,0 +1,118 @@
+"""Compile a Plan once into pre-resolved ops for the executor and verifier.
+
+Targets are matched through a ``TargetIndex``: canonical UI names plus aliases, keyed by a
+normalized form (case, dashes, spacing and punctuation ignored, so "WiFi", "wifi" and
+"Wi‑Fi" are the same target). Compiled actions carry the canonical name, which the env
+resolves with a single exact lookup. With a closed index (the env lists its whole UI
+vocabulary) targets that resolve to nothing are reported by ``compile_plan`` before any step runs.
+"""
+from __future__ import annotations
+import re, unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..utils.schemas import FastAction, Plan, PlanStep
+from ..utils.waits import Condition
+
+WIFI = "Wi‑Fi"
+# Targets every env understands; envs with a fixed UI pass their own vocabulary (closed).
+COMMON_TARGETS: Dict[str, Tuple[str, ...]] = {
+    "Settings": (),
+    "Network & Internet": ("Network", "Internet"),
+    WIFI: ("WLAN",),
+}
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+def norm(text: str) -> str:
+    """"Wi‑Fi", "WiFi", "wi-fi" -> "wifi"; "Network & Internet" -> "networkinternet"."""
+    return _NON_ALNUM.sub("", unicodedata.normalize("NFKC", text).casefold())
+
+class TargetIndex:
+    """Canonical target names and their aliases. ``closed`` means the vocabulary is the whole UI."""
+
+    def __init__(self, targets: Dict[str, Iterable[str]], closed: bool = True) -> None:
+        self.closed = closed
+        self._exact: Dict[str, str] = {}
+        self._keys: Dict[str, str] = {}
+        for canonical, aliases in targets.items():
+            for name in (canonical, *aliases):
+                self._exact.setdefault(name, canonical)
+                self._keys.setdefault(norm(name), canonical)
+
+    def resolve(self, target: Optional[str]) -> Optional[str]:
+        if target is None:
+            return None
+        hit = self._exact.get(target)
+        return hit if hit is not None else self._keys.get(norm(target))
+
+COMMON = TargetIndex(COMMON_TARGETS, closed=False)
+
+def index_for(env: Any) -> TargetIndex:
+    """The env's own index (``env.targets``) or the open common one."""
+    index = getattr(env, "targets", None)
+    return index if isinstance(index, TargetIndex) else COMMON
+
+_ACTIONS = {"open_app": "open_settings", "open_settings": "open_settings", "tap": "tap", "type": "type",
+            "toggle": "toggle", "wait": "wait"}
+_TRUE = ("on", "true", "1")
+_WAIT_FOR = ("tap", "toggle", "type", "verify")
+
+class CompiledStep:
+    """One plan step with its env action built and its target resolved.
+
+    ``target`` is the canonical name (or the raw target when unresolved). ``state`` is the
+    desired toggle state and ``expected`` the verify step's expected state, when given.
+    ``until`` is a wait step's condition (``params["until"]``, or derived by ``compile_steps``).
+    """
+    __slots__ = ("step", "intent", "target", "params", "action", "resolved", "state", "expected", "until")
+
+    def __init__(self, intent: str, target: Optional[str], params: Optional[Dict[str, Any]],
+                 index: TargetIndex = COMMON, step: Optional[PlanStep] = None) -> None:
+        params = params if isinstance(params, dict) else {}
+        canonical = index.resolve(target)
+        self.step, self.intent, self.params = step, intent, params
+        self.target = canonical if canonical is not None else target
+        self.resolved = target is None or canonical is not None
+        name = _ACTIONS.get(intent)
+        if name is None:
+            self.action = None
+        elif name in ("open_settings", "toggle", "tap"):
+            self.action = FastAction(name, None if name == "open_settings" else self.target)
+        else:
+            self.action = FastAction(name, self.target if name == "type" else None, params)
+        self.state = str(params["state"]).strip().lower() in _TRUE if "state" in params else None
+        self.expected = str(params["expected_state"]).strip().lower() in _TRUE if "expected_state" in params else None
+        self.until = Condition.from_params(params.get("until")) if intent == "wait" else None
+
+def compile_step(step: PlanStep, index: TargetIndex = COMMON) -> CompiledStep:
+    return CompiledStep(step.intent, step.target, step.params, index, step)
+
+class CompiledPlan:
+    __slots__ = ("plan", "ops", "unresolved")
+
+    def __init__(self, plan: Plan, ops: List[CompiledStep], unresolved: List[Dict[str, Any]]) -> None:
+        self.plan, self.ops, self.unresolved = plan, ops, unresolved
+
+class PlanCompileError(ValueError):
+    def __init__(self, unresolved: List[Dict[str, Any]]) -> None:
+        super().__init__("unresolved targets: " + ", ".join(f"step {u['step_id']}: {u['target']!r}" for u in unresolved))
+        self.unresolved = unresolved
+
+def compile_steps(steps: Iterable[PlanStep], index: TargetIndex = COMMON) -> Tuple[List[CompiledStep], List[Dict[str, Any]]]:
+    ops = [compile_step(s, index) for s in steps]
+    # A wait before a step that acts on a target waits for that target to be on screen.
+    for op, nxt in zip(ops, ops[1:]):
+        if op.intent == "wait" and op.until is None and nxt.target and nxt.intent in _WAIT_FOR \
+                and (nxt.resolved or not index.closed):
+            op.until = Condition(visible=nxt.target)
+    # verify targets name what to check, not something to act on
+    unresolved = [{"step_id": op.step.id, "intent": op.intent, "target": op.step.target}
+                  for op in ops if index.closed and not op.resolved and op.action is not None]
+    return ops, unresolved
+
+def compile_plan(plan: Plan, index: TargetIndex = COMMON, strict: bool = False) -> CompiledPlan:
+    """Resolve every step of ``plan`` once; ``strict`` raises PlanCompileError on unresolved targets."""
+    ops, unresolved = compile_steps(plan.steps, index)
+    if strict and unresolved:
+        raise PlanCompileError(unresolved)
+    return CompiledPlan(plan, ops, unresolved)
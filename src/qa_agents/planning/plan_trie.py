@@ -0,0 +1,69 @@
+from __future__ import annotations
+import json
+from typing import Dict, List, Optional, Sequence
+
+from ..utils.schemas import Plan, PlanStep
+from .compiler import CompiledStep
+
+def step_key(step: PlanStep) -> str:
+    """Steps are shared across goals when intent, target and params match (ids/descriptions may differ)."""
+    return json.dumps([step.intent, step.target, step.params], sort_keys=True, ensure_ascii=False)
+
+def op_key(op: CompiledStep) -> str:
+    """Like ``step_key`` on the resolved target, plus the wait condition the compiler derived."""
+    until = op.until.describe() if op.until is not None else None
+    return json.dumps([op.intent, op.target, op.params, until], sort_keys=True, ensure_ascii=False)
+
+class TrieNode:
+    __slots__ = ("key", "children", "steps", "ops")
+
+    def __init__(self, key: Optional[str] = None) -> None:
+        self.key = key
+        self.children: Dict[str, TrieNode] = {}
+        self.steps: Dict[int, PlanStep] = {}  # goal index -> that goal's own PlanStep
+        self.ops: Dict[int, CompiledStep] = {}  # ... and its compiled step, when built from ops
+
+    @property
+    def step(self) -> PlanStep:
+        return next(iter(self.steps.values()))
+
+    @property
+    def op(self) -> CompiledStep:
+        return next(iter(self.ops.values()))
+
+class PlanTrie:
+    """Prefix tree of plan steps across goals; each path from the root is one goal's plan.
+
+    Given ``ops`` (each plan compiled, one list per plan), steps are shared by ``op_key``, so
+    two waits only merge when they wait for the same condition.
+    """
+
+    def __init__(self, plans: List[Plan], ops: Optional[Sequence[List[CompiledStep]]] = None) -> None:
+        self.root = TrieNode()
+        self.plans = plans
+        for g, plan in enumerate(plans):
+            node = self.root
+            for i, step in enumerate(plan.steps):
+                op = ops[g][i] if ops is not None else None
+                key = step_key(step) if op is None else op_key(op)
+                node = node.children.setdefault(key, TrieNode(key))
+                node.steps[g] = step
+                if op is not None:
+                    node.ops[g] = op
+
+    def node_count(self) -> int:
+        stack, n = [self.root], 0
+        while stack:
+            node = stack.pop()
+            n += len(node.children)
+            stack.extend(node.children.values())
+        return n
+
+    def branch_points(self) -> int:
+        stack, n = [self.root], 0
+        while stack:
+            node = stack.pop()
+            n += len(node.children) > 1
+            stack.extend(node.children.values())
+        return n
+
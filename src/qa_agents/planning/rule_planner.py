@@ -1,5 +1,5 @@
 ﻿from __future__ import annotations
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 def _wifi_plan() -> List[Dict]:
     return [
@@ -11,7 +11,7 @@ def _wifi_plan() -> List[Dict]:
     ]
 
 def rule_plan_for_goal(goal: str) -> List[Dict]:
-    g = (goal or "").lower()
+    g = (goal or "").lower().replace("‑", "-")
     if "wifi" in g or "wi-fi" in g:
         return _wifi_plan()
     return [
@@ -20,3 +20,20 @@ def rule_plan_for_goal(goal: str) -> List[Dict]:
         {"id": 3, "description": "Attempt the change", "intent": "tap", "target": goal, "params": {}},
         {"id": 4, "description": "Verify result", "intent": "verify", "target": goal, "params": {}},
     ]
+
+# Screen reached by a navigation step, and how deep each screen is (home -> settings -> network).
+_NAV = {("open_settings", None): "settings", ("open_app", None): "settings", ("tap", "network & internet"): "network"}
+_DEPTH = {"home": 0, "settings": 1, "network": 2}
+
+def rule_suffix_for_goal(goal: str, screen: Optional[str]) -> List[Dict]:
+    """The rule plan minus the leading navigation that ``screen`` has already reached."""
+    steps = rule_plan_for_goal(goal)
+    depth = _DEPTH.get(screen or "", 0)
+    i = 0
+    while i < len(steps):
+        s = steps[i]
+        reached = _NAV.get((s["intent"], s["target"].lower() if s["target"] else None))
+        if reached is None or _DEPTH[reached] > depth:
+            break
+        i += 1
+    return steps[i:]
@@ -1,6 +1,8 @@
 from __future__ import annotations
 import argparse, os, json, pathlib
 from qa_agents.pipeline.agent_s_orchestrator import run_agents
+from qa_agents.utils import tracing
+from qa_agents.utils.events import EventSink
 
 def main():
     ap = argparse.ArgumentParser()
@@ -12,12 +14,22 @@ def main():
     ap.add_argument("--llm_planner", action="store_true")
     ap.add_argument("--model", default="gpt-4o-mini")
     ap.add_argument("--plan_cache", default="./logs/plan_cache.json")
+    ap.add_argument("--pipelined", action="store_true",
+                    help="Write the supervisor report off the turn loop, overlapping the next action")
+    ap.add_argument("--trace", action="store_true", help="Record spans (agent_s_run.jsonl + chrome_trace.json)")
     args = ap.parse_args()
+    tracing.enable(args.trace)
 
     os.makedirs(args.logs_dir, exist_ok=True)
-    history = run_agents(args.goal, args.env, args.task, args.logs_dir, args.llm_planner, args.model, args.plan_cache, args.save_frames)
+    history = run_agents(args.goal, args.env, args.task, args.logs_dir, args.llm_planner, args.model, args.plan_cache, args.save_frames,
+                         pipelined=args.pipelined)
     with open(pathlib.Path(args.logs_dir) / "agent_s_trace.json", "w", encoding="utf-8") as f:
         json.dump([m.__dict__ for m in history], f, indent=2)
+    if args.trace:
+        spans = tracing.drain()
+        with EventSink(os.path.join(args.logs_dir, "agent_s_run.jsonl"), flush_every=len(spans) or 1) as sink:
+            for s in spans: sink.emit("span", s)
+        tracing.write_chrome_trace(os.path.join(args.logs_dir, "chrome_trace.json"), spans, process_name=args.goal)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,263 @@
+from __future__ import annotations
+import argparse, json, os, re, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from .agents.executor import Executor
+from .agents.planner import Planner
+from .agents.supervisor import Supervisor
+from .envs.types import EnvLike
+from .planning.compiler import CompiledStep, compile_plan, index_for
+from .planning.plan_trie import PlanTrie, TrieNode
+from .run_test import lease_env, record_goal, run_goal, save_json
+from .utils import tracing
+from .utils.schemas import FastActionResult
+
+# Per-process worker state: one planner/supervisor per worker; device envs stay warm in the
+# process-wide EnvPool and are leased per goal.
+_WORKER: Optional[Dict[str, Any]] = None
+
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    """Read a JSONL manifest; each non-blank line is an object with at least a 'goal' key."""
+    entries: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if not entry.get("goal"):
+                raise ValueError(f"{path}:{lineno}: manifest entry has no 'goal'")
+            entries.append(entry)
+    return entries
+
+def _slug(entry: Dict[str, Any], index: int) -> str:
+    raw = str(entry.get("id") or f"goal_{index:04d}")
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", raw)
+
+def _init_worker(env_name: str, task: str, save_frames: bool, use_llm: bool, model: Optional[str],
+                 trace: bool = False, similarity: Optional[float] = 0.8) -> None:
+    global _WORKER
+    tracing.enable(trace)
+    _WORKER = {
+        "planner": Planner(use_llm=use_llm, model=model, similarity=similarity),
+        "supervisor": Supervisor(model=model),
+        "env_name": env_name, "task": task,
+        "save_frames": save_frames,
+    }
+    if env_name != "mock":
+        from .envs.env_pool import default_env_pool
+        default_env_pool().warm(task, save_frames, background=False)  # boot while the worker starts
+
+def _run_entry(index: int, entry: Dict[str, Any], logs_dir: str) -> Dict[str, Any]:
+    w = _WORKER
+    goal_dir = os.path.join(logs_dir, _slug(entry, index))
+    t0 = time.perf_counter()
+    try:
+        with lease_env(w["env_name"], w["task"], w["save_frames"]) as env:
+            result = run_goal(entry["goal"], env, w["planner"], w["supervisor"], goal_dir,
+                              save_frames=w["save_frames"])
+    except Exception as e:
+        result = {"goal": entry["goal"], "status": "error", "error": f"{type(e).__name__}: {e}"}
+    result.update({"index": index, "id": _slug(entry, index), "pid": os.getpid(),
+                   "seconds": round(time.perf_counter() - t0, 4)})
+    return result
+
+def wait_totals(results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Condition waits summed over goals (``saved_s`` is vs sleeping each wait's fixed ``seconds``)."""
+    waits = [r["waits"] for r in results if r.get("waits")]
+    if not waits:
+        return None
+    return {k: round(sum(w[k] for w in waits), 4) for k in waits[0]}
+
+def build_suite_report(results: List[Dict[str, Any]], elapsed: float, env_steps: Optional[Dict[str, int]] = None,
+                       waits: Optional[Dict[str, Any]] = None) -> str:
+    passed = sum(1 for r in results if r["status"] == "passed")
+    rate = len(results) / elapsed if elapsed > 0 else 0.0
+    lines = [
+        "# QA Suite Report\n",
+        f"- Goals: {len(results)}",
+        f"- Passed: {passed}",
+        f"- Failed: {len(results) - passed}",
+        f"- Wall time: {elapsed:.2f}s",
+        f"- Throughput: {rate:.2f} goals/sec",
+    ]
+    if env_steps:
+        lines.append(f"- Env steps: {env_steps['executed']} (independent runs: {env_steps['independent']}, "
+                     f"saved: {env_steps['saved']})")
+    if waits:
+        lines.append(f"- Condition waits: {waits['condition']} ({waits['met']} met), {waits['waited_s']:.2f}s waited "
+                     f"vs {waits['budget_s']:.2f}s fixed ({waits['saved_s']:.2f}s saved)")
+    lines += [
+        "",
+        "| # | Id | Goal | Status | Steps | Seconds |",
+        "|---:|---|---|:---:|---:|---:|",
+    ]
+    for r in results:
+        lines.append(f"| {r['index']} | {r['id']} | {r['goal']} | {r['status']} | {r.get('steps', '')} | {r['seconds']} |")
+    return "\n".join(lines) + "\n"
+
+def run_suite(entries: List[Dict[str, Any]], logs_dir: str, env_name: str = "mock", task: str = "settings_wifi",
+              workers: int = 1, save_frames: bool = False, use_llm: bool = False,
+              model: Optional[str] = None, trace: bool = False,
+              similarity: Optional[float] = 0.8) -> Dict[str, Any]:
+    init_args = (env_name, task, save_frames, use_llm, model, trace, similarity)
+    t0 = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    if workers <= 1:
+        _init_worker(*init_args)
+        results = [_run_entry(i, e, logs_dir) for i, e in enumerate(entries)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+            futures = [pool.submit(_run_entry, i, e, logs_dir) for i, e in enumerate(entries)]
+            results = [f.result() for f in as_completed(futures)]
+    elapsed = time.perf_counter() - t0
+    results.sort(key=lambda r: r["index"])
+    return _write_summary(results, elapsed, logs_dir, workers=workers)
+
+def _write_summary(results: List[Dict[str, Any]], elapsed: float, logs_dir: str, **extra: Any) -> Dict[str, Any]:
+    waits = extra.pop("waits", None) or wait_totals(results)
+    if waits:
+        extra["waits"] = waits
+    summary = {
+        "goals": len(results),
+        "passed": sum(1 for r in results if r["status"] == "passed"),
+        **extra,
+        "seconds": round(elapsed, 4),
+        "goals_per_sec": round(len(results) / elapsed, 3) if elapsed > 0 else None,
+        "results": results,
+    }
+    save_json(os.path.join(logs_dir, "suite_run.json"), summary)
+    with open(os.path.join(logs_dir, "suite_report.md"), "w", encoding="utf-8") as f:
+        f.write(build_suite_report(results, elapsed, extra.get("env_steps"), waits))
+    return summary
+
+def can_fork(env: Any) -> bool:
+    """Whether ``env`` can be snapshotted and restored (needed to branch a shared prefix).
+
+    ``EnvLike``'s own snapshot/restore only raise, so they do not count.
+    """
+    cls = type(env)
+    return all(callable(getattr(cls, name, None)) and getattr(cls, name) is not getattr(EnvLike, name)
+               for name in ("snapshot", "restore"))
+
+def run_suite_shared(entries: List[Dict[str, Any]], logs_dir: str, env_name: str = "mock",
+                     task: str = "settings_wifi", use_llm: bool = False, model: Optional[str] = None,
+                     similarity: Optional[float] = 0.8, condition_waits: bool = True) -> Dict[str, Any]:
+    """Run all goals on one env, executing each plan prefix shared by several goals once.
+
+    Plans are compiled against the env's targets, merged into a PlanTrie and walked
+    depth-first; at branch points the env (and the executor's last observation) is
+    snapshotted and restored for each sibling. Per-goal logs are then written from each
+    goal's path through the trie, each with the spans of the steps on that path. When the
+    plans branch and the env cannot snapshot/restore, the suite falls back to ``run_suite``.
+    """
+    t0 = time.perf_counter()
+    planner, supervisor = Planner(use_llm=use_llm, model=model, similarity=similarity), Supervisor(model=model)
+    plans, spans = [], []
+    for e in entries:
+        plans.append(planner.plan(e["goal"]))
+        spans.append(tracing.drain() if tracing.enabled() else [])
+    paths: List[List[Tuple[CompiledStep, FastActionResult]]] = [[] for _ in entries]
+    extras: List[Dict[str, Any]] = [{"shared_prefix": True} for _ in entries]
+    executed = 0
+
+    with lease_env(env_name, task) as env:
+        programs = [compile_plan(plan, index_for(env)) for plan in plans]
+        trie = PlanTrie(plans, [p.ops for p in programs])
+        forking = can_fork(env) or not trie.branch_points()
+        if forking:
+            executor = Executor(env, condition_waits=condition_waits)
+            for g, program in enumerate(programs):
+                if program.unresolved:
+                    extras[g]["unresolved_targets"] = program.unresolved
+            if tracing.enabled():  # the env reset is part of every goal
+                reset = tracing.drain()
+                for s in spans:
+                    s.extend(reset)
+
+            def visit(node: TrieNode) -> None:
+                nonlocal executed
+                children = list(node.children.values())
+                fork = (env.snapshot(), executor.obs) if len(children) > 1 else None
+                for i, child in enumerate(children):
+                    if i and fork is not None:
+                        env.restore(fork[0]); executor.obs = fork[1]
+                    op = child.op
+                    res = executor.run(op)
+                    executed += 1
+                    step_spans = tracing.drain() if tracing.enabled() else []
+                    for g, own in child.ops.items():
+                        paths[g].append((own, res))
+                        spans[g].extend(step_spans)
+                    # a failed action ends every goal on this path, as in run_goal (verify is judged later)
+                    if res.ok or op.intent == "verify":
+                        visit(child)
+
+            visit(trie.root)
+
+    if not forking:
+        print(f"{type(env).__name__} cannot snapshot/restore; running the {len(entries)} goals independently")
+        return run_suite(entries, logs_dir, env_name=env_name, task=task, use_llm=use_llm, model=model,
+                         trace=tracing.enabled(), similarity=similarity)
+
+    results: List[Dict[str, Any]] = []
+    for i, entry in enumerate(entries):
+        g0 = time.perf_counter()
+        result = record_goal(entry["goal"], plans[i], paths[i], supervisor, os.path.join(logs_dir, _slug(entry, i)),
+                             extra=extras[i], spans=spans[i])
+        result.update({"index": i, "id": _slug(entry, i), "pid": os.getpid(),
+                       "seconds": round(time.perf_counter() - g0, 4)})
+        results.append(result)
+    elapsed = time.perf_counter() - t0
+
+    independent = sum(len(p) for p in paths)
+    env_steps = {"executed": executed, "independent": independent, "saved": independent - executed,
+                 "branch_points": trie.branch_points()}
+    waits = {k: round(v, 4) for k, v in executor.waits.items()} if executor.waits["condition"] else None
+    return _write_summary(results, elapsed, logs_dir, workers=1, env_steps=env_steps, waits=waits)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many QA goals from a JSONL manifest over a process pool.")
+    parser.add_argument("--manifest", type=str, required=True, help='JSONL file, one {"goal": ..., "id": ...} per line')
+    parser.add_argument("--env", type=str, choices=["mock","android"], default="mock")
+    parser.add_argument("--task", type=str, default="settings_wifi", help="Android task name (for android env)")
+    parser.add_argument("--logs_dir", type=str, default="./logs/suite")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--save_frames", action="store_true", help="Save rendered frames if env supports it")
+    parser.add_argument("--share_prefixes", action="store_true",
+                        help="Run shared plan prefixes once on a single forking env (env must support snapshot/restore)")
+    parser.add_argument("--trace", action="store_true", help="Record spans per goal (event log + chrome_trace.json)")
+    parser.add_argument("--llm_planner", action="store_true", help="Use LLM to generate the plan (cached).")
+    parser.add_argument("--model", type=str, default=None, help="Override LLM model name (e.g., gpt-4o-mini)")
+    parser.add_argument("--similarity", type=float, default=0.8,
+                        help="Reuse the cached plan of a goal at least this similar (Jaccard); <=0 disables")
+    args = parser.parse_args()
+    if args.share_prefixes and args.save_frames:
+        parser.error("--save_frames is not supported with --share_prefixes (steps are not replayed per goal)")
+
+    entries = load_manifest(args.manifest)
+    if args.share_prefixes:
+        workers = 1
+        tracing.enable(args.trace)
+        summary = run_suite_shared(entries, args.logs_dir, env_name=args.env, task=args.task,
+                                   use_llm=args.llm_planner, model=args.model,
+                                   similarity=args.similarity if args.similarity > 0 else None)
+    else:
+        workers = max(1, min(args.workers, len(entries)))
+        summary = run_suite(entries, args.logs_dir, env_name=args.env, task=args.task, workers=workers,
+                            save_frames=args.save_frames, use_llm=args.llm_planner, model=args.model,
+                            similarity=args.similarity if args.similarity > 0 else None,
+                            trace=args.trace)
+
+    print(f"Goals: {summary['goals']}  passed: {summary['passed']}  workers: {workers}")
+    if "waits" in summary:
+        print(f"Condition waits: {summary['waits']['condition']}, {summary['waits']['saved_s']}s saved vs fixed sleeps")
+    if "env_steps" in summary:
+        s = summary["env_steps"]
+        print(f"Env steps: {s['executed']} executed vs {s['independent']} independent ({s['saved']} saved)")
+    print(f"Throughput: {summary['goals_per_sec']} goals/sec ({summary['seconds']}s)")
+    print(f"Report: {os.path.join(args.logs_dir, 'suite_report.md')}")
+
+if __name__ == "__main__":
+    main()
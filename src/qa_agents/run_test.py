@@ -1,10 +1,18 @@
 from __future__ import annotations
-import argparse, json, os
+import argparse, json, os, time
+from contextlib import ExitStack, contextmanager
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from .agents.planner import Planner
 from .agents.executor import Executor
 from .agents.verifier import Verifier
 from .agents.supervisor import Supervisor
-from .utils.schemas import LogRecord
+from .planning.compiler import CompiledStep, compile_plan, compile_step, compile_steps
+from .utils.schemas import FastActionResult, FastVerification, Plan, PlanStep
+from .utils.events import EventSink, export_json, read_events
+from .utils.obs_codec import ObservationEncoder, decode_records
+from .utils import tracing
+from .utils.tracing import span
 from .envs.mock_android import MockAndroidEnv
 
 def save_json(path: str, data):
@@ -13,6 +21,253 @@ def save_json(path: str, data):
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
+def make_env(env_name: str, task: str = "settings_wifi", enable_render: bool = False):
+    if env_name == "mock":
+        return MockAndroidEnv()
+    from .envs.android_world_env import AndroidWorldEnv
+    return AndroidWorldEnv(task_name=task, enable_render=enable_render)
+
+@contextmanager
+def lease_env(env_name: str, task: str = "settings_wifi", enable_render: bool = False) -> Iterator[Any]:
+    """An env for one goal. Device envs come warm from the process-wide EnvPool and go back
+    to it (reset) afterwards; one that raised is recycled."""
+    if env_name == "mock":
+        yield MockAndroidEnv()
+        return
+    from .envs.env_pool import default_env_pool
+    with default_env_pool().lease(task, enable_render) as env:
+        yield env
+
+def build_report(summary: str, records: Iterable[Dict[str, Any]], status: str) -> str:
+    """Render the markdown report, joining action/verify records by step id as they stream past."""
+    header = "| Step | Intent | Target | Action OK | Verify | Reason |\n|---:|---|---|:---:|:---:|---|\n"
+    rows: List[str] = []
+    action = None
+    for r in records:
+        p = r.get("payload", {})
+        if r.get("event") == "action":
+            action = p
+        elif r.get("event") == "verify" and action is not None and action.get("step_id") == p.get("step_id"):
+            rows.append(
+                f"| {action['step_id']} | {action['intent']} | {action.get('target') or ''} | {'✅' if action['ok'] else '❌'} | {'✅' if p['passed'] else '❌'} | {p['reason']} |"
+            )
+            action = None
+    return summary + "\n\n### Step Summary\n\n" + header + "\n".join(rows) + f"\n\n**Final status:** {status}\n"
+
+def run_goal(goal: str, env, planner: Planner, supervisor: Supervisor, logs_dir: str,
+             save_frames: bool = False, flush_every: int = 1, export: bool = True,
+             keyframe_every: int = 10, started: Optional[float] = None, replan: bool = False,
+             max_replans: int = 2, strict_targets: bool = False, condition_waits: bool = True) -> Dict[str, Any]:
+    """Run a single goal against an already constructed env and write its logs/report.
+
+    The env is reset (via Executor) but not rebuilt, so callers may reuse one env across goals.
+    ``time_to_first_action_ms`` is measured from ``started`` (a perf_counter value, e.g. taken
+    before building the env) or from this call.
+
+    With ``replan``, a failed action or a verification asking for a replan swaps the remaining
+    steps for ``planner.replan_suffix`` from the current screen (up to ``max_replans`` times);
+    executed steps are kept and the env is not reset. The finish record then carries
+    ``replanning`` stats, including the estimated cost of restarting from scratch instead.
+
+    The plan is compiled against the env's target index before the first step; targets the
+    env does not know are listed in ``unresolved_targets`` (``strict_targets`` raises
+    ``PlanCompileError`` instead of running).
+
+    ``wait`` steps with a condition (explicit or derived from the next step's target) return as
+    soon as it holds; the finish record's ``waits`` reports the time saved vs the fixed sleeps.
+    ``condition_waits=False`` always sleeps the fixed delay.
+    """
+    t0 = started if started is not None else time.perf_counter()
+    extra: Dict[str, Any] = {"time_to_first_action_ms": None}
+    r0 = time.perf_counter()
+    executor = Executor(env, condition_waits=condition_waits)
+    reset_s = time.perf_counter() - r0
+
+    # 3) Plan
+    plan = planner.plan(goal)
+    return run_plan(goal, plan, executor, planner, supervisor, logs_dir, extra, t0, reset_s=reset_s, replan=replan,
+                    max_replans=max_replans, strict_targets=strict_targets, save_frames=save_frames,
+                    flush_every=flush_every, export=export, keyframe_every=keyframe_every)
+
+def run_plan(goal: str, plan: Plan, executor: Executor, planner: Planner, supervisor: Supervisor, logs_dir: str,
+             extra: Dict[str, Any], t0: float, done: Iterable[FastActionResult] = (), reset_s: float = 0.0,
+             replan: bool = False, max_replans: int = 2, strict_targets: bool = False,
+             **record_kwargs: Any) -> Dict[str, Any]:
+    """Compile ``plan``, run it on ``executor`` and record it (the body of ``run_goal``).
+
+    ``done`` holds the results of the plan's first steps when they already ran on the env
+    (speculative execution); they are recorded as is and execution resumes after them.
+    ``extra`` is merged into the finish record and the returned dict.
+    """
+    program = compile_plan(plan, executor.targets, strict=strict_targets)
+    if program.unresolved:
+        executor.log("Unresolved targets:", ", ".join(f"step {u['step_id']} {u['target']!r}" for u in program.unresolved))
+        extra["unresolved_targets"] = program.unresolved
+
+    done = list(done)
+    queue = deque(program.ops[len(done):])
+    step_seconds: List[float] = []
+
+    # Executed lazily as record_goal consumes it, so a failing step stops execution.
+    def results():
+        yield from zip(program.ops, done)
+        while queue:
+            op = queue.popleft()
+            s0 = time.perf_counter()
+            res = executor.run(op)
+            step_seconds.append(time.perf_counter() - s0)
+            if op.until is not None and executor.waits["condition"]:
+                extra["waits"] = {k: round(v, 4) for k, v in executor.waits.items()}
+            if extra.get("time_to_first_action_ms") is None:
+                extra["time_to_first_action_ms"] = round((time.perf_counter() - t0) * 1e3, 3)
+            yield op, res
+
+    stats: Dict[str, Any] = {"replans": 0, "sources": {"cache": 0, "llm": 0, "rules": 0}, "steps_not_reexecuted": 0,
+                             "restart_extra_s_est": 0.0, "llm_calls": 0, "restart_llm_calls": 0}
+
+    def on_replan(step: PlanStep, res: FastActionResult, ver: FastVerification) -> Optional[Dict[str, Any]]:
+        if stats["replans"] >= max_replans:
+            return None
+        executed = len(done) + len(step_seconds)
+        suffix, source = planner.replan_suffix(goal, res.observation, executed)
+        steps = [s.model_copy(update={"id": step.id + 1 + i}) for i, s in enumerate(suffix.steps)]
+        queue.clear(); queue.extend(compile_steps(steps, executor.targets)[0])
+        stats["replans"] += 1; stats["sources"][source] += 1
+        # Restarting instead would reset the env, redo every step so far and plan the goal again.
+        stats["steps_not_reexecuted"] += executed
+        stats["restart_extra_s_est"] = round(stats["restart_extra_s_est"] + reset_s + sum(step_seconds), 6)
+        if planner.use_llm:
+            stats["restart_llm_calls"] += 1
+            stats["llm_calls"] += source != "cache"
+        return {"after_step": step.id, "reason": ver.reason if ver.need_replan else res.message,
+                "screen": res.observation.screen, "source": source, "steps": [s.model_dump() for s in steps]}
+
+    if replan:
+        extra["replanning"] = stats
+    out = record_goal(goal, plan, results(), supervisor, logs_dir, env=executor.env, extra=extra,
+                      replan=on_replan if replan else None, **record_kwargs)
+    out.update(extra)
+    return out
+
+def record_goal(goal: str, plan: Plan, results: Iterable[Tuple[PlanStep | CompiledStep, FastActionResult]], supervisor: Supervisor,
+                logs_dir: str, env=None, save_frames: bool = False, flush_every: int = 1, export: bool = True,
+                keyframe_every: int = 10, extra: Optional[Dict[str, Any]] = None,
+                replan: Optional[Callable[[PlanStep, FastActionResult, FastVerification], Optional[Dict[str, Any]]]] = None,
+                spans: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Verify and log (step, result) pairs for ``goal``, stopping at the first failed action.
+
+    Steps may be PlanSteps or ``CompiledStep``s (as ``run_goal`` yields).
+
+    When a non-verify action fails or a verification sets ``need_replan``, ``replan`` (if given)
+    may return a ``replan`` event payload instead of stopping; it is expected to have replaced
+    the remaining steps of ``results``.
+
+    Records stream to ``qa_run.jsonl``; ``qa_run.json`` is exported from that stream when ``export``.
+    Action observations are delta-encoded (``payload["obs"]``) with a keyframe every ``keyframe_every``.
+    ``extra`` is merged into the finish record. When tracing, ``spans`` (recorded earlier for
+    this goal, e.g. its share of a shared-prefix run) are logged with the spans drained here.
+    """
+    verifier = Verifier(goal=goal)
+
+    # 4) Loop
+    events_path = os.path.join(logs_dir, "qa_run.jsonl")
+    sink = EventSink(events_path, flush_every=flush_every)
+    obs_codec = ObservationEncoder(keyframe_every=keyframe_every)
+    sink.emit("plan", plan.model_dump())
+    status = "unknown"
+    final_verify_pass = None
+
+    # frames (optional): written off the step loop; PNGs via `python -m qa_agents.utils.frames export`
+    frames = None
+    if save_frames and hasattr(env, "render"):
+        from .utils.frames import FrameSink, RawFrameStore
+        frames = FrameSink(RawFrameStore(os.path.join(logs_dir, "frames")))
+
+    steps_run = 0
+    with sink:
+        for item, res in results:
+            op = item if isinstance(item, CompiledStep) else compile_step(item)
+            step = op.step
+            sink.emit("action", {
+                "step_id": step.id,
+                "intent": step.intent,
+                "target": step.target,
+                "ok": res.ok,
+                "message": res.message,
+                "obs": obs_codec.encode(res.observation.model_dump())
+            })
+            steps_run += 1
+
+            # Optional frame capture
+            if frames is not None:
+                try:
+                    with span("env.render"):
+                        frame = env.render()  # numpy array (H,W,3)
+                    if frame is not None:
+                        frames.submit(step.id, frame)
+                except Exception:
+                    pass  # non-fatal
+
+            bug = None
+            if not res.ok:
+                bug = f"Execution failed: {res.message}"
+
+            # Verify (pass params so it can read expected_state, etc.)
+            with span("verifier.verify_step", intent=step.intent):
+                ver = verifier.verify(op, res.observation)
+            sink.emit("verify", {
+                "step_id": step.id,
+                "passed": ver.passed,
+                "reason": ver.reason,
+                "need_replan": ver.need_replan,
+            })
+
+            if step.intent == "verify":
+                final_verify_pass = ver.passed
+
+            if replan is not None and (ver.need_replan or (bug and step.intent != "verify")):
+                info = replan(step, res, ver)
+                if info is not None:
+                    sink.emit("replan", info)
+                    continue
+
+            if bug:
+                # A failed verify step is judged by its verification below; any other failed action fails the run.
+                status = "failed" if step.intent != "verify" else status
+                break
+
+        if status != "failed":
+            status = "passed" if final_verify_pass is not False else "failed"
+        finish = {"status": status, **(extra or {})}
+        if frames is not None:
+            finish["frames"] = frames.close()
+        sink.emit("finish", finish)
+
+    # 6) Supervisor report (+ step table)
+    report = supervisor.summarize(goal, read_events(events_path))
+    report_full = build_report(report, read_events(events_path), status)
+
+    report_path = os.path.join(logs_dir, "report.md")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(report_full)
+
+    # 7) Spans (when tracing) go into the event stream and a Chrome/Perfetto trace
+    if tracing.enabled():
+        spans = sorted([*(spans or ()), *tracing.drain()], key=lambda s: s["start_us"])
+        with EventSink(events_path, flush_every=len(spans) or 1, mode="a") as span_sink:
+            for s in spans:
+                span_sink.emit("span", s)
+        tracing.write_chrome_trace(os.path.join(logs_dir, "chrome_trace.json"), spans, process_name=goal)
+
+    # 8) Persist (legacy array export of the event stream)
+    run_path = os.path.join(logs_dir, "qa_run.json")
+    if export:
+        export_json(decode_records(read_events(events_path)), run_path)
+
+    return {"goal": goal, "status": status, "steps": steps_run,
+            "events_path": events_path, "run_path": run_path if export else events_path,
+            "report_path": report_path}
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--goal", type=str, default="Toggle Wi‑Fi off and on")
@@ -22,116 +277,53 @@ def main():
     parser.add_argument("--save_frames", action="store_true", help="Save rendered frames if env supports it")
     parser.add_argument("--llm_planner", action="store_true", help="Use LLM to generate the plan (cached).")
     parser.add_argument("--model", type=str, default=None, help="Override LLM model name (e.g., gpt-4o-mini)")
+    parser.add_argument("--similarity", type=float, default=0.8,
+                        help="Reuse the cached plan of a goal at least this similar (Jaccard); <=0 disables")
+    parser.add_argument("--flush_every", type=int, default=1, help="Flush the JSONL event log every N records")
+    parser.add_argument("--keyframe_every", type=int, default=10, help="Store a full observation every N actions (1 = always)")
+    parser.add_argument("--trace", action="store_true", help="Record spans (event log + chrome_trace.json)")
+    parser.add_argument("--speculate", action="store_true",
+                        help="Plan while the env boots; on a cache miss start the rule-plan prefix before the LLM plan lands")
+    parser.add_argument("--replan", action="store_true",
+                        help="On a failed step or a verifier replan request, replan only the remaining steps")
+    parser.add_argument("--max_replans", type=int, default=2)
+    parser.add_argument("--strict_targets", action="store_true",
+                        help="Refuse to run a plan whose targets the env's UI vocabulary cannot resolve")
+    parser.add_argument("--no_json_export", action="store_true", help="Skip exporting the legacy qa_run.json array")
     args = parser.parse_args()
+    tracing.enable(args.trace)
 
     # 1) Create agents
-    planner = Planner(use_llm=args.llm_planner, model=args.model)
-    verifier = Verifier(goal=args.goal)
+    planner = Planner(use_llm=args.llm_planner, model=args.model,
+                      similarity=args.similarity if args.similarity > 0 else None)
     supervisor = Supervisor(model=args.model)
 
-    # 2) Environment
-    if args.env == "mock":
-        env = MockAndroidEnv()
+    opts = dict(save_frames=args.save_frames, flush_every=args.flush_every, export=not args.no_json_export,
+                keyframe_every=args.keyframe_every)
+    if args.speculate:
+        from .pipeline.speculative import run_goal_speculative
+        with ExitStack() as stack:  # the env is leased from the pool when the factory runs
+            result = run_goal_speculative(args.goal,
+                                          lambda: stack.enter_context(lease_env(args.env, args.task, args.save_frames)),
+                                          planner, supervisor, args.logs_dir, replan=args.replan,
+                                          max_replans=args.max_replans, strict_targets=args.strict_targets, **opts)
     else:
-        from .envs.android_world_env import AndroidWorldEnv
-        env = AndroidWorldEnv(task_name=args.task, enable_render=args.save_frames)
-
-    executor = Executor(env)
-
-    # 3) Plan
-    plan = planner.plan(args.goal)
-
-    # 4) Loop
-    log_records = []
-    log_records.append(LogRecord(event="plan", payload=plan.model_dump()).model_dump())
-    status = "unknown"
-    final_verify_pass = None
-
-    # frames dir (optional)
-    frames_dir = os.path.join(args.logs_dir, "frames")
-    if args.save_frames:
-        os.makedirs(frames_dir, exist_ok=True)
-        try:
-            import imageio.v2 as imageio  # for imwrite
-        except Exception:
-            imageio = None
-
-    steps_summary = []
-
-    for step in plan.steps:
-        # Execute
-        res = executor.execute(step.intent, step.target, step.params)
-        log_records.append(LogRecord(event="action", payload={
-            "step_id": step.id,
-            "intent": step.intent,
-            "target": step.target,
-            "ok": res.ok,
-            "message": res.message,
-            "observation": res.observation.model_dump()
-        }).model_dump())
-
-        # Optional frame capture
-        if args.save_frames and hasattr(env, "render"):
-            try:
-                frame = env.render()  # numpy array (H,W,3)
-                if frame is not None and "imageio" in globals() and imageio is not None:
-                    fname = os.path.join(frames_dir, f"step_{step.id:02d}.png")
-                    imageio.imwrite(fname, frame)
-            except Exception:
-                pass  # non-fatal
-
-        bug = None
-        if not res.ok:
-            bug = f"Execution failed: {res.message}"
-
-        # Verify (pass params so it can read expected_state, etc.)
-        ver = verifier.verify_step(step.intent, step.target, step.params, res.observation)
-        log_records.append(LogRecord(event="verify", payload={
-            "step_id": step.id,
-            "passed": ver.passed,
-            "reason": ver.reason,
-            "need_replan": ver.need_replan,
-        }).model_dump())
-
-        steps_summary.append({
-            "id": step.id,
-            "intent": step.intent,
-            "target": step.target or "",
-            "action_ok": res.ok,
-            "action_msg": res.message,
-            "verify_passed": ver.passed,
-            "verify_reason": ver.reason
-        })
-
-        if step.intent == "verify":
-            final_verify_pass = ver.passed
-
-        if bug:
-            status = "failed"
-            break
-
-    status = "passed" if final_verify_pass is not False else "failed"
-    log_records.append(LogRecord(event="finish", payload={"status": status}).model_dump())
-
-    # 6) Persist
-    run_path = os.path.join(args.logs_dir, "qa_run.json")
-    save_json(run_path, log_records)
-
-    # 7) Supervisor report (+ step table)
-    report = supervisor.summarize(args.goal, log_records)
-    header = "| Step | Intent | Target | Action OK | Verify | Reason |\n|---:|---|---|:---:|:---:|---|\n"
-    rows = "\n".join([
-        f"| {s['id']} | {s['intent']} | {s['target']} | {'✅' if s['action_ok'] else '❌'} | {'✅' if s['verify_passed'] else '❌'} | {s['verify_reason']} |"
-        for s in steps_summary
-    ])
-    report_full = report + "\n\n### Step Summary\n\n" + header + rows + f"\n\n**Final status:** {status}\n"
-
-    with open(os.path.join(args.logs_dir, "report.md"), "w", encoding="utf-8") as f:
-        f.write(report_full)
+        # 2) Environment
+        started = time.perf_counter()
+        with lease_env(args.env, args.task, args.save_frames) as env:
+            result = run_goal(args.goal, env, planner, supervisor, args.logs_dir, started=started,
+                              replan=args.replan, max_replans=args.max_replans, strict_targets=args.strict_targets,
+                              **opts)
 
-    print(f"Run status: {status}")
-    print(f"Logs: {run_path}")
-    print(f"Report: {os.path.join(args.logs_dir, 'report.md')}")
+    print(f"Run status: {result['status']}")
+    if result.get("time_to_first_action_ms") is not None:
+        print(f"Time to first action: {result['time_to_first_action_ms']:.1f} ms")
+    if result.get("replanning"):
+        print(f"Replanning: {json.dumps(result['replanning'])}")
+    if result.get("speculation"):
+        print(f"Speculation: {json.dumps(result['speculation'])}")
+    print(f"Logs: {result['run_path']}")
+    print(f"Report: {result['report_path']}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,138 @@
+"""Drain goals from a JobQueue: each worker slot leases a goal, runs it and writes the result back.
+
+    python -m qa_agents.run_worker --queue /shared/qa_queue.sqlite --concurrency 2 --env android --exit_when_empty
+
+Run one worker per host (each with its own emulator) against a queue on a shared filesystem.
+"""
+from __future__ import annotations
+import argparse, multiprocessing, os, threading, time
+from typing import Any, Dict, List, Optional
+
+from .utils.job_queue import DEFAULT_LEASE_S, Job, JobQueue, worker_id
+
+RUNNERS = ("test", "agent_s")
+
+class _Heartbeat(threading.Thread):
+    """Renews the job's lease every ``lease_s / 3`` while the goal runs; ``lost`` once a renewal fails."""
+
+    def __init__(self, queue: JobQueue, job: Job, lease_s: float) -> None:
+        super().__init__(name=f"lease-{job.id}", daemon=True)
+        self.queue, self.job, self.lease_s = queue, job, lease_s
+        self.lost = False
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.lease_s / 3):
+            if not self.queue.heartbeat(self.job, self.lease_s):
+                self.lost = True
+                return
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+def _run_test(job: Job, logs_dir: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+    from . import run_suite
+    if run_suite._WORKER is None:
+        run_suite._init_worker(opts["env_name"], opts["task"], opts["save_frames"], opts["use_llm"], opts["model"])
+    return run_suite._run_entry(job.id, {**job.entry, "id": job.goal_id}, logs_dir)
+
+def _run_agent_s(job: Job, logs_dir: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+    from .pipeline.agent_s_orchestrator import run_agents
+    goal_dir = os.path.join(logs_dir, job.goal_id)
+    os.makedirs(goal_dir, exist_ok=True)
+    t0 = time.perf_counter()
+    try:
+        history = run_agents(job.goal, opts["env_name"], opts["task"], goal_dir, opts["use_llm"], opts["model"] or "gpt-4o-mini",
+                             opts["plan_cache"], opts["save_frames"])
+        verdict = history.latest("supervisor").data["verdict"] if history.latest("supervisor") else "fail"
+        result = {"goal": job.goal, "status": {"pass": "passed", "fail": "failed"}.get(verdict, "failed"),
+                  "turns": len(history)}
+    except Exception as e:
+        result = {"goal": job.goal, "status": "error", "error": f"{type(e).__name__}: {e}"}
+    result.update({"id": job.goal_id, "pid": os.getpid(), "seconds": round(time.perf_counter() - t0, 4)})
+    return result
+
+_RUN = {"test": _run_test, "agent_s": _run_agent_s}
+
+def work(queue_path: str, worker: str, logs_dir: str, runner: str = "test", env_name: str = "mock",
+         task: str = "settings_wifi", suite: Optional[str] = None, lease_s: float = DEFAULT_LEASE_S,
+         exit_when_empty: bool = True, poll_s: float = 1.0, max_jobs: Optional[int] = None,
+         save_frames: bool = False, use_llm: bool = False, model: Optional[str] = None,
+         plan_cache: Optional[str] = None) -> Dict[str, int]:
+    """Lease and run goals until the queue is drained (``exit_when_empty``) or ``max_jobs`` ran.
+
+    A goal whose run errors is given back for a retry; a pass/fail verdict is written back.
+    With ``exit_when_empty`` the worker keeps polling while other workers hold leases, so a
+    job requeued after its worker died is still picked up.
+    """
+    queue = JobQueue(queue_path)
+    opts = {"env_name": env_name, "task": task, "save_frames": save_frames, "use_llm": use_llm, "model": model,
+            "plan_cache": plan_cache}
+    counts = {"done": 0, "retried": 0, "lost": 0}
+    try:
+        while max_jobs is None or sum(counts.values()) < max_jobs:
+            job = queue.lease(worker, lease_s, suite)
+            if job is None:
+                if exit_when_empty and queue.stats(suite)["leased"] == 0:
+                    break
+                time.sleep(poll_s)
+                continue
+            beat = _Heartbeat(queue, job, lease_s)
+            beat.start()
+            try:
+                result = _RUN[runner](job, os.path.join(logs_dir, job.suite), opts)
+            finally:
+                beat.stop()
+            result.update({"worker": worker, "attempt": job.attempt})
+            if beat.lost:  # another worker may already be running the retry: do not write back
+                written = False
+            elif result["status"] == "error":
+                written = queue.fail(job, result["error"])
+            else:
+                written = queue.complete(job, result)
+            key = "lost" if not written else "retried" if result["status"] == "error" else "done"
+            counts[key] += 1
+            print(f"[{worker}] {job.suite}/{job.goal_id} attempt {job.attempt}: {result['status']}"
+                  + ("" if written else " (lease lost, result dropped)"), flush=True)
+    finally:
+        queue.close()
+    return counts
+
+def _slot(slot: int, kwargs: Dict[str, Any]) -> None:
+    work(worker=worker_id(slot), **kwargs)
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Run QA goals leased from a shared job queue.")
+    ap.add_argument("--queue", required=True, help="Queue database (see qa_agents.utils.job_queue)")
+    ap.add_argument("--suite", default=None, help="Only lease goals of this suite")
+    ap.add_argument("--concurrency", type=int, default=1, help="Worker processes on this host")
+    ap.add_argument("--runner", choices=RUNNERS, default="test", help="run_test pipeline or the Agent-S agents")
+    ap.add_argument("--env", choices=["mock", "android"], default="mock")
+    ap.add_argument("--task", default="settings_wifi")
+    ap.add_argument("--logs_dir", default="./logs/queue")
+    ap.add_argument("--lease_s", type=float, default=DEFAULT_LEASE_S,
+                    help="Lease length; a job is retried when its worker misses heartbeats this long")
+    ap.add_argument("--exit_when_empty", action="store_true", help="Exit once no goal is queued or leased")
+    ap.add_argument("--poll_s", type=float, default=1.0)
+    ap.add_argument("--save_frames", action="store_true")
+    ap.add_argument("--llm_planner", action="store_true")
+    ap.add_argument("--model", default=None)
+    ap.add_argument("--plan_cache", default="./logs/plan_cache.json", help="Agent-S runner plan cache")
+    args = ap.parse_args(argv)
+
+    kwargs = {"queue_path": args.queue, "logs_dir": args.logs_dir, "runner": args.runner, "env_name": args.env,
+              "task": args.task, "suite": args.suite, "lease_s": args.lease_s, "exit_when_empty": args.exit_when_empty,
+              "poll_s": args.poll_s, "save_frames": args.save_frames, "use_llm": args.llm_planner,
+              "model": args.model, "plan_cache": args.plan_cache}
+    if args.concurrency <= 1:
+        _slot(0, kwargs)
+    else:
+        procs = [multiprocessing.Process(target=_slot, args=(i, kwargs), name=f"qa-worker-{i}")
+                 for i in range(args.concurrency)]
+        for p in procs: p.start()
+        for p in procs: p.join()
+    print(JobQueue(args.queue).stats(args.suite))
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,90 @@
-import hashlib, json, os
-from typing import Any, Dict, Optional
+import argparse, atexit, hashlib, json, os, re, sqlite3, struct, time, weakref
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
-class JsonCache:
-    def __init__(self, path: str):
-        self.path = path
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        if not os.path.exists(path):
-            with open(path, "w") as f:
-                json.dump({}, f)
+from .sqlite import WalDB
 
-    def _load(self) -> Dict[str, Any]:
-        with open(self.path, "r") as f:
-            return json.load(f)
+class PlanCache(WalDB):
+    """Key/value cache backed by sqlite with an in-process LRU front.
 
-    def _save(self, data: Dict[str, Any]) -> None:
-        with open(self.path, "w") as f:
-            json.dump(data, f, indent=2)
+    sqlite gives us atomic writes and cross-process locking, so several suite
+    workers can share one cache file. Passing a legacy ``*.json`` path stores
+    the data next to it as ``*.sqlite`` and imports the JSON entries once.
+    """
+
+    def __init__(self, path: str, capacity: int = 1024):
+        legacy_json = None
+        if path.endswith(".json"):
+            legacy_json, path = path, path[:-len(".json")] + ".sqlite"
+        super().__init__(path)
+        self.capacity = capacity
+        self._lru: "OrderedDict[str, Any]" = OrderedDict()
+        if legacy_json and os.path.exists(legacy_json):
+            self.migrate_json(legacy_json)
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS goal_index (namespace TEXT NOT NULL, key TEXT NOT NULL, "
+                     "goal TEXT NOT NULL, shingles TEXT NOT NULL, PRIMARY KEY (namespace, key))")
+        conn.execute("CREATE TABLE IF NOT EXISTS goal_lookups (ts REAL NOT NULL, namespace TEXT NOT NULL, "
+                     "goal TEXT NOT NULL, outcome TEXT NOT NULL, similarity REAL, matched TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS goal_lookup_counts (namespace TEXT NOT NULL, outcome TEXT NOT NULL, "
+                     "n INTEGER NOT NULL, PRIMARY KEY (namespace, outcome))")
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
 
     def get(self, key: str) -> Optional[Any]:
-        return self._load().get(key)
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                return self._lru[key]
+            row = self._db().execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value = json.loads(row[0])
+            self._remember(key, value)
+            return value
 
     def set(self, key: str, value: Any) -> None:
-        d = self._load()
-        d[key] = value
-        self._save(d)
+        blob = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._db().execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, blob))
+            self._remember(key, value)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def migrate_json(self, json_path: str) -> int:
+        """Import entries from a legacy JsonCache file once; existing keys win. Returns rows imported."""
+        marker = "migrated:" + os.path.abspath(json_path)
+        with self._lock:
+            db = self._db()
+            if db.execute("SELECT 1 FROM meta WHERE key = ?", (marker,)).fetchone():
+                return 0
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    data: Dict[str, Any] = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                before = db.total_changes
+                db.executemany("INSERT OR IGNORE INTO cache (key, value) VALUES (?, ?)",
+                               [(k, json.dumps(v, ensure_ascii=False, separators=(",", ":"))) for k, v in data.items()])
+                imported = db.total_changes - before
+                db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (marker, str(imported)))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            return imported
 
     @staticmethod
     def key_from(*parts: str) -> str:
@@ -31,3 +92,286 @@ class JsonCache:
         for p in parts:
             m.update(p.encode("utf-8"))
         return m.hexdigest()
+
+# ---- Semantic lookup: paraphrased goals share a cached plan ----
+
+_SYNONYMS = {"turn": "toggle", "switch": "toggle", "flip": "toggle", "enable": "on", "disable": "off",
+             "launch": "open", "start": "open", "go": "open", "setting": "settings"}
+_STOPWORDS = frozenset("a an the and then back again please to it its of in is".split())
+_DASHES = re.compile(r"[\u2010-\u2015-]")
+
+def goal_tokens(goal: str) -> List[str]:
+    """Canonical content tokens: lowercase, hyphens joined (Wi‑Fi -> wifi), synonyms folded, stopwords dropped."""
+    text = _DASHES.sub("", goal.lower()).replace("wi fi", "wifi")
+    out = []
+    for tok in re.findall(r"[a-z0-9]+", text):
+        tok = _SYNONYMS.get(tok, tok)
+        if tok not in _STOPWORDS:
+            out.append(tok)
+    return out
+
+def goal_shingles(goal: str) -> FrozenSet[str]:
+    """Unigrams plus bigrams, so word order still matters ("off on" vs "on off")."""
+    toks = goal_tokens(goal)
+    return frozenset(toks) | frozenset(f"{a} {b}" for a, b in zip(toks, toks[1:]))
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter) if a or b else 0.0
+
+Bucket = Tuple[int, Tuple[int, ...]]  # (band, that band's rows of the signature)
+
+class MinHasher:
+    """MinHash signatures with LSH banding; ``bands * rows`` hash functions.
+
+    Each shingle's ``bands * rows`` 32-bit hashes come from one seeded SHAKE-128 digest
+    (memoized: goals share most shingles), and the signature is their column-wise minimum.
+    """
+
+    def __init__(self, bands: int = 16, rows: int = 4, seed: int = 1):
+        self.bands, self.rows, self.seed = bands, rows, seed
+        self._unpack = struct.Struct(f"<{bands * rows}I").unpack
+        self._salt = seed.to_bytes(8, "little")
+        self._last: Tuple[Optional[FrozenSet[str]], List[Bucket]] = (None, [])
+        self._hashes: Dict[str, Tuple[int, ...]] = {}
+
+    def _hash(self, shingle: str) -> Tuple[int, ...]:
+        h = self._hashes.get(shingle)
+        if h is None:
+            if len(self._hashes) >= 8192:
+                self._hashes.clear()
+            h = self._hashes[shingle] = self._unpack(
+                hashlib.shake_128(self._salt + shingle.encode("utf-8")).digest(4 * self.bands * self.rows))
+        return h
+
+    def signature(self, shingles: FrozenSet[str]) -> List[int]:
+        return list(map(min, zip(*map(self._hash, shingles))))
+
+    def buckets(self, shingles: FrozenSet[str]) -> List[Bucket]:
+        if self._last[0] == shingles:  # a miss is looked up, then stored: hash once
+            return self._last[1]
+        sig, r = self.signature(shingles), self.rows
+        out = [(i, tuple(sig[i * r:(i + 1) * r])) for i in range(self.bands)]
+        self._last = (shingles, out)
+        return out
+
+_LIVE: "weakref.WeakSet[SemanticPlanCache]" = weakref.WeakSet()
+
+@atexit.register
+def _flush_all() -> None:
+    for plans in list(_LIVE):
+        try:
+            plans.flush()
+        except sqlite3.Error:
+            pass
+
+class _LSHIndex:
+    """In-memory LSH buckets over a namespace's ``goal_index`` rows, caught up incrementally by rowid.
+
+    Shared by every SemanticPlanCache on the same PlanCache, namespace and hasher; rows written
+    by other processes are picked up on the next lookup with one ``rowid > ?`` query. A bucket
+    keeps its newest ``bucket_size`` keys, which bounds a lookup to ``bands * bucket_size`` keys.
+    """
+
+    def __init__(self, hasher: MinHasher, bucket_size: int = 16) -> None:
+        self.hasher, self.bucket_size = hasher, bucket_size
+        self.rowid = 0
+        self.goals: Dict[str, Tuple[str, FrozenSet[str]]] = {}
+        self.buckets: Dict[Bucket, Dict[str, None]] = {}  # insertion-ordered key sets
+
+    def add(self, key: str, goal: str, shingles: FrozenSet[str],
+            buckets: Optional[List[Bucket]] = None) -> None:
+        old = self.goals.get(key)
+        if old is not None:
+            if old[1] == shingles:
+                self.goals[key] = (goal, shingles)
+                return
+            for b in self.hasher.buckets(old[1]):
+                self.buckets.get(b, {}).pop(key, None)
+        self.goals[key] = (goal, shingles)
+        for b in buckets or self.hasher.buckets(shingles):
+            keys = self.buckets.setdefault(b, {})
+            keys[key] = None
+            if len(keys) > self.bucket_size:
+                del keys[next(iter(keys))]
+
+    def catch_up(self, db: sqlite3.Connection, namespace: str) -> None:
+        for rowid, key, goal, shingles in db.execute(
+                "SELECT rowid, key, goal, shingles FROM goal_index WHERE +namespace = ? AND rowid > ? ORDER BY rowid",
+                (namespace, self.rowid)):
+            self.add(key, goal, frozenset(json.loads(shingles)))
+            self.rowid = rowid
+
+    def candidates(self, buckets: List[Bucket], limit: int) -> List[str]:
+        """Keys sharing a band with the query, most shared bands first, at most ``limit``."""
+        shared = Counter(chain.from_iterable(self.buckets.get(b, ()) for b in buckets))
+        if len(shared) <= limit:
+            return list(shared)
+        return sorted(shared, key=shared.__getitem__, reverse=True)[:limit]
+
+class SemanticPlanCache:
+    """Exact-key lookups on a PlanCache, falling back to the most similar indexed goal.
+
+    Goals are stored in ``goal_index`` in the same sqlite file and bucketed by MinHash/LSH in
+    memory; at most ``max_candidates`` LSH candidates (most shared bands first) are re-scored
+    with exact Jaccard over ``goal_shingles``. A candidate at or above ``threshold`` is a hit;
+    one within ``near_miss`` below it is logged as a near miss. Outcome counts and the
+    non-exact lookups are buffered and written in batches (``flush``), keeping the newest
+    ``max_lookup_rows`` rows per namespace, so the threshold can be tuned (see ``lookup_stats``).
+    ``threshold=None`` disables the similarity path (exact keys only).
+    """
+
+    def __init__(self, cache: PlanCache, namespace: str, threshold: Optional[float] = 0.8,
+                 near_miss: float = 0.15, hasher: Optional[MinHasher] = None, max_candidates: int = 16,
+                 flush_every: int = 64, flush_s: float = 5.0, max_lookup_rows: int = 10000):
+        self.cache, self.namespace = cache, namespace
+        self.threshold, self.near_miss = threshold, near_miss
+        self.hasher = hasher or MinHasher()
+        self.max_candidates = max_candidates
+        self.flush_every, self.flush_s, self.max_lookup_rows = flush_every, flush_s, max_lookup_rows
+        self.counts: Dict[str, int] = {"exact": 0, "hit": 0, "near_miss": 0, "miss": 0}
+        self.last: Optional[Dict[str, Any]] = None
+        self._pending_counts: Dict[str, int] = {}
+        self._pending_rows: List[Tuple[float, str, str, str, Optional[float], Optional[str]]] = []
+        self._flushed_at = time.monotonic()
+        key = (namespace, self.hasher.bands, self.hasher.rows, self.hasher.seed)
+        indexes = cache.__dict__.setdefault("_lsh", {})
+        self._index: _LSHIndex = indexes.get(key) or indexes.setdefault(key, _LSHIndex(self.hasher))
+        _LIVE.add(self)
+
+    def _record(self, goal: str, outcome: str, similarity: Optional[float] = None, matched: Optional[str] = None) -> None:
+        self.counts[outcome] += 1
+        self.last = {"outcome": outcome, "similarity": similarity, "matched": matched}
+        self._pending_counts[outcome] = self._pending_counts.get(outcome, 0) + 1
+        if outcome == "exact":  # the hot path stays in memory; exact hits are only counted
+            return
+        self._pending_rows.append((time.time(), self.namespace, goal, outcome, similarity, matched))
+        if len(self._pending_rows) >= self.flush_every or time.monotonic() - self._flushed_at >= self.flush_s:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered lookup stats in one transaction and trim old lookup rows."""
+        counts, rows = self._pending_counts, self._pending_rows
+        self._flushed_at = time.monotonic()
+        if not counts:
+            return
+        self._pending_counts, self._pending_rows = {}, []
+        with self.cache._lock:
+            db = self.cache._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.executemany("INSERT INTO goal_lookup_counts (namespace, outcome, n) VALUES (?, ?, ?) "
+                               "ON CONFLICT (namespace, outcome) DO UPDATE SET n = n + excluded.n",
+                               [(self.namespace, k, n) for k, n in counts.items()])
+                if rows:
+                    db.executemany("INSERT INTO goal_lookups (ts, namespace, goal, outcome, similarity, matched) "
+                                   "VALUES (?, ?, ?, ?, ?, ?)", rows)
+                    db.execute("DELETE FROM goal_lookups WHERE namespace = ? AND rowid <= (SELECT rowid FROM goal_lookups "
+                               "WHERE namespace = ? ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+                               (self.namespace, self.namespace, self.max_lookup_rows))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+
+    def nearest(self, goal: str) -> Optional[Tuple[str, str, float]]:
+        """Best indexed (key, goal, similarity) among LSH candidates, or None."""
+        shingles = goal_shingles(goal)
+        if not shingles:
+            return None
+        buckets = self.hasher.buckets(shingles)
+        with self.cache._lock:
+            self._index.catch_up(self.cache._db(), self.namespace)
+            keys = self._index.candidates(buckets, self.max_candidates)
+            rows = [(k, *self._index.goals[k]) for k in keys]
+        best = None
+        for key, indexed_goal, indexed in rows:
+            sim = jaccard(shingles, indexed)
+            if best is None or sim > best[2]:
+                best = (key, indexed_goal, sim)
+        return best
+
+    def get(self, goal: str, key: str) -> Optional[Any]:
+        value = self.cache.get(key)
+        if value is not None:
+            self._record(goal, "exact", 1.0, goal)
+            return value
+        if self.threshold is None:
+            self._record(goal, "miss")
+            return None
+        best = self.nearest(goal)
+        if best is not None and best[2] >= self.threshold:
+            value = self.cache.get(best[0])
+            if value is not None:
+                self._record(goal, "hit", round(best[2], 4), best[1])
+                return value
+        if best is not None and best[2] >= self.threshold - self.near_miss:
+            self._record(goal, "near_miss", round(best[2], 4), best[1])
+        else:
+            self._record(goal, "miss", round(best[2], 4) if best else None, best[1] if best else None)
+        return None
+
+    def set(self, goal: str, key: str, value: Any) -> None:
+        """Store the value and index the goal in one transaction."""
+        shingles = goal_shingles(goal)
+        if not shingles:
+            self.cache.set(key, value)
+            return
+        blob = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        buckets = self.hasher.buckets(shingles)
+        with self.cache._lock:
+            db = self.cache._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, blob))
+                rowid = db.execute("INSERT OR REPLACE INTO goal_index (namespace, key, goal, shingles) VALUES (?, ?, ?, ?)",
+                                   (self.namespace, key, goal, json.dumps(sorted(shingles)))).lastrowid
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            self.cache._remember(key, value)
+            self._index.add(key, goal, shingles, buckets)
+            if rowid == self._index.rowid + 1:  # nothing else was written since the last catch-up
+                self._index.rowid = rowid
+
+def lookup_stats(cache: PlanCache, namespace: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+    """Outcome counts, a similarity histogram (0.1 buckets) and the closest near misses (flushed lookups only)."""
+    where, args = ("WHERE namespace = ?", [namespace]) if namespace else ("", [])
+    with cache._lock:
+        db = cache._db()
+        counts = dict(db.execute(f"SELECT outcome, SUM(n) FROM goal_lookup_counts {where} GROUP BY outcome", args).fetchall())
+        hist = dict(db.execute(f"SELECT MIN(CAST(similarity * 10 AS INTEGER), 9), COUNT(*) FROM goal_lookups {where} "
+                               f"{'AND' if where else 'WHERE'} similarity IS NOT NULL "
+                               "GROUP BY 1", args).fetchall())
+        near = db.execute(f"SELECT goal, matched, similarity, namespace FROM goal_lookups {where} "
+                          f"{'AND' if where else 'WHERE'} outcome = 'near_miss' ORDER BY similarity DESC LIMIT ?",
+                          args + [limit]).fetchall()
+    return {
+        "counts": {k: counts.get(k, 0) for k in ("exact", "hit", "near_miss", "miss")},
+        "similarity_histogram": {f"{b / 10:.1f}-{(b + 1) / 10:.1f}": n for b, n in sorted(hist.items())},
+        "near_misses": [{"goal": g, "matched": m, "similarity": s, "namespace": ns} for g, m, s, ns in near],
+    }
+
+_OPEN: Dict[str, PlanCache] = {}
+
+def open_cache(path: str) -> PlanCache:
+    """Return a process-wide PlanCache for ``path`` (shared so the LRU stays warm)."""
+    key = os.path.abspath(path)
+    cache = _OPEN.get(key)
+    if cache is None:
+        cache = _OPEN[key] = PlanCache(path)
+    return cache
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Plan cache tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    st = sub.add_parser("stats", help="Semantic lookup outcomes and near misses (for tuning the threshold)")
+    st.add_argument("path", nargs="?", default=os.path.join("logs", "plan_cache.json"))
+    st.add_argument("--namespace", default=None)
+    st.add_argument("-n", type=int, default=20)
+    args = ap.parse_args(argv)
+    print(json.dumps(lookup_stats(PlanCache(args.path), args.namespace, args.n), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
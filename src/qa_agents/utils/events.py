@@ -0,0 +1,80 @@
+from __future__ import annotations
+import json, os, time
+from typing import Any, Dict, Iterable, Iterator, Optional
+from .schemas import EVENTS
+
+class EventSink:
+    """Streams LogRecord-shaped dicts to a JSONL file as they happen.
+
+    Flush policy: flush after every ``flush_every`` records and/or when
+    ``flush_interval`` seconds have passed since the last flush (whichever comes
+    first). ``flush_every=1`` makes every record durable against a process crash.
+    """
+
+    def __init__(self, path: str, flush_every: int = 1, flush_interval: Optional[float] = None, mode: str = "w"):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._f = open(path, mode, encoding="utf-8")
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self.count = 0
+
+    def emit(self, event: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if event not in EVENTS or not isinstance(payload, dict):
+            raise ValueError(f"invalid log record: event={event!r} payload={type(payload).__name__}")
+        record = {"event": event, "payload": payload}
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.flush_every or (
+            self.flush_interval is not None and time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+        return record
+
+    def flush(self) -> None:
+        self._f.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self.flush()
+            self._f.close()
+
+    def __enter__(self) -> "EventSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def read_events(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield records from a JSONL event log. A torn final line (crash mid-write) is skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                break
+
+def export_json(records: Iterable[Dict[str, Any]], json_path: str) -> int:
+    """Write records as the legacy qa_run.json array without materializing them. Returns the count."""
+    d = os.path.dirname(json_path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    n = 0
+    with open(json_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for r in records:
+            body = json.dumps(r, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            f.write(("," if n else "") + "\n  " + body)
+            n += 1
+        f.write("\n]" if n else "]")
+    return n
@@ -0,0 +1,124 @@
+"""Frame capture off the step loop: a background writer feeding an append-only raw store.
+
+Export the raw store to PNGs offline with:
+
+    python -m qa_agents.utils.frames export logs/frames [--out logs/frames_png]
+"""
+from __future__ import annotations
+import argparse, hashlib, json, os, queue, threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+class RawFrameStore:
+    """All frames appended to one ``frames.raw`` file plus a ``frames.idx.jsonl`` offset index.
+
+    Exact-duplicate frames (same bytes) are stored once; their index entries point
+    at the first copy's offset. Read back with ``RawFrameStore.read`` (memory-mapped).
+    """
+
+    DATA, INDEX = "frames.raw", "frames.idx.jsonl"
+
+    def __init__(self, root: str):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self._data = open(os.path.join(root, self.DATA), "wb")
+        self._index = open(os.path.join(root, self.INDEX), "w", encoding="utf-8")
+        self._offsets: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.written = 0
+        self.duplicates = 0
+
+    def append(self, step_id: int, frame: np.ndarray, digest: str) -> Dict[str, Any]:
+        with self._lock:
+            offset = self._offsets.get(digest)
+            dup = offset is not None
+            if not dup:
+                offset = self._data.tell()
+                self._data.write(frame.data)
+                self._offsets[digest] = offset
+                self.written += 1
+            else:
+                self.duplicates += 1
+            entry = {"step_id": step_id, "offset": offset, "shape": list(frame.shape),
+                     "dtype": str(frame.dtype), "digest": digest, "dup": dup}
+            self._index.write(json.dumps(entry) + "\n")
+            return entry
+
+    def close(self) -> None:
+        with self._lock:
+            self._data.close(); self._index.close()
+
+    @classmethod
+    def entries(cls, root: str) -> List[Dict[str, Any]]:
+        with open(os.path.join(root, cls.INDEX), "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    @classmethod
+    def read(cls, root: str, entry: Dict[str, Any]) -> np.ndarray:
+        return np.memmap(os.path.join(root, cls.DATA), dtype=entry["dtype"], mode="r",
+                         offset=entry["offset"], shape=tuple(entry["shape"]))
+
+class FrameSink:
+    """Hands frames to ``workers`` background threads that hash and append them to ``store``.
+
+    ``submit`` blocks once ``max_queue`` frames are pending, which bounds memory and
+    applies backpressure to the step loop instead of dropping frames. Frames must not
+    be mutated by the caller after submission.
+    """
+
+    def __init__(self, store: RawFrameStore, workers: int = 2, max_queue: int = 8):
+        self.store = store
+        self._q: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(1, max_queue))
+        self._threads = [threading.Thread(target=self._work, name=f"frame-writer-{i}", daemon=True)
+                         for i in range(max(1, workers))]
+        self.errors = 0
+        for t in self._threads:
+            t.start()
+
+    def _work(self) -> None:
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            step_id, frame = item
+            try:
+                frame = np.ascontiguousarray(frame)
+                digest = hashlib.blake2b(frame.data, digest_size=16).hexdigest()
+                self.store.append(step_id, frame, digest)
+            except Exception:
+                self.errors += 1
+
+    def submit(self, step_id: int, frame: np.ndarray) -> None:
+        self._q.put((step_id, frame))
+
+    def close(self) -> Dict[str, int]:
+        for _ in self._threads:
+            self._q.put(None)
+        for t in self._threads:
+            t.join()
+        self.store.close()
+        return {"written": self.store.written, "duplicates": self.store.duplicates, "errors": self.errors}
+
+def export_png(root: str, out_dir: Optional[str] = None) -> int:
+    """Offline conversion of a raw store to ``step_XX.png`` files. Returns the number written."""
+    import imageio.v2 as imageio
+    out_dir = out_dir or root
+    os.makedirs(out_dir, exist_ok=True)
+    n = 0
+    for entry in RawFrameStore.entries(root):
+        imageio.imwrite(os.path.join(out_dir, f"step_{entry['step_id']:02d}.png"), np.asarray(RawFrameStore.read(root, entry)))
+        n += 1
+    return n
+
+def main():
+    ap = argparse.ArgumentParser(description="Raw frame store tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ex = sub.add_parser("export", help="Convert a raw frame store to PNG files")
+    ex.add_argument("frames_dir")
+    ex.add_argument("--out", default=None)
+    args = ap.parse_args()
+    print(f"Exported {export_png(args.frames_dir, args.out)} frames")
+
+if __name__ == "__main__":
+    main()
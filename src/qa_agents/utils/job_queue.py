@@ -0,0 +1,157 @@
+"""Durable goal queue (sqlite) that QA workers on one host or many lease goals from.
+
+    python -m qa_agents.utils.job_queue enqueue queue.sqlite --manifest goals.jsonl --suite nightly
+    python -m qa_agents.run_worker --queue queue.sqlite --concurrency 2 --exit_when_empty
+    python -m qa_agents.utils.job_queue stats queue.sqlite --suite nightly
+
+A lease is held for ``lease_s`` seconds and renewed by heartbeats while the goal runs. A
+worker that dies stops renewing; the next ``lease()`` after expiry puts the job back in the
+queue (or fails it after ``max_attempts``). Write-backs are fenced by (worker, attempt), so a
+worker that lost its lease cannot overwrite the result of the retry. Workers on different
+machines need a filesystem with working POSIX locks for the database file.
+"""
+from __future__ import annotations
+import argparse, json, os, socket, sqlite3, time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .sqlite import WalDB
+
+DEFAULT_LEASE_S = 300.0
+
+class Job:
+    __slots__ = ("id", "suite", "goal_id", "entry", "attempt", "worker")
+
+    def __init__(self, id: int, suite: str, goal_id: str, entry: Dict[str, Any], attempt: int, worker: str) -> None:
+        self.id, self.suite, self.goal_id, self.entry, self.attempt, self.worker = id, suite, goal_id, entry, attempt, worker
+
+    @property
+    def goal(self) -> str:
+        return self.entry["goal"]
+
+def worker_id(slot: int = 0) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{slot}"
+
+class JobQueue(WalDB):
+    """Jobs move queued -> leased -> done, or back to queued on failure/expiry until ``failed``."""
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        conn.execute("CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY, suite TEXT NOT NULL, "
+                     "goal_id TEXT NOT NULL, entry TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'queued', "
+                     "attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, worker TEXT, "
+                     "lease_until REAL, enqueued_at REAL NOT NULL, finished_at REAL, result TEXT, error TEXT, "
+                     "UNIQUE (suite, goal_id))")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id)")
+
+    def _write(self, sql: str, args: Iterable[Any]) -> int:
+        with self._lock:
+            return self._db().execute(sql, tuple(args)).rowcount
+
+    def enqueue(self, entries: Iterable[Dict[str, Any]], suite: str = "default", max_attempts: int = 3) -> int:
+        """Add manifest entries (``goal`` and optional ``id``); ids already in the suite are skipped. Returns rows added."""
+        now, rows = time.time(), []
+        for i, e in enumerate(entries):
+            if not e.get("goal"):
+                raise ValueError(f"entry {i} has no 'goal'")
+            rows.append((suite, str(e.get("id") or f"goal_{i:04d}"), json.dumps(e, ensure_ascii=False), max_attempts, now))
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = conn.total_changes
+                conn.executemany("INSERT OR IGNORE INTO jobs (suite, goal_id, entry, max_attempts, enqueued_at) "
+                                 "VALUES (?, ?, ?, ?, ?)", rows)
+                added = conn.total_changes - before
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def lease(self, worker: str, lease_s: float = DEFAULT_LEASE_S, suite: Optional[str] = None) -> Optional[Job]:
+        """Claim the oldest queued job (after requeueing expired leases), or None when nothing is queued."""
+        now = time.time()
+        where, args = ("AND suite = ?", [suite]) if suite else ("", [])
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")  # one writer at a time: no job is claimed twice
+            try:
+                conn.execute("UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END, "
+                             "error = 'lease expired (worker ' || worker || ')', lease_until = NULL "
+                             "WHERE status = 'leased' AND lease_until < ?", (now,))
+                row = conn.execute(f"SELECT id, suite, goal_id, entry, attempts FROM jobs WHERE status = 'queued' {where} "
+                                   "ORDER BY id LIMIT 1", args).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE jobs SET status = 'leased', attempts = attempts + 1, worker = ?, lease_until = ? "
+                                 "WHERE id = ?", (worker, now + lease_s, row[0]))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return Job(row[0], row[1], row[2], json.loads(row[3]), row[4] + 1, worker)
+
+    _OWNED = "WHERE id = ? AND status = 'leased' AND worker = ? AND attempts = ?"
+
+    def heartbeat(self, job: Job, lease_s: float = DEFAULT_LEASE_S) -> bool:
+        """Extend the lease; False when it was lost (expired and requeued)."""
+        return self._write(f"UPDATE jobs SET lease_until = ? {self._OWNED}",
+                           (time.time() + lease_s, job.id, job.worker, job.attempt)) == 1
+
+    def complete(self, job: Job, result: Dict[str, Any]) -> bool:
+        """Write back a result; ignored (False) if this worker no longer holds the lease."""
+        return self._write(f"UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ?, lease_until = NULL "
+                           f"{self._OWNED}", (json.dumps(result, ensure_ascii=False), time.time(),
+                                              job.id, job.worker, job.attempt)) == 1
+
+    def fail(self, job: Job, error: str) -> bool:
+        """Give the job back for a retry, or mark it failed once its attempts are used up."""
+        return self._write("UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END, "
+                           f"error = ?, finished_at = ?, lease_until = NULL {self._OWNED}",
+                           (error, time.time(), job.id, job.worker, job.attempt)) == 1
+
+    def stats(self, suite: Optional[str] = None) -> Dict[str, int]:
+        where, args = ("WHERE suite = ?", [suite]) if suite else ("", [])
+        counts = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        with self._lock:
+            for status, n in self._db().execute(f"SELECT status, COUNT(*) FROM jobs {where} GROUP BY status", args):
+                counts[status] = n
+        return counts
+
+    def results(self, suite: Optional[str] = None) -> List[Dict[str, Any]]:
+        """One row per job in enqueue order: id, goal, status, attempts, worker and the written-back result."""
+        where, args = ("WHERE suite = ?", [suite]) if suite else ("", [])
+        with self._lock:
+            rows = self._db().execute(f"SELECT suite, goal_id, entry, status, attempts, worker, result, error FROM jobs "
+                                      f"{where} ORDER BY id", args).fetchall()
+        return [{"suite": s, "id": gid, "goal": json.loads(entry)["goal"], "status": status, "attempts": attempts,
+                 "worker": worker, "result": json.loads(result) if result else None, "error": error}
+                for s, gid, entry, status, attempts, worker, result, error in rows]
+
+def main(argv: Optional[List[str]] = None):
+    from ..run_suite import load_manifest
+    ap = argparse.ArgumentParser(description="QA job queue tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    en = sub.add_parser("enqueue", help="Add the goals of a JSONL manifest")
+    en.add_argument("path")
+    en.add_argument("--manifest", required=True)
+    en.add_argument("--suite", default="default")
+    en.add_argument("--max_attempts", type=int, default=3)
+    for name, help in (("stats", "Job counts by status"), ("results", "Per-job status and written-back results")):
+        p = sub.add_parser(name, help=help)
+        p.add_argument("path")
+        p.add_argument("--suite", default=None)
+    args = ap.parse_args(argv)
+
+    queue = JobQueue(args.path)
+    if args.cmd == "enqueue":
+        entries = load_manifest(args.manifest)
+        added = queue.enqueue(entries, args.suite, args.max_attempts)
+        print(f"Enqueued {added} of {len(entries)} goals into suite {args.suite!r}")
+    elif args.cmd == "stats":
+        print(json.dumps(queue.stats(args.suite), indent=2))
+    else:
+        print(json.dumps(queue.results(args.suite), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# An encoded observation is either {"kf": <full observation dict>} or
+# {"delta": [op, ...]} relative to the previously encoded observation, where op is
+# ["s", path, value] (set) or ["d", path] (delete) and path is a list of dict keys.
+# Lists and scalars are replaced whole; only dicts are diffed structurally.
+
+def diff(old: Dict[str, Any], new: Dict[str, Any], path: tuple = ()) -> List[list]:
+    ops: List[list] = []
+    for k in old:
+        if k not in new:
+            ops.append(["d", [*path, k]])
+    for k, v in new.items():
+        if k not in old:
+            ops.append(["s", [*path, k], v])
+            continue
+        ov = old[k]
+        if ov == v:
+            continue
+        if isinstance(ov, dict) and isinstance(v, dict):
+            ops.extend(diff(ov, v, (*path, k)))
+        else:
+            ops.append(["s", [*path, k], v])
+    return ops
+
+def patch(base: Dict[str, Any], ops: Iterable[list]) -> Dict[str, Any]:
+    """Apply diff ops to ``base`` without mutating it (dicts on each touched path are copied)."""
+    out = dict(base)
+    for op in ops:
+        path = op[1]
+        node = out
+        for k in path[:-1]:
+            child = dict(node.get(k) or {})
+            node[k] = child
+            node = child
+        if op[0] == "s":
+            node[path[-1]] = op[2]
+        else:
+            node.pop(path[-1], None)
+    return out
+
+class ObservationEncoder:
+    """Emits a full keyframe every ``keyframe_every`` observations and diffs in between."""
+
+    def __init__(self, keyframe_every: int = 10):
+        self.keyframe_every = max(1, keyframe_every)
+        self._prev: Optional[Dict[str, Any]] = None
+        self._n = 0
+
+    def encode(self, obs: Dict[str, Any]) -> Dict[str, Any]:
+        keyframe = self._prev is None or self._n % self.keyframe_every == 0
+        enc = {"kf": obs} if keyframe else {"delta": diff(self._prev, obs)}
+        self._prev = obs
+        self._n += 1
+        return enc
+
+class ObservationDecoder:
+    def __init__(self) -> None:
+        self._prev: Optional[Dict[str, Any]] = None
+
+    def decode(self, enc: Dict[str, Any]) -> Dict[str, Any]:
+        if "kf" in enc:
+            obs = enc["kf"]
+        elif self._prev is None:
+            raise ValueError("delta observation without a preceding keyframe")
+        else:
+            obs = patch(self._prev, enc["delta"])
+        self._prev = obs
+        return obs
+
+def decode_records(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Rewrite encoded ``payload["obs"]`` back to a full ``payload["observation"]`` (legacy shape)."""
+    dec = ObservationDecoder()
+    for r in records:
+        p = r.get("payload", {})
+        if "obs" in p:
+            p = dict(p)
+            p["observation"] = dec.decode(p.pop("obs"))
+            r = {**r, "payload": p}
+        yield r
+
+def observation_at(records: Iterable[Dict[str, Any]], step_id: int) -> Optional[Dict[str, Any]]:
+    """Reconstruct the observation recorded by the action with ``step_id`` (last match wins)."""
+    found = None
+    for r in decode_records(records):
+        p = r.get("payload", {})
+        if r.get("event") == "action" and p.get("step_id") == step_id:
+            found = p["observation"]
+    return found
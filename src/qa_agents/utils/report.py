@@ -0,0 +1,52 @@
+from __future__ import annotations
+import datetime, json, os
+from typing import Any, List, Optional
+
+class StreamingReport:
+    """Append-only markdown report.
+
+    ``append(history)`` writes only the messages added since the previous call and
+    flushes, so a killed run still leaves every completed turn on disk.
+    ``finish(verdict)`` writes the verdict footer once and closes the file.
+    """
+
+    def __init__(self, path: str, title: str = "# Agent‑S Run Report"):
+        self.path = path
+        self.title = title
+        self._f = None
+        self._written = 0
+        self._finished = False
+
+    def _start(self) -> None:
+        if self._f is not None:
+            self._f.close()
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._f = open(self.path, "w", encoding="utf-8")
+        self._f.write(f"{self.title}\n\n")
+        self._written = 0
+        self._finished = False
+
+    def append(self, history: List[Any]) -> None:
+        # A shorter history than we've already written means a new run started.
+        if self._f is None or self._finished or len(history) < self._written:
+            self._start()
+        f = self._f
+        for m in history[self._written:]:
+            f.write(f"**{m.role}**: {m.content}\n")
+            if m.data: f.write(f"\n```json\n{json.dumps(m.data, indent=2)}\n```\n\n")
+        self._written = len(history)
+        f.flush()
+
+    def finish(self, verdict: str, extra: Optional[str] = None) -> None:
+        if self._finished:
+            return
+        if self._f is None:
+            self._start()
+        self._f.write(f"Verdict: **{verdict}**\n\n")
+        if extra: self._f.write(f"{extra}\n\n")
+        self._f.write(f"_Generated: {datetime.datetime.now().isoformat()}_\n")
+        self._f.close()
+        self._f = None
+        self._finished = True
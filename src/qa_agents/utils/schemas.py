@@ -1,6 +1,6 @@
 from __future__ import annotations
 from pydantic import BaseModel, Field
-from typing import List, Literal, Optional, Dict, Any
+from typing import Any, ClassVar, Dict, List, Literal, Optional, Union, get_args
 
 class PlanStep(BaseModel):
     id: int
@@ -35,5 +35,84 @@ class Verification(BaseModel):
     need_replan: bool = False
 
 class LogRecord(BaseModel):
-    event: Literal["plan","action","verify","replan","finish"]
+    event: Literal["plan","action","verify","replan","finish","span"]
     payload: Dict[str, Any]
+
+# Event names accepted by EventSink (checked without building a LogRecord per event).
+EVENTS = frozenset(get_args(LogRecord.model_fields["event"].annotation))
+
+# Hot-loop records. The executor, envs and verifier exchange these slotted, unvalidated
+# stand-ins for the models above; they expose the same attributes and a ``model_dump()``
+# equal to the model's (a deep copy, as pydantic returns). Envs and the executor may return
+# either form (see ``AnyObservation``). Validation happens at the boundaries (LLM plans, the
+# dict env API, ``to_model()``).
+
+_ATOMS = frozenset((str, int, float, bool, type(None)))
+
+def _dump(value: Any) -> Any:
+    """Copy containers and dump nested models/records the way pydantic's ``model_dump()`` does."""
+    cls = type(value)
+    if cls in _ATOMS:
+        return value
+    if cls is dict:
+        return {k: v if type(v) in _ATOMS else _dump(v) for k, v in value.items()}
+    if isinstance(value, dict):
+        return {k: _dump(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return type(value)(_dump(v) for v in value)
+    dump = getattr(value, "model_dump", None)
+    return dump() if callable(dump) else value
+
+class _Record:
+    __slots__ = ()
+    _model: ClassVar[type]
+
+    def model_dump(self) -> Dict[str, Any]:
+        return {k: _dump(getattr(self, k)) for k in self.__slots__}
+
+    def to_model(self):
+        """The validated pydantic model (raises pydantic.ValidationError)."""
+        return self._model.model_validate(self.model_dump())
+
+    def __eq__(self, other: object) -> bool:
+        dump = getattr(other, "model_dump", None)
+        return callable(dump) and self.model_dump() == dump()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{k}={getattr(self, k)!r}' for k in self.__slots__)})"
+
+class FastAction(_Record):
+    __slots__ = ("name", "target", "params")
+    _model = Action
+
+    def __init__(self, name: str, target: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> None:
+        self.name, self.target, self.params = name, target, {} if params is None else params
+
+class FastObservation(_Record):
+    __slots__ = ("screen", "ui_tree", "info")
+    _model = Observation
+
+    def __init__(self, screen: str, ui_tree: Dict[str, Any], info: Optional[Dict[str, Any]] = None) -> None:
+        self.screen, self.ui_tree, self.info = screen, ui_tree, {} if info is None else info
+
+    def model_dump(self) -> Dict[str, Any]:  # once per logged step
+        return {"screen": self.screen, "ui_tree": _dump(self.ui_tree), "info": _dump(self.info)}
+
+class FastActionResult(_Record):
+    __slots__ = ("ok", "observation", "message", "bug")
+    _model = ActionResult
+
+    def __init__(self, ok: bool, observation: Any, message: str = "", bug: Optional[str] = None) -> None:
+        self.ok, self.observation, self.message, self.bug = ok, observation, message, bug
+
+class FastVerification(_Record):
+    __slots__ = ("passed", "reason", "need_replan")
+    _model = Verification
+
+    def __init__(self, passed: bool, reason: str, need_replan: bool = False) -> None:
+        self.passed, self.reason, self.need_replan = passed, reason, need_replan
+
+# What envs return from reset/step/restore/observe: either form, read by attribute or model_dump().
+AnyObservation = Union[Observation, FastObservation]
@@ -0,0 +1,47 @@
+from __future__ import annotations
+import os, sqlite3, threading, time
+from typing import Callable, Optional
+
+def open_wal(path: str, setup: Optional[Callable[[sqlite3.Connection], None]] = None,
+             timeout: float = 30, attempts: int = 50) -> sqlite3.Connection:
+    """Autocommit connection in WAL mode, usable from any thread; ``setup`` creates the schema."""
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+    for attempt in range(attempts):
+        # Switching to WAL ignores the busy timeout while another process creates the file.
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            break
+        except sqlite3.OperationalError:
+            if attempt == attempts - 1: raise
+            time.sleep(0.02)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if setup is not None:
+        setup(conn)
+    return conn
+
+class WalDB:
+    """Base for stores on one sqlite file: a lazily opened connection per process, guarded by ``_lock``."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        pass
+
+    def _db(self) -> sqlite3.Connection:
+        # Connections must not cross a fork; reopen in each process.
+        if self._conn is None or self._pid != os.getpid():
+            self._conn, self._pid = open_wal(self.path, self._setup), os.getpid()
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
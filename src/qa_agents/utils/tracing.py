@@ -0,0 +1,131 @@
+"""Lightweight nested span tracing with Chrome/Perfetto trace export.
+
+Disabled by default; ``span()`` then returns a shared no-op context manager, so
+instrumented call sites cost one attribute check. Print the slowest spans across runs:
+
+    python -m qa_agents.utils.tracing top logs/**/chrome_trace.json -n 20
+"""
+from __future__ import annotations
+import argparse, glob, json, os, threading, time
+from typing import Any, Dict, List, Optional
+
+class _NoopSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NOOP = _NoopSpan()
+
+class _Span:
+    __slots__ = ("tracer", "name", "attrs", "start", "depth", "parent")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer, self.name, self.attrs = tracer, name, attrs
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        self.depth = len(stack)
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        rec = {"name": self.name, "start_us": (self.start - self.tracer.t0) / 1e3,
+               "dur_us": (end - self.start) / 1e3, "depth": self.depth, "parent": self.parent,
+               "tid": threading.get_ident()}
+        if self.attrs: rec["attrs"] = self.attrs
+        if exc_type is not None: rec["error"] = exc_type.__name__
+        with self.tracer._lock:
+            self.tracer.spans.append(rec)
+        return False
+
+class Tracer:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.spans: List[Dict[str, Any]] = []
+        self.t0 = time.perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[_Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Return finished spans (start order) and forget them."""
+        with self._lock:
+            spans, self.spans = self.spans, []
+        return sorted(spans, key=lambda s: s["start_us"])
+
+TRACER = Tracer()
+
+def span(name: str, **attrs: Any):
+    if not TRACER.enabled:
+        return _NOOP
+    return _Span(TRACER, name, attrs)
+
+def enable(on: bool = True) -> None:
+    TRACER.enabled = on
+
+def enabled() -> bool:
+    return TRACER.enabled
+
+def drain() -> List[Dict[str, Any]]:
+    return TRACER.drain()
+
+def to_chrome_trace(spans: List[Dict[str, Any]], process_name: str = "qa_agents") -> Dict[str, Any]:
+    pid = os.getpid()
+    events: List[Dict[str, Any]] = [{"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": process_name}}]
+    for s in spans:
+        args = dict(s.get("attrs") or {})
+        if s.get("error"): args["error"] = s["error"]
+        events.append({"ph": "X", "name": s["name"], "cat": s["name"].split(".", 1)[0], "pid": pid, "tid": s["tid"],
+                       "ts": round(s["start_us"], 3), "dur": round(s["dur_us"], 3), "args": args})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def write_chrome_trace(path: str, spans: List[Dict[str, Any]], process_name: str = "qa_agents") -> None:
+    d = os.path.dirname(path)
+    if d: os.makedirs(d, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(to_chrome_trace(spans, process_name), f)
+
+def top_spans(paths: List[str], n: int = 20, by_name: bool = False) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            events = json.load(f).get("traceEvents", [])
+        rows.extend({"name": e["name"], "dur_ms": e["dur"] / 1e3, "file": path, "args": e.get("args", {})}
+                    for e in events if e.get("ph") == "X")
+    if by_name:
+        agg: Dict[str, Dict[str, Any]] = {}
+        for r in rows:
+            a = agg.setdefault(r["name"], {"name": r["name"], "count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            a["count"] += 1; a["total_ms"] += r["dur_ms"]; a["max_ms"] = max(a["max_ms"], r["dur_ms"])
+        return sorted(agg.values(), key=lambda a: a["total_ms"], reverse=True)[:n]
+    return sorted(rows, key=lambda r: r["dur_ms"], reverse=True)[:n]
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Trace tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    t = sub.add_parser("top", help="Print the N slowest spans across Chrome trace files")
+    t.add_argument("paths", nargs="+", help="chrome_trace.json files or glob patterns")
+    t.add_argument("-n", type=int, default=20)
+    t.add_argument("--by_name", action="store_true", help="Aggregate total/max time per span name")
+    args = ap.parse_args(argv)
+    paths = sorted({p for pat in args.paths for p in (glob.glob(pat, recursive=True) or [pat])})
+    rows = top_spans(paths, args.n, args.by_name)
+    for r in rows:
+        if args.by_name:
+            print(f"{r['total_ms']:>10.3f} ms total  {r['max_ms']:>9.3f} ms max  x{r['count']:<5} {r['name']}")
+        else:
+            print(f"{r['dur_ms']:>10.3f} ms  {r['name']:<24s} {r['file']}  {json.dumps(r['args'], ensure_ascii=False) if r['args'] else ''}")
+
+if __name__ == "__main__":
+    main()
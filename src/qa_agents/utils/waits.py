@@ -0,0 +1,75 @@
+"""Condition-based waits: poll the observation until a predicate holds instead of sleeping.
+
+A ``wait`` step gets a condition from ``params["until"]`` or, when the plan compiler can
+derive one, from the next step's target ("Wi‑Fi is on screen"). ``wait_until`` polls
+``env.observe()`` with exponential backoff and returns as soon as the condition holds; the
+step's ``seconds`` is the deadline, so a condition wait is never slower than the fixed sleep.
+
+    {"intent": "wait", "params": {"seconds": 2, "until": {"visible": "Wi‑Fi"}}}
+    {"intent": "wait", "params": {"seconds": 2, "until": {"info": {"wifi_on": false}}}}
+"""
+from __future__ import annotations
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+INITIAL_INTERVAL = 0.01
+MAX_INTERVAL = 0.25
+
+def _strings(tree: Any) -> Iterator[str]:
+    """Labels in a ui_tree: strings in lists/values and dict keys (e.g. toggle names)."""
+    if isinstance(tree, str):
+        yield tree
+    elif isinstance(tree, dict):
+        for k, v in tree.items():
+            yield k
+            yield from _strings(v)
+    elif isinstance(tree, (list, tuple)):
+        for v in tree:
+            yield from _strings(v)
+
+class Condition:
+    """``visible``: a label matching ``target`` is in the ui_tree; ``info``: every key has the value."""
+    __slots__ = ("visible", "info", "_key", "_norm")
+
+    def __init__(self, visible: Optional[str] = None, info: Optional[Dict[str, Any]] = None) -> None:
+        from ..planning.compiler import norm  # the compiler builds conditions
+        self.visible, self.info, self._norm = visible, info or {}, norm
+        self._key = norm(visible) if visible else None
+
+    @classmethod
+    def from_params(cls, until: Any) -> Optional["Condition"]:
+        if not isinstance(until, dict) or not (until.get("visible") or until.get("info")):
+            return None
+        return cls(until.get("visible"), until.get("info"))
+
+    def __call__(self, obs: Any) -> bool:
+        info = obs.info
+        if any(info.get(k) != v for k, v in self.info.items()):
+            return False
+        return self._key is None or any(self._norm(s) == self._key for s in _strings(obs.ui_tree))
+
+    def describe(self) -> Dict[str, Any]:
+        return {k: v for k, v in (("visible", self.visible), ("info", self.info)) if v}
+
+class WaitResult:
+    __slots__ = ("ok", "obs", "waited_s", "polls")
+
+    def __init__(self, ok: bool, obs: Any, waited_s: float, polls: int) -> None:
+        self.ok, self.obs, self.waited_s, self.polls = ok, obs, waited_s, polls
+
+def wait_until(observe: Callable[[], Any], condition: Callable[[Any], bool], timeout: float,
+               initial: float = INITIAL_INTERVAL, factor: float = 2.0, max_interval: float = MAX_INTERVAL,
+               sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic) -> WaitResult:
+    """Poll ``observe()`` until ``condition`` holds or ``timeout`` seconds pass (backoff doubles up to ``max_interval``)."""
+    start = clock()
+    deadline, interval, polls = start + timeout, initial, 0
+    while True:
+        obs = observe()
+        polls += 1
+        if condition(obs):
+            return WaitResult(True, obs, clock() - start, polls)
+        left = deadline - clock()
+        if left <= 0:
+            return WaitResult(False, obs, clock() - start, polls)
+        sleep(min(interval, left))
+        interval = min(interval * factor, max_interval)
@@ -0,0 +1,56 @@
+import sys, time, types
+import numpy as np
+from qa_agents.agents.agent_s_agents import PlannerAgent
+from qa_agents.agents.agent_s_session import AgentSSessionPool
+from qa_agents.envs.capture import Frame
+
+def _frame(n):
+    return Frame(np.full((4, 4, 3), n, dtype=np.uint8), digest=str(n))
+
+def _install_fake_gui_agents(monkeypatch, boot_s=0.0):
+    built = []
+
+    class AgentS2:
+        def __init__(self, **kwargs):
+            time.sleep(boot_s)
+            built.append(self)
+            self.calls = 0
+
+        def predict(self, instruction, observation):
+            self.calls += 1
+            if instruction == "boom":
+                raise RuntimeError("session died")
+            return {}, [f"pyautogui.click() # {instruction}"]
+
+    agent_mod = types.ModuleType("gui_agents.s2.agent"); agent_mod.AgentS2 = AgentS2
+    monkeypatch.setitem(sys.modules, "gui_agents", types.ModuleType("gui_agents"))
+    monkeypatch.setitem(sys.modules, "gui_agents.s2", types.ModuleType("gui_agents.s2"))
+    monkeypatch.setitem(sys.modules, "gui_agents.s2.agent", agent_mod)
+    monkeypatch.setitem(sys.modules, "pyautogui", types.ModuleType("pyautogui"))
+    return built
+
+def test_session_reused_across_steps_and_goals(monkeypatch):
+    built = _install_fake_gui_agents(monkeypatch)
+    pool = AgentSSessionPool()
+    for goal in ["Toggle WiFi", "Open display"]:
+        planner = PlannerAgent(False, "m", goal, None, "android", sessions=pool)
+        assert planner._first_action_from_agent_s(_frame(1)).endswith(goal)
+        assert planner._first_action_from_agent_s(_frame(2)).endswith(goal)
+    assert len(built) == 1 and built[0].calls == 4
+
+def test_failed_session_is_recycled(monkeypatch):
+    built = _install_fake_gui_agents(monkeypatch)
+    pool = AgentSSessionPool()
+    assert PlannerAgent(False, "m", "boom", None, "android", sessions=pool)._first_action_from_agent_s(_frame(1)) is None
+    assert PlannerAgent(False, "m", "g", None, "android", sessions=pool)._first_action_from_agent_s(_frame(1)) is not None
+    assert len(built) == 2 and pool.discarded == 1
+
+def test_background_warm_overlaps_setup(monkeypatch):
+    built = _install_fake_gui_agents(monkeypatch, boot_s=0.2)
+    pool = AgentSSessionPool()
+    planner = PlannerAgent(False, "m", "g", None, "android", sessions=pool)
+    t0 = time.perf_counter()
+    planner.warm()
+    assert time.perf_counter() - t0 < 0.1  # returns immediately
+    assert planner._first_action_from_agent_s(_frame(1)) is not None
+    assert len(built) == 1
@@ -0,0 +1,37 @@
+import random
+import numpy as np
+from qa_agents.envs.batched_mock import BatchedMockAndroidEnv, encode_actions
+from qa_agents.envs.mock_android import MockAndroidEnv
+from qa_agents.utils.schemas import Action
+
+TARGETS = [None, "Settings", "settings", "Network & Internet", "network", "Internet", "Display",
+           "WiFi", "wifi", "Wi‑Fi", "wi-fi", ""]
+
+def _random_action(rng):
+    name = rng.choice(["open_settings", "tap", "tap", "toggle", "toggle", "type", "wait"])
+    return Action(name=name, target=rng.choice(TARGETS), params={"text": "x"} if name == "type" else {})
+
+def test_batched_env_matches_scalar_env():
+    rng = random.Random(1234)
+    n = 64
+    batched, scalar = BatchedMockAndroidEnv(n), [MockAndroidEnv() for _ in range(n)]
+    batched.reset()
+    for env in scalar:
+        env.reset()
+    for _ in range(300):
+        actions = [_random_action(rng) for _ in range(n)]
+        ok, observations, messages = batched.step_actions(actions)
+        for i, (env, action) in enumerate(zip(scalar, actions)):
+            s_ok, s_obs, s_msg = env.step(action)
+            assert (bool(ok[i]), observations[i], messages[i]) == (s_ok, s_obs, s_msg)
+        if rng.random() < 0.05:
+            batched.reset()
+            for env in scalar:
+                env.reset()
+
+def test_step_on_encoded_arrays():
+    env = BatchedMockAndroidEnv(3)
+    ops, targets = encode_actions([Action(name="open_settings"), Action(name="tap", target="Settings"), Action(name="wait")])
+    assert env.step(ops, targets).tolist() == [True, True, True]
+    assert env.screen.tolist() == [1, 1, 0]
+    assert isinstance(env.wifi_on, np.ndarray)
@@ -0,0 +1,9 @@
+from qa_agents.bench.suite import compare, run
+
+def test_quick_benchmarks_and_compare():
+    data = run(only=["mock_env_step", "e2e_router_run"], quick=True)
+    assert set(data["results"]) == {"mock_env_step", "e2e_router_run"}
+    assert all(r["ns_per_op"] > 0 for r in data["results"].values())
+    slower = {"results": {k: {**v, "ns_per_op": v["ns_per_op"] * 2} for k, v in data["results"].items()}}
+    assert not any(r["regressed"] for r in compare(data, data))
+    assert all(r["regressed"] for r in compare(data, slower, threshold=0.5))
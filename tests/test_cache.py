@@ -0,0 +1,66 @@
+import json, multiprocessing
+from qa_agents.utils.cache import PlanCache
+
+def _writer(path, worker, n):
+    cache = PlanCache(path)
+    for i in range(n):
+        cache.set(f"w{worker}-{i}", {"steps": [i] * 5})
+
+def test_migrates_legacy_json_once(tmp_path):
+    legacy = tmp_path / "plan_cache.json"
+    legacy.write_text(json.dumps({"a": {"steps": [1]}, "b": {"steps": [2]}}))
+    cache = PlanCache(str(legacy))
+    assert cache.path.endswith("plan_cache.sqlite")
+    assert cache.get("a") == {"steps": [1]} and len(cache) == 2
+    cache.set("a", {"steps": [9]})
+    assert PlanCache(str(legacy)).get("a") == {"steps": [9]}  # not re-imported over newer data
+
+def test_lru_is_bounded(tmp_path):
+    cache = PlanCache(str(tmp_path / "c.sqlite"), capacity=2)
+    for k in "abc":
+        cache.set(k, k)
+    assert list(cache._lru) == ["b", "c"]
+    assert cache.get("a") == "a"
+
+def test_concurrent_writers(tmp_path):
+    path = str(tmp_path / "c.sqlite")
+    procs = [multiprocessing.Process(target=_writer, args=(path, w, 50)) for w in range(4)]
+    for p in procs: p.start()
+    for p in procs: p.join()
+    assert all(p.exitcode == 0 for p in procs)
+    cache = PlanCache(path)
+    assert len(cache) == 200
+    assert cache.get("w3-49") == {"steps": [49] * 5}
+
+def test_semantic_cache_matches_paraphrases_and_records_stats(tmp_path):
+    from qa_agents.utils.cache import SemanticPlanCache, lookup_stats
+    cache = PlanCache(str(tmp_path / "c.sqlite"))
+    plans = SemanticPlanCache(cache, "plan", threshold=0.8)
+    plans.set("Toggle Wi‑Fi off and on", "k1", {"steps": [1]})
+    plans.set("Open display settings", "k2", {"steps": [2]})
+    assert plans.get("Turn WiFi off then back on", "k3") == {"steps": [1]}
+    assert plans.last["outcome"] == "hit" and plans.last["matched"] == "Toggle Wi‑Fi off and on"
+    assert plans.get("Toggle wifi off and on twice", "k4") is None  # 0.78: near miss
+    assert plans.get("Turn wifi on then off", "k5") is None          # order matters
+    assert plans.get("Open display settings", "k2") == {"steps": [2]}
+    assert SemanticPlanCache(cache, "other").get("Turn WiFi off then back on", "k3") is None
+    assert lookup_stats(cache, "plan")["counts"]["hit"] == 0  # buffered until flushed
+    plans.flush()
+    stats = lookup_stats(cache, "plan")
+    assert stats["counts"] == {"exact": 1, "hit": 1, "near_miss": 1, "miss": 1}
+    assert stats["near_misses"][0]["goal"] == "Toggle wifi off and on twice"
+
+def test_semantic_cache_caps_candidates_and_lookup_rows(tmp_path):
+    from qa_agents.utils.cache import SemanticPlanCache, lookup_stats
+    cache = PlanCache(str(tmp_path / "c.sqlite"))
+    plans = SemanticPlanCache(cache, "plan", max_candidates=4, flush_every=8, max_lookup_rows=10)
+    for i in range(40):
+        assert plans.get(f"Toggle Wi‑Fi off and on #{i}", f"k{i}") is None
+        plans.set(f"Toggle Wi‑Fi off and on #{i}", f"k{i}", {"steps": [i]})
+    assert len(plans._index.candidates(plans.hasher.buckets(frozenset({"toggle", "wifi"})), 4)) <= 4
+    assert plans.get("Toggle Wi‑Fi off and on #3", "k3") == {"steps": [3]}
+    plans.flush()
+    assert cache._db().execute("SELECT COUNT(*) FROM goal_lookups").fetchone()[0] == 10
+    assert lookup_stats(cache, "plan")["counts"]["exact"] == 1
+    other = SemanticPlanCache(PlanCache(str(tmp_path / "c.sqlite")), "plan", threshold=0.5)  # another process's view
+    assert other.get("Toggle Wi‑Fi off and on #7 please", "x") == {"steps": [7]}
@@ -0,0 +1,58 @@
+import os, struct, sys, textwrap, time
+import numpy as np
+import pytest
+from qa_agents.envs.capture import ScreenCapture
+
+FAKE_ADB = textwrap.dedent("""\
+    #!{python}
+    import struct, sys
+    # Fake `adb exec-out sh`: answers each `screencap` line with a raw 4x2 RGBA frame.
+    # Frames 1 and 2 are identical; the shell is spawned once and logged to {log}.
+    open({log!r}, "a").write("spawn\\n")
+    n = 0
+    out = sys.stdout.buffer
+    for line in sys.stdin:
+        if line.strip() != "screencap":
+            continue
+        value = 10 if n in (1, 2) else n
+        out.write(struct.pack("<IIII", 4, 2, 1, 0) + bytes([value, 0, 0, 255]) * 8)
+        out.flush()
+        n += 1
+""")
+
+def _fake_adb(tmp_path, monkeypatch, script):
+    adb = tmp_path / "adb"
+    adb.write_text(script)
+    adb.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+@pytest.mark.parametrize("select_pipes", [True, False])
+def test_persistent_raw_capture_with_dedup(tmp_path, monkeypatch, select_pipes):
+    monkeypatch.setattr(ScreenCapture, "SELECT_PIPES", select_pipes)  # False: the reader-thread path used off POSIX
+    log = tmp_path / "spawns.log"
+    _fake_adb(tmp_path, monkeypatch, FAKE_ADB.format(python=sys.executable, log=str(log)))
+
+    cap = ScreenCapture()
+    frames = [cap.capture() for _ in range(4)]
+    cap.close()
+    assert all(f is not None for f in frames)
+    assert frames[0].rgb.shape == (2, 4, 3) and frames[0].rgb.dtype == np.uint8
+    assert [f.duplicate for f in frames] == [False, False, True, False]
+    assert frames[2].rgb is frames[1].rgb and int(frames[3].rgb[0, 0, 0]) == 3
+    assert log.read_text().count("spawn") == 1
+    stats = cap.stats.summary()
+    assert stats["captures"] == 4 and stats["duplicates"] == 1 and stats["p95_ms"] > 0
+
+def test_missing_adb_returns_none(monkeypatch, tmp_path):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    cap = ScreenCapture(timeout=0.5)
+    assert cap.capture() is None and cap.stats.failures == 1
+
+@pytest.mark.parametrize("select_pipes", [True, False])
+def test_silent_device_times_out(tmp_path, monkeypatch, select_pipes):
+    monkeypatch.setattr(ScreenCapture, "SELECT_PIPES", select_pipes)
+    _fake_adb(tmp_path, monkeypatch, f"#!{sys.executable}\nimport sys, time\nsys.stdin.readline(); time.sleep(30)\n")
+    cap = ScreenCapture(timeout=0.3)
+    t0 = time.monotonic()
+    assert cap.capture() is None and cap.stats.failures == 1
+    assert time.monotonic() - t0 < 5
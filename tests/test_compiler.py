@@ -0,0 +1,44 @@
+import pytest
+from qa_agents.agents.executor import Executor
+from qa_agents.agents.verifier import Verifier
+from qa_agents.envs.mock_android import MockAndroidEnv
+from qa_agents.planning.compiler import WIFI, PlanCompileError, compile_plan
+from qa_agents.utils.schemas import Plan, PlanStep
+
+def _plan(*steps):
+    return Plan(goal="g", steps=[PlanStep(id=i + 1, description=s[0], intent=s[0], target=s[1], params=s[2] if len(s) > 2 else {})
+                                 for i, s in enumerate(steps)])
+
+def test_aliases_resolve_to_one_canonical_target():
+    index = MockAndroidEnv.targets
+    assert {index.resolve(t) for t in ("WiFi", "wifi", "Wi‑Fi", "Wi-Fi", "WI FI")} == {WIFI}
+    assert index.resolve("network") == index.resolve("NETWORK & internet") == "Network & Internet"
+    assert index.resolve("Bluetooth") is None
+
+def test_unresolved_targets_are_reported_before_running():
+    plan = _plan(("open_settings", None), ("tap", "Search"), ("verify", "dark mode"))
+    program = compile_plan(plan, MockAndroidEnv.targets)
+    assert program.unresolved == [{"step_id": 2, "intent": "tap", "target": "Search"}]
+    with pytest.raises(PlanCompileError, match="Search"):
+        compile_plan(plan, MockAndroidEnv.targets, strict=True)
+
+def test_compiled_steps_drive_executor_and_verifier():
+    env = MockAndroidEnv()
+    executor, verifier = Executor(env), Verifier("Toggle Wi‑Fi off and on")
+    plan = _plan(("open_settings", None), ("tap", "network"), ("toggle", "Wi-Fi", {"state": "off"}),
+                 ("toggle", "WiFi", {"state": "off"}), ("verify", "wifi", {"expected_state": "off"}))
+    results = [(op, executor.run(op)) for op in compile_plan(plan, executor.targets).ops]
+    assert all(res.ok for _, res in results[:-1])  # verify is not an env action
+    assert results[3][1].message == "Wi‑Fi already off"
+    op, res = results[-1]
+    ver = verifier.verify(op, res.observation)
+    assert ver.passed and ver.reason == "Wi‑Fi desired=False actual=False"
+
+def test_only_toggles_skip_a_wifi_state_already_reached():
+    env = MockAndroidEnv()
+    executor = Executor(env)
+    ops = compile_plan(_plan(("open_settings", None), ("tap", "Network & Internet"), ("tap", "WiFi", {"state": "on"}),
+                             ("verify", "WiFi", {"state": "on"})), executor.targets).ops
+    results = [executor.run(op) for op in ops]
+    assert results[2].message.startswith("Tap failed")  # the tap reached the env (no Wi‑Fi item to tap there)
+    assert not results[3].ok and results[3].message == "Unknown intent verify"
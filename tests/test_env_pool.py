@@ -0,0 +1,76 @@
+import json, sys, time, types
+import pytest
+from qa_agents.envs import env_pool
+from qa_agents.envs.env_pool import EnvPool
+
+def _install_fake_android_world(monkeypatch, boot_s=0.0):
+    booted = []
+
+    class AndroidEnv:
+        def __init__(self, task_name):
+            time.sleep(boot_s)
+            booted.append(self)
+            self.task_name, self.broken, self.resets = task_name, False, 0
+
+        def reset(self):
+            if self.broken:
+                raise RuntimeError("emulator died")
+            self.resets += 1
+            return {"screen": "home", "ui_tree": {"buttons": ["Settings"]}, "info": {"wifi_on": True}}
+
+        def step(self, low):
+            return True, {"screen": "settings", "ui_tree": {}, "info": {"wifi_on": True}}, f"did {low['op']}"
+
+    env_mod = types.ModuleType("android_world.env"); env_mod.AndroidEnv = AndroidEnv
+    monkeypatch.setitem(sys.modules, "android_world", types.ModuleType("android_world"))
+    monkeypatch.setitem(sys.modules, "android_world.env", env_mod)
+    monkeypatch.setattr(env_pool, "_DEFAULT", None)
+    return booted
+
+def test_suite_boots_once_and_resets_between_goals(tmp_path, monkeypatch):
+    from qa_agents.run_suite import run_suite
+    booted = _install_fake_android_world(monkeypatch)
+    monkeypatch.chdir(tmp_path)
+    entries = [{"id": f"g{i}", "goal": "Open display settings"} for i in range(4)]
+    summary = run_suite(entries, str(tmp_path / "logs"), env_name="android")
+    assert [r["status"] for r in summary["results"]] == ["passed"] * 4
+    # one reset per goal: the release reset hands a fresh env to the next goal (plus the first goal's)
+    assert len(booted) == 1 and booted[0].resets == 5
+    assert env_pool.default_env_pool().stats() == {"booted": 1, "reused": 4, "recycled": 0, "idle": 1}
+
+def test_failed_envs_are_recycled(monkeypatch):
+    booted = _install_fake_android_world(monkeypatch)
+    pool = EnvPool()
+    with pytest.raises(ValueError):
+        with pool.lease("settings_wifi"):
+            raise ValueError("goal crashed")
+    with pool.lease("settings_wifi") as env:
+        env._env.broken = True  # reset on release fails
+    with pool.lease("settings_wifi") as env:
+        pass
+    assert len(booted) == 3 and pool.recycled == 2 and pool.stats()["idle"] == 1
+
+def test_leases_are_bounded_per_task_and_warm_in_background(monkeypatch):
+    booted = _install_fake_android_world(monkeypatch, boot_s=0.2)
+    pool = EnvPool()
+    t0 = time.perf_counter()
+    thread = pool.warm("settings_wifi")
+    assert time.perf_counter() - t0 < 0.1
+    thread.join()
+    env = pool.checkout("settings_wifi")
+    with pytest.raises(TimeoutError):
+        pool.checkout("settings_wifi", timeout=0.05)
+    with pool.lease("clock_alarm") as other:
+        assert other is not env and other.task_name == "clock_alarm"
+    pool.release(env)
+    assert pool.checkout("settings_wifi") is env and len(booted) == 2
+
+def test_speculative_runs_lease_from_the_pool(tmp_path, monkeypatch):
+    from qa_agents import run_test
+    booted = _install_fake_android_world(monkeypatch)
+    monkeypatch.chdir(tmp_path)
+    for i in range(2):
+        monkeypatch.setattr(sys, "argv", ["run_test", "--env", "android", "--speculate", "--goal", "Open display settings",
+                                          "--logs_dir", str(tmp_path / f"logs{i}")])
+        run_test.main()
+    assert len(booted) == 1 and env_pool.default_env_pool().stats()["reused"] == 1
@@ -0,0 +1,18 @@
+import json
+from qa_agents.utils.events import EventSink, export_json, read_events
+
+def test_sink_streams_and_exports_legacy_json(tmp_path):
+    path = tmp_path / "qa_run.jsonl"
+    sink = EventSink(str(path), flush_every=1)
+    sink.emit("plan", {"goal": "g", "steps": []})
+    sink.emit("action", {"step_id": 1, "ok": True})
+    # Records are on disk before close, so a crash keeps them.
+    assert [r["event"] for r in read_events(str(path))] == ["plan", "action"]
+    sink.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"event": "fini')  # torn write
+    records = list(read_events(str(path)))
+    assert len(records) == 2
+    out = tmp_path / "qa_run.json"
+    assert export_json(read_events(str(path)), str(out)) == 2
+    assert json.loads(out.read_text(encoding="utf-8")) == records
@@ -0,0 +1,32 @@
+import threading, time
+import numpy as np
+from qa_agents.utils.frames import FrameSink, RawFrameStore, export_png
+
+def test_raw_store_dedups_and_memmaps(tmp_path):
+    root = str(tmp_path / "frames")
+    sink = FrameSink(RawFrameStore(root), workers=1)
+    a = np.zeros((4, 6, 3), dtype=np.uint8)
+    b = np.full((4, 6, 3), 7, dtype=np.uint8)
+    for step, frame in enumerate([a, b, b.copy(), a.copy()], 1):
+        sink.submit(step, frame)
+    assert sink.close() == {"written": 2, "duplicates": 2, "errors": 0}
+    entries = RawFrameStore.entries(root)
+    assert [e["step_id"] for e in entries] == [1, 2, 3, 4]
+    assert entries[2]["offset"] == entries[1]["offset"]
+    assert (np.asarray(RawFrameStore.read(root, entries[2])) == b).all()
+    assert export_png(root, str(tmp_path / "png")) == 4
+    assert (tmp_path / "png" / "step_04.png").exists()
+
+def test_submit_applies_backpressure(tmp_path):
+    store = RawFrameStore(str(tmp_path))
+    gate = threading.Event()
+    append = store.append
+    store.append = lambda *a: (gate.wait(), append(*a))[1]
+    sink = FrameSink(store, workers=1, max_queue=1)
+    sink.submit(1, np.zeros((2, 2, 3), np.uint8))  # taken by the worker, blocked on the gate
+    sink.submit(2, np.ones((2, 2, 3), np.uint8))   # fills the queue
+    blocked = threading.Thread(target=sink.submit, args=(3, np.full((2, 2, 3), 2, np.uint8)))
+    blocked.start(); time.sleep(0.1)
+    assert blocked.is_alive()
+    gate.set(); blocked.join(1)
+    assert not blocked.is_alive() and sink.close()["written"] == 3
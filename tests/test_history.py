@@ -0,0 +1,118 @@
+import pickle
+from qa_agents.agent_s_compat import History, Message, latest
+from qa_agents.pipeline.agent_s_orchestrator import run_agents
+
+def test_history_indexes_latest_per_role_and_key():
+    h = History([Message("planner", "p", {"plan": [1]})])
+    h.append(Message("executor", "e1", {"executed": None}))
+    h.append(Message("executor", "e2", {"done": True}))
+    h.append(Message("executor", "e3", {"done": False}))
+    assert h.latest("planner", "plan").content == "p"
+    assert h.latest("executor").content == "e3"
+    assert h.latest("executor", "done").content == "e2"
+    assert h.latest("verifier") is None
+    h.pop()
+    assert h.latest("executor").content == "e2"
+    assert isinstance(h, list) and pickle.loads(pickle.dumps(h)).latest("executor").content == "e2"
+
+def test_latest_matches_plain_list_scan():
+    msgs = [Message("executor", str(i), {"done": i % 3 == 0}) for i in range(10)]
+    assert latest(History(msgs), "executor", "done") is latest(list(msgs), "executor", "done")
+
+def test_router_run_returns_history(tmp_path):
+    history = run_agents("Toggle WiFi off and on", "mock", None, str(tmp_path), False, "gpt-4o-mini", None)
+    assert isinstance(history, History)
+    assert history[-1].role == "supervisor" and history[-1].data["final"]
+
+def test_pipelined_router_matches_sequential_and_overlaps_background(tmp_path):
+    import time
+    from qa_agents.agent_s_compat import Router, ShimAgent
+
+    class Planner(ShimAgent):
+        def step(self, h): return Message("planner", "plan", {"plan": list(range(4))})
+
+    class Executor(ShimAgent):
+        def __init__(self): super().__init__("executor"); self.n = 0
+        def step(self, h):
+            time.sleep(0.05); self.n += 1
+            return Message("executor", f"e{self.n}", {"done": self.n >= 4})
+
+    class Verifier(ShimAgent):
+        def step(self, h): return Message("verifier", "v", {"passed": False})
+
+    class Supervisor(ShimAgent):
+        def __init__(self): super().__init__("supervisor"); self.seen = []
+        def decide(self, h):
+            final = bool(latest(h, "executor", "done"))
+            return Message("supervisor", "s", {"final": final})
+        def background(self, h, msg): time.sleep(0.05); self.seen.append(len(h))
+        def step(self, h):
+            msg = self.decide(h); self.background(h, msg); return msg
+
+    def run(pipelined):
+        agents = {"planner": Planner("planner"), "executor": Executor(), "verifier": Verifier("verifier"),
+                  "supervisor": Supervisor()}
+        t0 = time.perf_counter()
+        h = Router(agents, pipelined=pipelined).run("planner", History())
+        return [(m.role, m.content, m.data) for m in h], agents["supervisor"].seen, time.perf_counter() - t0
+
+    seq, seq_seen, seq_s = run(False)
+    pip, pip_seen, pip_s = run(True)
+    assert pip == seq and pip_seen == seq_seen == [3, 7, 11, 15]
+    assert pip_s < seq_s - 0.1  # report writes hid behind the next execute
+
+def test_pipelined_agent_s_run_writes_same_report(tmp_path):
+    seq = run_agents("Toggle WiFi off and on", "mock", None, str(tmp_path / "a"), False, "gpt-4o-mini", None)
+    pip = run_agents("Toggle WiFi off and on", "mock", None, str(tmp_path / "b"), False, "gpt-4o-mini", None, pipelined=True)
+    assert [(m.role, m.content) for m in seq] == [(m.role, m.content) for m in pip]
+    strip = lambda p: (p / "agent_s_report.md").read_text(encoding="utf-8").rsplit("_Generated", 1)[0]
+    assert strip(tmp_path / "a") == strip(tmp_path / "b")
+
+def test_router_appends_to_a_plain_list_in_place():
+    from qa_agents.agent_s_compat import Router, ShimAgent
+
+    class Agent(ShimAgent):
+        def step(self, h):
+            if self.name == "supervisor":  # agents still get an indexed History
+                return Message("supervisor", "s", {"final": latest(h, "executor", "done") is not None})
+            return Message(self.name, self.name, {"done": self.name == "executor" and isinstance(h, History)})
+
+    history = [Message("user", "goal")]
+    out = Router({r: Agent(r) for r in Router.ORDER}).run("planner", history)
+    assert out is history and [m.role for m in history] == ["user"] + Router.ORDER
+    assert history[-1].data["final"]
+
+def test_history_view_is_a_read_only_prefix():
+    from qa_agents.agent_s_compat import HistoryView
+    h = History([Message("executor", "e1", {"done": False}), Message("supervisor", "s1", {}),
+                 Message("executor", "e2", {"done": True})])
+    view = HistoryView(h, 2)
+    h.append(Message("executor", "e3", {}))
+    assert len(view) == 2 and [m.content for m in view] == ["e1", "s1"] and view[-1].content == "s1"
+    assert [m.content for m in view[1:]] == ["s1"]
+    assert latest(view, "executor").content == "e1" and latest(view, "executor", "done") is None
+    assert latest(HistoryView(h, 4), "executor", "done").content == "e2"
+
+def test_pipelined_router_raises_an_earlier_background_error():
+    import pytest
+    from qa_agents.agent_s_compat import Router, ShimAgent
+
+    class Agent(ShimAgent):
+        def __init__(self, name): super().__init__(name); self.turns = 0
+        def step(self, h): return Message(self.name, self.name, {"done": True})
+
+    class Supervisor(Agent):
+        def decide(self, h):
+            self.turns += 1
+            return Message("supervisor", "s", {"final": self.turns == 2})
+        def background(self, h, msg):
+            if not msg.data["final"]:  # the first turn's report
+                raise RuntimeError("first report write failed")
+        def step(self, h):
+            msg = self.decide(h); self.background(h, msg); return msg
+
+    agents = {r: Agent(r) for r in Router.ORDER}
+    agents["supervisor"] = Supervisor("supervisor")
+    with pytest.raises(RuntimeError, match="first report write failed"):
+        Router(agents, pipelined=True).run("planner", History())
+    assert agents["supervisor"].turns == 2  # the run went on; the error surfaced at the end
@@ -0,0 +1,73 @@
+import json, subprocess, sys, time
+import pytest
+
+from qa_agents.utils.job_queue import JobQueue
+
+GOALS = ["Toggle Wi‑Fi off and on", "Turn WiFi off then back on", "Open display settings"]
+
+def test_workers_drain_suite_without_duplicates(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    entries = [{"id": f"g{i}", "goal": GOALS[i % 3]} for i in range(9)]
+    assert JobQueue(path).enqueue(entries, suite="nightly") == 9
+    assert JobQueue(path).enqueue(entries, suite="nightly") == 0  # re-enqueueing a manifest is a no-op
+    cmd = [sys.executable, "-m", "qa_agents.run_worker", "--queue", path, "--concurrency", "3", "--exit_when_empty",
+           "--poll_s", "0.05", "--logs_dir", str(tmp_path / "logs")]
+    assert subprocess.call(cmd, cwd=tmp_path) == 0
+    results = JobQueue(path).results("nightly")
+    assert [r["id"] for r in results] == [f"g{i}" for i in range(9)]
+    assert all(r["status"] == "done" and r["attempts"] == 1 for r in results)
+    assert {r["result"]["status"] for r in results} == {"passed"}
+    for r in results:
+        assert (tmp_path / "logs" / "nightly" / r["id"] / "qa_run.json").exists()
+
+def test_expired_lease_is_retried_and_stale_write_back_dropped(tmp_path):
+    q = JobQueue(str(tmp_path / "queue.sqlite"))
+    q.enqueue([{"id": "a", "goal": GOALS[0]}], max_attempts=2)
+    dead = q.lease("host-a:1:0", lease_s=0.05)
+    assert dead.attempt == 1 and q.lease("host-b:1:0") is None
+    time.sleep(0.1)  # host-a died: no heartbeat
+    job = q.lease("host-b:1:0", lease_s=5)
+    assert job.goal_id == "a" and job.attempt == 2
+    assert not q.heartbeat(dead) and not q.complete(dead, {"status": "passed"})
+    assert q.complete(job, {"status": "failed"})
+    [r] = q.results()
+    assert r["status"] == "done" and r["worker"] == "host-b:1:0" and r["result"] == {"status": "failed"}
+
+def test_failed_runs_retry_until_max_attempts(tmp_path):
+    q = JobQueue(str(tmp_path / "queue.sqlite"))
+    q.enqueue([{"goal": GOALS[0]}], max_attempts=2)
+    assert q.fail(q.lease("w"), "RuntimeError: emulator gone")
+    assert q.stats()["queued"] == 1
+    assert q.fail(q.lease("w"), "RuntimeError: emulator gone")
+    assert q.lease("w") is None
+    assert q.stats() == {"queued": 0, "leased": 0, "done": 0, "failed": 1}
+    assert q.results()[0]["error"] == "RuntimeError: emulator gone"
+
+def test_agent_s_runner_writes_back_verdict(tmp_path, monkeypatch):
+    from qa_agents.run_worker import work
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / "queue.sqlite")
+    JobQueue(path).enqueue([{"id": "wifi", "goal": GOALS[0]}])
+    counts = work(path, "w0", str(tmp_path / "logs"), runner="agent_s", plan_cache=str(tmp_path / "plans.json"))
+    assert counts == {"done": 1, "retried": 0, "lost": 0}
+    [r] = JobQueue(path).results()
+    assert r["status"] == "done" and r["result"]["status"] == "passed"
+    assert (tmp_path / "logs" / "default" / "wifi" / "agent_s_report.md").exists()
+
+def test_worker_skips_write_back_after_losing_its_lease(tmp_path, monkeypatch):
+    from qa_agents import run_worker
+    path = str(tmp_path / "queue.sqlite")
+    JobQueue(path).enqueue([{"id": "a", "goal": GOALS[0]}])
+
+    def stolen(job, logs_dir, opts):
+        q = JobQueue(path)  # the lease expired and another worker took the job over
+        q._db().execute("UPDATE jobs SET worker = 'host-b:1:0', attempts = attempts + 1 WHERE id = ?", (job.id,))
+        time.sleep(0.1)  # a heartbeat notices
+        return {"goal": job.goal, "status": "passed"}
+
+    monkeypatch.setitem(run_worker._RUN, "test", stolen)
+    monkeypatch.setattr(JobQueue, "complete", lambda *a: pytest.fail("wrote back after the lease was lost"))
+    counts = run_worker.work(path, "host-a:1:0", str(tmp_path / "logs"), lease_s=0.09, poll_s=0.01, max_jobs=1)
+    assert counts == {"done": 0, "retried": 0, "lost": 1}
+    [r] = JobQueue(path).results()
+    assert r["status"] == "leased" and r["worker"] == "host-b:1:0" and r["result"] is None
@@ -0,0 +1,104 @@
+import asyncio, time
+import pytest
+from qa_agents.llm.async_client import AsyncLLMClient, LLMError
+from qa_agents.llm.fake_server import FakeOpenAIServer
+from qa_agents.llm.openai_client import LLMClient
+
+def _client(server, **kw):
+    return AsyncLLMClient(api_key="test", base_url=server.base_url, backoff=0.01, max_backoff=0.05, **kw)
+
+def test_retries_429_and_5xx_then_succeeds():
+    with FakeOpenAIServer(fail_first=2, fail_status=503) as server:
+        client = _client(server)
+        steps = asyncio.run(client.plan("Toggle WiFi off and on"))
+    assert steps and steps[0]["intent"] == "open_settings"
+    assert len(server.requests) == 3 and client.retries == 2
+
+def test_non_retryable_status_fails_fast():
+    with FakeOpenAIServer(fail_first=1, fail_status=400) as server:
+        with pytest.raises(LLMError):
+            asyncio.run(_client(server).plan("x"))
+    assert len(server.requests) == 1
+
+def test_concurrency_limit_and_deadline():
+    with FakeOpenAIServer(latency=0.2) as server:
+        client = _client(server, max_concurrency=4)
+
+        async def many():
+            return await asyncio.gather(*[client.summarize("s", []) for _ in range(8)])
+
+        t0 = time.perf_counter()
+        assert len(asyncio.run(many())) == 8
+        assert 0.35 < time.perf_counter() - t0 < 1.5  # two waves of four, not one of eight
+        with pytest.raises(LLMError):
+            asyncio.run(client.summarize("s", [], deadline=0.05))
+
+def test_sync_wrapper(monkeypatch):
+    with FakeOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        llm = LLMClient()
+        assert llm.plan("Toggle WiFi off and on")[-1]["intent"] == "verify"
+        assert llm.summarize("s", []) == "- Summary from fake server"
+
+def test_summary_uses_compacted_log_and_caches_by_digest(monkeypatch, tmp_path):
+    from qa_agents.bench.summary_prompt import synthetic_log
+    from qa_agents.llm.compaction import compact_log, estimate_tokens, render
+    from qa_agents.utils.cache import PlanCache
+    log = synthetic_log(400, 50)
+    compact = compact_log(log, max_tokens=800)
+    assert estimate_tokens(render(compact)) <= 800
+    assert compact["failed_actions"] == 10 and compact["steps"][0][0] == 1 and compact["steps"][-1][0] == 400
+    with FakeOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        llm = LLMClient(summary_cache=PlanCache(str(tmp_path / "c.sqlite")), summary_tokens=800)
+        assert llm.summarize("s", log) == llm.summarize("s", iter(log)) == "- Summary from fake server"
+    assert len(server.requests) == 1 and llm.summary_stats["cache_hits"] == 1
+    assert llm.summary_stats["prompt_bytes"] < 4000
+
+def test_shared_clients_live_and_die_with_their_loop():
+    import gc, weakref
+    from qa_agents.llm import async_client
+    with FakeOpenAIServer() as server:
+        client = _client(server)
+
+        async def call():
+            await client.summarize("s", [])
+            return client._client(), asyncio.get_running_loop()
+
+        first, loop = asyncio.run(call())
+        assert async_client._SHARED[loop][("test", server.base_url)] is first and len(client._sems) == 1
+        ref = weakref.ref(loop)
+        del loop
+        gc.collect()
+        assert ref() is None and len(client._sems) == 0  # the entries went with the loop
+        assert all(entry.get(("test", server.base_url)) is not first for entry in async_client._SHARED.values())
+        second, _ = asyncio.run(call())
+        assert second is not first
+
+@pytest.mark.parametrize("reply", ['{"steps":[{"intent":"tap","id":null}]}', '{"steps": 5}', '[1, 2]',
+                                   '{"steps":[{"intent":"tap","params":[1]}]}', 'not json'])
+def test_malformed_plans_fall_back_to_rules(reply, monkeypatch, tmp_path):
+    from qa_agents.agents.planner import Planner
+    monkeypatch.chdir(tmp_path)
+    with FakeOpenAIServer(plan_reply=reply) as server:
+        with pytest.raises(LLMError):
+            asyncio.run(_client(server).plan("Toggle WiFi off and on"))
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        planner = Planner(use_llm=True)
+        plan = planner.plan("Toggle WiFi off and on")
+    assert plan.steps and isinstance(planner.llm.last_error, LLMError)
+
+def test_sync_wrapper_turns_any_failure_into_a_fallback(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    llm = LLMClient()
+
+    async def broken(*a, **kw):
+        raise ImportError("No module named 'openai'")
+
+    monkeypatch.setattr(llm.client, "plan", broken)
+    monkeypatch.setattr(llm.client, "summarize_compact", broken)
+    assert llm.plan("x") is None and isinstance(llm.last_error, LLMError)
+    assert llm.summarize("s", []).startswith("- Goal:")
@@ -0,0 +1,16 @@
+from qa_agents.utils.obs_codec import ObservationEncoder, decode_records, observation_at
+
+def test_delta_roundtrip_and_random_access():
+    observations = [
+        {"screen": "home", "ui_tree": {"buttons": ["Settings"]}, "info": {"wifi_on": True}},
+        {"screen": "settings", "ui_tree": {"list": ["Network & Internet"]}, "info": {"wifi_on": True}},
+        {"screen": "network", "ui_tree": {"toggles": {"Wi‑Fi": True}}, "info": {"wifi_on": True}},
+        {"screen": "network", "ui_tree": {"toggles": {"Wi‑Fi": False}}, "info": {"wifi_on": False}},
+        {"screen": "network", "ui_tree": {"toggles": {"Wi‑Fi": False}}, "info": {"wifi_on": False}},
+    ]
+    enc = ObservationEncoder(keyframe_every=3)
+    records = [{"event": "action", "payload": {"step_id": i + 1, "obs": enc.encode(o)}} for i, o in enumerate(observations)]
+    assert ["kf" in r["payload"]["obs"] for r in records] == [True, False, False, True, False]
+    assert records[4]["payload"]["obs"] == {"delta": []}
+    assert [r["payload"]["observation"] for r in decode_records(records)] == observations
+    assert observation_at(records, 3) == observations[2]
@@ -0,0 +1,30 @@
+from qa_agents.agents.planner import Planner
+from qa_agents.agents.supervisor import Supervisor
+from qa_agents.bench.replan import FaultyEnv
+from qa_agents.run_test import run_goal
+from qa_agents.utils.events import read_events
+from qa_agents.utils.obs_codec import decode_records
+
+GOAL = "Toggle Wi‑Fi off and on"
+
+def _events(out, name):
+    return [r["payload"] for r in decode_records(read_events(out["events_path"])) if r["event"] == name]
+
+def test_failed_step_replans_only_the_suffix(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    env = FaultyEnv(0.0, fail_at=3)  # the first toggle
+    out = run_goal(GOAL, env, Planner(), Supervisor(), str(tmp_path / "a"), replan=True)
+    assert out["status"] == "passed"
+    [replan] = _events(out, "replan")
+    assert replan["after_step"] == 3 and replan["screen"] == "network" and replan["source"] == "rules"
+    assert [s["id"] for s in replan["steps"]] == list(range(4, 4 + len(replan["steps"])))
+    assert env.steps == 3 + sum(s["intent"] != "verify" for s in replan["steps"])  # nothing before the fault ran twice
+    assert out["replanning"]["steps_not_reexecuted"] == 3
+
+    again = run_goal(GOAL, FaultyEnv(0.0, fail_at=3), Planner(), Supervisor(), str(tmp_path / "b"), replan=True)
+    assert again["replanning"]["sources"]["cache"] == 1
+
+def test_failed_action_without_replan_fails_the_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    out = run_goal(GOAL, FaultyEnv(0.0, fail_at=3), Planner(), Supervisor(), str(tmp_path / "a"))
+    assert out["status"] == "failed" and not _events(out, "replan")
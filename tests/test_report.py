@@ -0,0 +1,16 @@
+from qa_agents.agent_s_compat import Message
+from qa_agents.utils.report import StreamingReport
+
+def test_streaming_report_appends_only_new_messages(tmp_path):
+    path = tmp_path / "agent_s_report.md"
+    report = StreamingReport(str(path))
+    history = [Message("planner", "plan ready", {"plan": [1]})]
+    report.append(history)
+    history.append(Message("executor", "step one", {"done": False}))
+    report.append(history)
+    partial = path.read_text(encoding="utf-8")
+    assert partial.count("plan ready") == 1 and "step one" in partial and "Verdict" not in partial
+    report.finish("pass")
+    report.finish("fail")
+    text = path.read_text(encoding="utf-8")
+    assert text.count("Verdict: **pass**") == 1 and "fail" not in text
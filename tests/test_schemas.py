@@ -0,0 +1,41 @@
+import pydantic, pytest
+from qa_agents.envs.mock_android import MockAndroidEnv
+from qa_agents.utils.events import EventSink
+from qa_agents.utils.schemas import (ActionResult, FastAction, FastActionResult, FastObservation, FastVerification,
+                                     Observation)
+
+def test_records_match_the_models():
+    obs = MockAndroidEnv().reset()
+    assert isinstance(obs, FastObservation)
+    model = Observation(screen="home", ui_tree={"buttons": ["Settings"]}, info={"wifi_on": True})
+    assert obs == model and obs.model_dump() == model.model_dump() and obs.to_model() == model
+    res = FastActionResult(True, obs, "ok")
+    assert res.to_model() == ActionResult(ok=True, observation=model, message="ok")
+    assert FastVerification(True, "r").to_model().need_replan is False
+    with pytest.raises(pydantic.ValidationError):
+        FastAction("swipe").to_model()  # validated only when converted
+
+def test_sink_rejects_unknown_events(tmp_path):
+    with EventSink(str(tmp_path / "e.jsonl")) as sink:
+        assert sink.emit("verify", {"passed": True}) == {"event": "verify", "payload": {"passed": True}}
+        with pytest.raises(ValueError):
+            sink.emit("bogus", {})
+
+def test_record_dumps_are_deep_like_pydantic():
+    tree = {"toggles": {"Wi‑Fi": True}, "list": ["a", ("b", {"c": 1})]}
+    obs, model = FastObservation("network", tree, {"wifi_on": True}), Observation(screen="network", ui_tree=tree, info={"wifi_on": True})
+    dump = obs.model_dump()
+    assert dump == model.model_dump() and FastActionResult(True, obs).model_dump() == ActionResult(ok=True, observation=model).model_dump()
+    dump["ui_tree"]["toggles"]["Wi‑Fi"] = False; dump["ui_tree"]["list"][1][1]["c"] = 2; dump["info"]["wifi_on"] = False
+    assert obs.ui_tree == {"toggles": {"Wi‑Fi": True}, "list": ["a", ("b", {"c": 1})]} and obs.info == {"wifi_on": True}
+    action = FastAction("wait", None, {"until": {"visible": "Wi‑Fi"}})
+    assert action.model_dump()["params"]["until"] is not action.params["until"]
+
+def test_public_executor_and_verifier_return_the_models():
+    from qa_agents.agents.executor import Executor
+    from qa_agents.agents.verifier import Verifier
+    from qa_agents.utils.schemas import Verification
+    res = Executor(MockAndroidEnv()).execute("open_settings", None, {})
+    assert type(res) is ActionResult and type(res.observation) is Observation and res.observation.screen == "settings"
+    ver = Verifier("Toggle Wi‑Fi").verify_step("verify", "WiFi", {"expected_state": "on"}, res.observation)
+    assert type(ver) is Verification and ver.passed
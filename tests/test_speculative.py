@@ -0,0 +1,53 @@
+import time
+from qa_agents.agents.planner import Planner
+from qa_agents.agents.supervisor import Supervisor
+from qa_agents.envs.mock_android import MockAndroidEnv
+from qa_agents.pipeline.speculative import run_goal_speculative
+from qa_agents.utils.events import read_events
+from qa_agents.utils.obs_codec import decode_records
+from qa_agents.utils.schemas import Plan, PlanStep
+
+class SlowPlanner(Planner):
+    def __init__(self, steps):
+        super().__init__()
+        self.use_llm, self.steps = True, steps
+
+    def generate(self, goal):
+        time.sleep(0.2)  # an LLM round trip
+        return Plan(goal=goal, steps=[PlanStep(id=i + 1, description=s[0], intent=s[0], target=s[1], params={})
+                                      for i, s in enumerate(self.steps)])
+
+def _actions(out):
+    return [r["payload"] for r in decode_records(read_events(out["events_path"])) if r["event"] == "action"]
+
+def test_matching_prefix_is_kept(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    planner = SlowPlanner([("open_settings", None), ("tap", "Network & Internet"), ("toggle", "Wi‑Fi")])
+    out = run_goal_speculative("Toggle WiFi off and on", MockAndroidEnv, planner, Supervisor(), str(tmp_path / "a"))
+    assert out["speculation"] == {"speculated": 2, "kept": 2, "rolled_back": False, "replayed": False, "cache_hit": False}
+    assert out["time_to_first_action_ms"] < 150  # did not wait for the plan
+    assert [a["intent"] for a in _actions(out)] == ["open_settings", "tap", "toggle"]
+
+def test_divergent_plan_rolls_back_to_common_prefix(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    planner = SlowPlanner([("open_settings", None), ("tap", "Display")])
+    out = run_goal_speculative("Toggle WiFi off and on", MockAndroidEnv, planner, Supervisor(), str(tmp_path / "b"))
+    spec = out["speculation"]
+    assert spec["speculated"] == 2 and spec["kept"] == 1 and spec["rolled_back"] and not spec["replayed"]
+    actions = _actions(out)
+    assert [a["target"] for a in actions] == [None, "Display"]
+    assert actions[-1]["observation"]["screen"] != "network"  # speculative tap was undone
+
+def test_speculative_run_uses_compiled_plan_path(tmp_path, monkeypatch):
+    import pytest
+    from qa_agents.planning.compiler import PlanCompileError
+    monkeypatch.chdir(tmp_path)
+    planner = SlowPlanner([("open_settings", None), ("tap", "Network & Internet"), ("wait", None), ("toggle", "WiFi")])
+    out = run_goal_speculative("Toggle WiFi off and on", MockAndroidEnv, planner, Supervisor(), str(tmp_path / "c"))
+    assert out["speculation"]["kept"] == 2
+    assert out["waits"]["condition"] == 1 and out["waits"]["met"] == 1  # the wait ran as a condition wait
+    assert [(a["target"], a["ok"]) for a in _actions(out)][2:] == [(None, True), ("WiFi", True)]
+    planner = SlowPlanner([("open_settings", None), ("tap", "Bluetooth")])
+    with pytest.raises(PlanCompileError):
+        run_goal_speculative("Toggle WiFi off and on", MockAndroidEnv, planner, Supervisor(), str(tmp_path / "d"),
+                             strict_targets=True)
@@ -0,0 +1,8 @@
+from qa_agents.bench.startup import DEFAULT_BUDGET_MS, run
+
+def test_mock_run_stays_off_heavy_imports_and_within_budget():
+    res = run(repeat=3, top=5)  # median of 3 cold starts against the CLI's default budget
+    assert res["budget_ms"] == DEFAULT_BUDGET_MS
+    assert res["heavy_loaded"] == []
+    assert res["import_ms"] <= DEFAULT_BUDGET_MS and res["ok"], res["slowest_imports"]
+    assert res["import_ms"] > 0 and len(res["slowest_imports"]) == 5
@@ -0,0 +1,66 @@
+import json, os, subprocess, sys
+
+def test_suite_runs_manifest(tmp_path):
+    manifest = tmp_path / "goals.jsonl"
+    goals = ["Toggle Wi‑Fi off and on", "Turn WiFi off then back on", "Open display settings"]
+    manifest.write_text("\n".join(json.dumps({"id": f"g{i}", "goal": g}) for i, g in enumerate(goals)) + "\n", encoding="utf-8")
+    logs = tmp_path / "logs"
+    cmd = [sys.executable, '-m', 'qa_agents.run_suite', '--manifest', str(manifest), '--workers', '2', '--logs_dir', str(logs)]
+    assert subprocess.call(cmd, cwd=tmp_path) == 0
+    with open(logs / "suite_run.json") as f:
+        summary = json.load(f)
+    assert summary["goals"] == 3 and summary["goals_per_sec"] > 0
+    assert [r["id"] for r in summary["results"]] == ["g0", "g1", "g2"]
+    for i in range(3):
+        assert os.path.exists(logs / f"g{i}" / "qa_run.json")
+    assert os.path.exists(logs / "suite_report.md")
+
+def test_shared_prefix_suite_matches_independent_runs(tmp_path, monkeypatch):
+    from qa_agents.run_suite import run_suite, run_suite_shared
+    monkeypatch.chdir(tmp_path)
+    entries = [{"id": "a", "goal": "Toggle Wi‑Fi off and on"}, {"id": "b", "goal": "Turn WiFi off then back on"},
+               {"id": "c", "goal": "Open display settings"}]
+    shared = run_suite_shared(entries, str(tmp_path / "shared"))
+    independent = run_suite(entries, str(tmp_path / "independent"))
+    assert [r["status"] for r in shared["results"]] == [r["status"] for r in independent["results"]]
+    assert [r["steps"] for r in shared["results"]] == [r["steps"] for r in independent["results"]]
+    steps = shared["env_steps"]
+    assert steps["independent"] == 14 and steps["executed"] == 7 and steps["saved"] == 7
+
+def test_mock_env_snapshot_is_copy_on_write():
+    from qa_agents.envs.mock_android import MockAndroidEnv
+    from qa_agents.utils.schemas import Action
+    env = MockAndroidEnv()
+    env.reset(); env.step(Action(name="open_settings"))
+    snap = env.snapshot()
+    env.step(Action(name="tap", target="Network & Internet")); env.step(Action(name="toggle", target="wifi"))
+    assert snap == {"screen": "settings", "wifi_on": True}
+    assert env.restore(snap).screen == "settings"
+    env.step(Action(name="tap", target="network"))
+    assert env.restore(snap).screen == "settings"
+
+def test_shared_prefix_suite_falls_back_without_snapshots(tmp_path, monkeypatch):
+    from qa_agents.envs.mock_android import MockAndroidEnv
+    from qa_agents.run_suite import run_suite_shared
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delattr(MockAndroidEnv, "snapshot")
+    entries = [{"id": "a", "goal": "Toggle Wi‑Fi off and on"}, {"id": "c", "goal": "Open display settings"}]
+    out = run_suite_shared(entries, str(tmp_path / "shared"))
+    assert "env_steps" not in out and [r["status"] for r in out["results"]] == ["passed", "passed"]
+
+def test_shared_prefix_suite_spans_and_condition_waits_are_per_goal(tmp_path, monkeypatch):
+    from qa_agents.run_suite import run_suite_shared
+    from qa_agents.utils import tracing
+    from qa_agents.utils.events import read_events
+    monkeypatch.chdir(tmp_path)
+    entries = [{"id": "a", "goal": "Toggle Wi‑Fi off and on"}, {"id": "c", "goal": "Open display settings"}]
+    tracing.enable(True)
+    try:
+        out = run_suite_shared(entries, str(tmp_path / "shared"))
+    finally:
+        tracing.enable(False); tracing.drain()
+    assert out["waits"]["condition"] >= 1
+    for r in out["results"]:
+        spans = [e["payload"]["name"] for e in read_events(r["events_path"]) if e["event"] == "span"]
+        acted = sum(1 for e in read_events(r["events_path"]) if e["event"] == "action" and e["payload"]["intent"] != "verify")
+        assert spans.count("env.step") + spans.count("wait.until") == acted
@@ -0,0 +1,35 @@
+import json
+from qa_agents.agents.planner import Planner
+from qa_agents.agents.supervisor import Supervisor
+from qa_agents.run_test import make_env, run_goal
+from qa_agents.utils import tracing
+from qa_agents.utils.events import read_events
+
+def test_spans_nest_and_disabled_is_noop():
+    tracing.enable(False)
+    assert tracing.span("x") is tracing.span("y")
+    tracing.enable()
+    try:
+        with tracing.span("outer", k=1):
+            with tracing.span("inner"):
+                pass
+        spans = tracing.drain()
+    finally:
+        tracing.enable(False)
+    assert [s["name"] for s in spans] == ["outer", "inner"]
+    assert spans[1]["parent"] == "outer" and spans[1]["depth"] == 1 and spans[0]["attrs"] == {"k": 1}
+    assert tracing.drain() == []
+
+def test_traced_run_writes_span_events_and_chrome_trace(tmp_path):
+    tracing.enable()
+    try:
+        out = run_goal("Toggle Wi-Fi off and on", make_env("mock", "settings_wifi", False), Planner(),
+                       Supervisor(), str(tmp_path))
+    finally:
+        tracing.enable(False)
+    names = {r["payload"]["name"] for r in read_events(out["events_path"]) if r["event"] == "span"}
+    assert {"planner.plan", "env.step", "verifier.verify_step", "supervisor.summarize"} <= names
+    trace = json.loads((tmp_path / "chrome_trace.json").read_text(encoding="utf-8"))
+    assert any(e["ph"] == "X" and e["name"] == "env.step" for e in trace["traceEvents"])
+    top = tracing.top_spans([str(tmp_path / "chrome_trace.json")], n=2, by_name=True)
+    assert len(top) == 2 and top[0]["total_ms"] >= top[1]["total_ms"]
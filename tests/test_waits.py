@@ -0,0 +1,90 @@
+from qa_agents.agents.supervisor import Supervisor
+from qa_agents.bench.waits import _WaitingPlanner
+from qa_agents.envs.mock_android import MockAndroidEnv
+from qa_agents.planning.compiler import compile_plan
+from qa_agents.run_test import run_goal
+from qa_agents.utils.waits import Condition, wait_until
+
+class FakeClock:
+    def __init__(self):
+        self.t, self.sleeps = 0.0, []
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, s):
+        self.sleeps.append(s); self.t += s
+
+def test_wait_until_backs_off_and_stops_at_the_deadline():
+    clock = FakeClock()
+    res = wait_until(lambda: clock.t, lambda t: t >= 0.05, 1.0, sleep=clock.sleep, clock=clock)
+    assert res.ok and res.polls == 4 and clock.sleeps == [0.01, 0.02, 0.04]
+    clock = FakeClock()
+    res = wait_until(lambda: clock.t, lambda t: False, 0.3, sleep=clock.sleep, clock=clock)
+    assert not res.ok and abs(res.waited_s - 0.3) < 1e-9 and max(clock.sleeps) <= 0.25
+
+def test_waits_are_derived_from_the_next_target():
+    ops = compile_plan(_WaitingPlanner(1.0).plan("g"), MockAndroidEnv.targets).ops
+    assert [op.until.describe() for op in ops if op.intent == "wait"] == [{"visible": "Network & Internet"}] + [{"visible": "Wi‑Fi"}] * 3
+    env = MockAndroidEnv()
+    assert Condition(visible="wifi")(env.reset()) is False
+    assert Condition(info={"wifi_on": True})(env.observe())
+
+def test_condition_waits_return_once_the_ui_settles(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    out = run_goal("Toggle Wi‑Fi off and on", MockAndroidEnv(settle_s=0.05), _WaitingPlanner(2.0), Supervisor(), str(tmp_path / "a"))
+    assert out["status"] == "passed"
+    w = out["waits"]
+    assert w["condition"] == w["met"] == 4 and w["budget_s"] == 8.0
+    assert w["waited_s"] < 1.0 and w["saved_s"] > 7.0
+
+def test_android_world_env_observes_through_its_step_api():
+    from qa_agents.agents.executor import Executor
+    from qa_agents.envs.android_world_env import AndroidWorldEnv
+    from qa_agents.planning.compiler import CompiledStep
+
+    class Backend:  # an android_world-style env with only reset/step: the UI renders after 3 reads
+        def __init__(self): self.reads, self.ops = 0, []
+        def reset(self): return {"screen": "settings", "ui_tree": {}}
+        def step(self, low):
+            self.ops.append(low); self.reads += 1
+            return True, {"screen": "settings", "ui_tree": {"list": ["Network & Internet"]} if self.reads >= 3 else {}}, ""
+
+    env = object.__new__(AndroidWorldEnv)
+    env.task_name, env.enable_render, env._env = "settings_wifi", False, Backend()
+    executor = Executor(env)
+    res = executor.run(CompiledStep("wait", None, {"seconds": 5, "until": {"visible": "Network & Internet"}}))
+    assert res.ok and executor.waits["met"] == 1 and executor.waits["waited_s"] < 1
+    assert env._env.ops == [{"op": "wait", "seconds": 0}] * 3
+
+    class Element:
+        def __init__(self, text, checkable=False, checked=False):
+            self.text, self.content_description, self.is_checkable, self.is_checked = text, None, checkable, checked
+
+    class State:
+        ui_elements = [Element("Network & Internet"), Element("Wi‑Fi", True, True), Element(None)]
+
+    env._env.get_state = lambda: State()
+    obs = env.observe()
+    assert obs.ui_tree == {"list": ["Network & Internet"], "toggles": {"Wi‑Fi": True}} and obs.screen == "settings"
+    assert Condition(visible="wifi")(obs)
+
+def test_android_world_env_reset_replaces_the_last_observation():
+    from qa_agents.envs.android_world_env import AndroidWorldEnv
+    from qa_agents.utils.schemas import Action
+
+    class Backend:
+        def reset(self): return {"screen": "home", "ui_tree": {}, "info": {"wifi_on": True}}
+        def step(self, low):
+            if low["op"] == "open_settings":
+                return True, {"screen": "network", "ui_tree": {}, "info": {"wifi_on": False}}, ""
+            raise RuntimeError("device gone")
+        def get_state(self): return type("State", (), {"ui_elements": []})()
+
+    env = object.__new__(AndroidWorldEnv)
+    env.task_name, env.enable_render, env._env = "settings_wifi", False, Backend()
+    env.step(Action(name="open_settings"))
+    env.reset()  # what the pool does on release
+    assert (env.observe().screen, env.observe().info) == ("home", {"wifi_on": True})
+    ok, obs, _ = env.step(Action(name="tap", target="X"))
+    assert not ok and obs.screen == "home"